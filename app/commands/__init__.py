@@ -1,23 +1,90 @@
-from .init import init
-from .health import health
-from .clone import clone
-from .up import up
-from .deploy import deploy
-from .logs import logs
-from .shell import shell
-from .down import down
-from .status import status
-from .docs.docs import docs
+from .registry import CommandSpec, LazyGroup, load_command
+
+# Command manifest: name -> where the implementation lives.
+# Nothing here imports the command modules; see LazyGroup.
+COMMANDS: dict[str, CommandSpec] = {
+    # devmate docs
+    "docs": CommandSpec("app.commands.docs.docs", "docs", group=True),
+
+    # devmate init
+    "init": CommandSpec(
+        "app.commands.init", "init",
+        short_help="Checks if essential tools are installed. (Alias: doctor)",
+    ),
+
+    # devmate health
+    "health": CommandSpec(
+        "app.commands.health", "health",
+        short_help="Checks if the local application is running and responding.",
+    ),
+
+    # devmate clone
+    "clone": CommandSpec(
+        "app.commands.clone", "clone",
+        short_help="Clones the git repository in your local system",
+    ),
+
+    # devmate up
+    "up": CommandSpec(
+        "app.commands.up", "up",
+        short_help="Start the application services. (Alias: run)",
+    ),
+
+    # devmate deploy
+    "deploy": CommandSpec(
+        "app.commands.deploy", "deploy",
+        short_help="Clones a repo and starts it. (Alias: dep)",
+    ),
+
+    # devmate logs
+    "logs": CommandSpec(
+        "app.commands.logs", "logs",
+        short_help="Shows the logs of the application. (Alias: log)",
+    ),
+
+    # devmate down
+    "down": CommandSpec(
+        "app.commands.down", "down",
+        short_help="Stops the application services. (Alias: stop)",
+    ),
+
+    # devmate shell
+    "shell": CommandSpec(
+        "app.commands.shell", "shell",
+        short_help="Opens a shell in the application container. (Alias: sh)",
+    ),
+
+    # devmate status
+    "status": CommandSpec(
+        "app.commands.status", "status",
+        short_help="Shows a clean, beautiful table of running containers. (Alias: ps, info)",
+    ),
+
+    # devmate net
+    "net": CommandSpec(
+        "app.commands.net", "net",
+        short_help="Measures the latency between the services of a compose project.",
+    ),
+
+    # ...... Alias ......
+    "doctor": CommandSpec("app.commands.init", "init", help="Alias for init", hidden=True),
+    "dep": CommandSpec("app.commands.deploy", "deploy", help="Alias for deploy", hidden=True),
+    "run": CommandSpec("app.commands.up", "up", help="Alias for up", hidden=True),
+    "log": CommandSpec("app.commands.logs", "logs", help="Alias for logs", hidden=True),
+    "sh": CommandSpec("app.commands.shell", "shell", help="Alias for shell", hidden=True),
+    "stop": CommandSpec("app.commands.down", "down", help="Alias for down", hidden=True),
+    "ps": CommandSpec("app.commands.status", "status", help="Alias for status", hidden=True),
+}
+
+
+class MateGroup(LazyGroup):
+    manifest = COMMANDS
+
 
 __all__ = [
-    "init",
-    "health",
-    "clone",
-    "up",
-    "deploy",
-    "logs",
-    "shell",
-    "down",
-    "status",
-    "docs"
+    "COMMANDS",
+    "CommandSpec",
+    "LazyGroup",
+    "MateGroup",
+    "load_command",
 ]
@@ -4,7 +4,7 @@ from typer import Argument, Option, Exit
 from rich.console import Console
 
 from app.services import clone_repo
-from app.commands import up
+from app.commands.up import up
 from app.utils import TextDisplay
 
 console = Console()
@@ -59,6 +59,11 @@ def logs():
     """Logs documentation"""
     show_doc("logs.md")
 
+@docs.command()
+def net():
+    """Net documentation"""
+    show_doc("net.md")
+
 @docs.command()
 def shell():
     """Shell documentation"""
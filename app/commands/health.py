@@ -1,41 +1,260 @@
-from typer import Option
+import time
+from pathlib import Path
+from typing import List
+from typer import Option, Exit
+
+from app.services import check_health, check_endpoints, check_host_port, run_checks
+from app.utils import TextDisplay, ProgressBar, TableDisplay, LiveDisplay
+from app.utils.stats import format_ms, LatencyWindow
+
+
+def build_route(url: str, port: int | None, path: str) -> str:
+    if port:
+        url = f"{url}:{port}"
+
+    if "http" not in url:
+        url = f"http://{url}"
+
+    return f"{url}{path}"
+
+
+def read_url_file(file: str) -> list[str]:
+    """Reads one URL per line, ignoring blank lines and '#' comments."""
+    urls = []
+    with open(Path(file).expanduser(), "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                urls.append(line if "://" in line else f"http://{line}")
+    return urls
+
+
+def parse_tcp_target(target: str) -> tuple[str, int]:
+    """Parses 'PORT' or 'HOST:PORT' into (host, port)."""
+    host, _, port = target.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _probe_target(kind: str, target, timeout: int, rules: dict) -> float | None:
+    """Probes one target once and returns its latency in seconds, or None when it failed."""
+    if kind == "http":
+        result = check_health(target, max_retries=1, timeout=timeout, delay=0, **rules)
+        return result["latency"] if result["success"] else None
+
+    host, port = target
+    start = time.perf_counter()
+    if check_host_port(port, host=host, timeout=timeout):
+        return time.perf_counter() - start
+    return None
+
+
+def _watch_table(targets: dict, windows: dict[str, LatencyWindow], interval: float) -> TableDisplay:
+    table = TableDisplay(
+        title=f"Health Watch (every {interval:g}s, Ctrl+C to stop)",
+        columns=[
+            {"header": "Target", "style": "blue", "no_wrap": False, "ratio": 2},
+            {"header": "Status", "style": "white"},
+            {"header": "Avail", "style": "white"},
+            {"header": "Last", "style": "white"},
+            {"header": "p50", "style": "white"},
+            {"header": "p95", "style": "white"},
+            {"header": "p99", "style": "white"},
+            {"header": "Samples", "style": "dim white"},
+        ]
+    )
+    for name in targets:
+        window = windows[name]
+        stats = window.summary()
+        availability = window.availability
+        if not window.samples:
+            status = "[dim]...[/dim]"
+        elif window.last is not None:
+            status = "[green]UP[/green]"
+        else:
+            status = "[red]DOWN[/red]"
+        table.add_row([
+            name,
+            status,
+            f"{availability * 100:.1f}%" if availability is not None else "-",
+            format_ms(window.last),
+            format_ms(stats["p50"]),
+            format_ms(stats["p95"]),
+            format_ms(stats["p99"]),
+            f"{len(window.samples)}/{window.total}",
+        ])
+    return table
+
+
+def watch_health(
+    targets: dict,
+    interval: float,
+    window_size: int,
+    timeout: int,
+    concurrency: int,
+    rules: dict,
+):
+    """
+    Probes every target each `interval` seconds and redraws one live table
+    with rolling availability and latency percentiles until interrupted.
+
+    Args:
+        targets: display name -> ("http", url) or ("tcp", (host, port)).
+    """
+    windows = {name: LatencyWindow(window_size) for name in targets}
+
+    with LiveDisplay() as live:
+        live.update(_watch_table(targets, windows, interval))
+        try:
+            while True:
+                started = time.monotonic()
+                latencies = run_checks(
+                    {
+                        name: (lambda kind=kind, target=target: _probe_target(kind, target, timeout, rules))
+                        for name, (kind, target) in targets.items()
+                    },
+                    concurrency=concurrency,
+                    probe_timeout=timeout + 1,
+                    deadline=None,
+                    fallback=lambda name, message: None,
+                )
+                for name, latency in latencies.items():
+                    windows[name].add(latency)
+                live.update(_watch_table(targets, windows, interval))
+
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
 
-from app.services import check_health
-from app.utils import TextDisplay, ProgressBar
 
 def health(
-    url: str = Option("http://localhost", "--url", "-u", help="URL to check."),
+    url: List[str] = Option([], "--url", "-u", help="URL to check. Repeat to check several URLs. [default: http://localhost]"),
     path: str = Option("/", "--path", "-p", help="Path to check."),
     port: int = Option(None, "--port", "-P", help="Port to check."),
+    file: str = Option(None, "--file", "-f", help="File with one URL per line to check."),
     max_retries: int = Option(3, "--max-retries", "-r", help="Maximum number of retries."),
     timeout: int = Option(5, "--timeout", "-t", help="Timeout in seconds."),
     delay: int = Option(1, "--delay", "-d", help="Delay between retries."),
+    method: str = Option("GET", "--method", "-m", help="HTTP method: GET or HEAD."),
+    expect_status: List[int] = Option([], "--expect-status", "-e", help="Accepted status code (repeatable, default: any 2xx)."),
+    match: str = Option(None, "--match", help="Regex the response body must match."),
+    samples: int = Option(1, "--samples", "-s", help="Requests per URL used for latency percentiles."),
+    concurrency: int = Option(16, "--concurrency", "-c", help="Maximum number of URLs checked in parallel."),
+    watch: bool = Option(False, "--watch", "-w", help="Keep probing and show live latency stats until Ctrl+C."),
+    interval: float = Option(2.0, "--interval", "-i", help="Seconds between probes in watch mode."),
+    window: int = Option(300, "--window", help="Samples per target kept for watch mode statistics."),
+    tcp: List[str] = Option([], "--tcp", help="TCP target (PORT or HOST:PORT) for watch mode. Repeatable."),
 ):
     """
     Checks if the application is running and responding.
     You can use this command to check if the application is running and responding.
     Design for local development but can be used for remote applications.
+    Several URLs (--url repeated and/or --file) are checked concurrently.
     """
-    
-    if port:
-        url = f"{url}:{port}"
 
-    if "http" not in url:
-        url = f"http://{url}"
+    method = method.upper()
+    if method not in ("GET", "HEAD"):
+        TextDisplay.error_text(f"Unsupported method '{method}', use GET or HEAD")
+        raise Exit(1)
+    if method == "HEAD" and match:
+        TextDisplay.error_text("--match needs a response body, it can't be used with HEAD")
+        raise Exit(1)
 
-    route = f"{url}{path}"
+    if not url and not file and not tcp:
+        url = ["http://localhost"]
+    routes = [build_route(u, port, path) for u in url]
+    if file:
+        try:
+            file_routes = read_url_file(file)
+        except OSError as e:
+            TextDisplay.error_text(f"Error: {e}")
+            raise Exit(1)
+        if not file_routes:
+            TextDisplay.error_text(f"No URLs found in {file}")
+            raise Exit(1)
+        # --url targets are checked along with the file's, each URL once
+        routes = list(dict.fromkeys(routes + file_routes))
 
-    TextDisplay.style_text(f"Checking health of {route}  ...\n", "cyan")
-    with ProgressBar(max_retries, "Checking health") as progress:
-        result = check_health(route, max_retries, timeout, delay, progress)
-    
-    if result["success"]:
-        TextDisplay.style_text("Service is healthy", "green")
-        TextDisplay.print_json(json=result)
+    rules = {
+        "method": method,
+        "expected_status": expect_status or None,
+        "body_match": match,
+    }
 
-    else:
-        TextDisplay.error_text(f"Service is not reachable")
-        TextDisplay.print_json(json=result)
+    if watch:
+        targets = {route: ("http", route) for route in routes}
+        for t in tcp:
+            try:
+                host, tcp_port = parse_tcp_target(t)
+            except ValueError:
+                TextDisplay.error_text(f"Invalid TCP target '{t}', use PORT or HOST:PORT")
+                raise Exit(1)
+            targets[f"tcp://{host}:{tcp_port}"] = ("tcp", (host, tcp_port))
+
+        watch_health(targets, interval, window, timeout, concurrency, rules)
+        return
 
+    if tcp:
+        TextDisplay.warn_text("--tcp targets are only probed in --watch mode")
 
+    if len(routes) == 1 and samples <= 1:
+        route = routes[0]
+        TextDisplay.style_text(f"Checking health of {route}  ...\n", "cyan")
+        with ProgressBar(max_retries, "Checking health") as progress:
+            result = check_health(route, max_retries, timeout, delay, progress, **rules)
+        
+        if result["success"]:
+            TextDisplay.style_text("Service is healthy", "green")
+            TextDisplay.print_json(json=result)
 
+        else:
+            TextDisplay.error_text(f"Service is not reachable")
+            TextDisplay.print_json(json=result)
+        return
+
+    TextDisplay.style_text(f"Checking health of {len(routes)} endpoint(s) ...\n", "cyan")
+    results = check_endpoints(
+        routes,
+        samples=samples,
+        max_retries=max_retries,
+        timeout=timeout,
+        delay=delay,
+        concurrency=concurrency,
+        **rules,
+    )
+
+    table = TableDisplay(
+        title="Endpoint Health Report",
+        columns=[
+            {"header": "URL", "style": "blue", "no_wrap": False, "ratio": 2},
+            {"header": "Status", "style": "white"},
+            {"header": "Code", "style": "white"},
+            {"header": "p50", "style": "white"},
+            {"header": "p95", "style": "white"},
+            {"header": "p99", "style": "white"},
+            {"header": "Message", "style": "dim white", "no_wrap": False, "ratio": 2},
+        ]
+    )
+    healthy = 0
+    for route, result in results.items():
+        stats = result["latency_stats"]
+        if result["success"]:
+            healthy += 1
+            status = "[green]UP[/green]"
+        else:
+            status = "[red]DOWN[/red]"
+        table.add_row([
+            route,
+            status,
+            str(result["status_code"] or "-"),
+            format_ms(stats["p50"]),
+            format_ms(stats["p95"]),
+            format_ms(stats["p99"]),
+            result["message"],
+        ])
+    table.show()
+
+    if healthy == len(results):
+        TextDisplay.success_text(f"All {healthy} endpoint(s) are healthy")
+    else:
+        TextDisplay.error_text(f"{len(results) - healthy} of {len(results)} endpoint(s) are not healthy")
+        raise Exit(1)
@@ -1,22 +1,69 @@
+import sys
+from pathlib import Path
+from typing import List
 from typer import Option
 
 from app.utils import TextDisplay
-from app.services import compose_logs, container_logs
+from app.services import compose_logs, container_logs, search_logs, compose_project_name
+from app.services.logstore_svc import parse_time
 
 def logs(
     path: str = Option(".", "-p", "--path", help="Path to the project directory"),
     tail: int = Option(100, "-t", "--tail", help="Number of lines to show"),
     follow: bool = Option(False, "-f", "--follow", help="Follow the logs"),
     container: str = Option(None, "-c", "--container", help="Container name"),
+    service: List[str] = Option([], "--service", help="Only show these compose services (repeatable)"),
+    grep: str = Option(None, "-g", "--grep", help="Only show lines matching this regular expression (case-insensitive)"),
+    level: str = Option(None, "-l", "--level", help="Minimum log level: trace, debug, info, warn, error, fatal"),
+    since: str = Option(None, "--since", help="Only show logs since a timestamp (e.g. 2024-01-02T13:23:37Z) or relative (e.g. 42m)"),
+    timestamps: bool = Option(False, "--timestamps", help="Show timestamps"),
+    color: bool = Option(True, "--color/--no-color", help="Color the service prefixes (default: when writing to a terminal)"),
+    capture: bool = Option(False, "--capture", help="Also save the logs in mate's local log store, searchable with --search"),
+    search: str = Option(None, "--search", help="Search the captured logs for a term (case-insensitive) instead of reading from Docker"),
+    where: List[str] = Option([], "-w", "--where", help="Only show JSON lines whose field matches, e.g. status>=500 or msg~timeout (repeatable)"),
+    fields: str = Option(None, "--fields", help="Comma-separated JSON fields to show instead of the whole line (e.g. level,msg,http.status)"),
+    stats: bool = Option(False, "--stats", help="Show counts per service, level and message template instead of the lines"),
+    window: float = Option(60, "--window", help="Seconds covered by --stats while following"),
 ):
-    
+    if since:
+        # Checked up front, so a typo fails the same way with either transport
+        try:
+            parse_time(since)
+        except ValueError as e:
+            TextDisplay.error_text(f"Error: {e}")
+            return
+
+    options = {
+        "grep": grep,
+        "level": level,
+        "where": where,
+        "fields": [f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        "stats": stats,
+        "since": since,
+        "timestamps": timestamps,
+        "color": color and sys.stdout.isatty(),
+    }
+
+    if search is not None:
+        try:
+            name = container or compose_project_name(Path(path).absolute().expanduser().resolve())
+            matches = search_logs(name, search, services=service, **options)
+            if not matches:
+                TextDisplay.warn_text(f"No captured log lines match '{search}'")
+        except Exception as e:
+            TextDisplay.error_text(f"Error: {e}")
+        return
+
+    options["capture"] = capture
+    options["window"] = window
+
     if container:
         try:
-            return container_logs(container, tail, follow)
+            return container_logs(container, tail, follow, **options)
         except Exception as e:
             TextDisplay.error_text(f"Error: {e}")
     else:
         try:
-            return compose_logs(path, tail, follow)
+            return compose_logs(path, tail, follow, services=service, **options)
         except Exception as e:
-            TextDisplay.error_text(f"Error: {e}")
\ No newline at end of file
+            TextDisplay.error_text(f"Error: {e}")
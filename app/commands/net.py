@@ -0,0 +1,143 @@
+from pathlib import Path
+from typing import List
+from typer import Option
+
+from app.services import (
+    resolve_compose,
+    get_project_snapshot,
+    get_service_internal_port,
+    probe_targets,
+    run_checks,
+)
+from app.utils import TextDisplay, TableDisplay
+from app.utils.stats import format_ms
+
+
+def _cell(result: dict | None) -> str:
+    if result is None:
+        return "[dim]—[/dim]"
+    if not result["supported"]:
+        return "[yellow]n/a[/yellow]"
+    if not result["success"]:
+        return "[red]✗ fail[/red]"
+    stats = result["latency_stats"]
+    text = f"{stats['p50'] * 1000:.1f} / {stats['p95'] * 1000:.1f}"
+    if result["dns"] is not None:
+        text += f"\n[dim]dns {format_ms(result['dns'])}[/dim]"
+    return text
+
+
+def measure_matrix(
+    sources: dict[str, str],
+    targets: dict[str, int],
+    samples: int = 5,
+    timeout: float = 2,
+    mode: str = "tcp",
+    concurrency: int = 8,
+) -> dict[str, dict[str, dict]]:
+    """
+    Measures every source service -> target service pair.
+    Each source probes all its targets concurrently in one exec (see probe_svc),
+    and the sources run in parallel.
+
+    Args:
+        sources: service -> container name to probe from.
+        targets: service -> port, reached by service name like the apps do.
+
+    Returns:
+        dict: source -> target -> probe_targets result
+    """
+    def from_source(source: str):
+        def run():
+            wanted = [(name, port) for name, port in targets.items() if name != source]
+            results = probe_targets(wanted, sources[source], timeout=timeout, samples=samples, mode=mode)
+            return {name: results[(name, port)] for name, port in wanted}
+        return run
+
+    return run_checks(
+        {source: from_source(source) for source in sources},
+        concurrency=concurrency,
+        probe_timeout=timeout * samples + 30,
+        deadline=None,
+        fallback=lambda source, message: {
+            name: {"success": False, "supported": False, "message": message} for name in targets
+        },
+    )
+
+
+def net(
+    path: str = Option(".", "-p", "--path", help="Path to the project directory"),
+    service: List[str] = Option([], "--service", help="Only measure between these compose services (repeatable)"),
+    samples: int = Option(5, "-n", "--samples", help="Connections per service pair"),
+    http: bool = Option(False, "--http", help="Measure HTTP round trips (connect + first response byte) instead of TCP connects"),
+    timeout: float = Option(2, "--timeout", help="Seconds a single connection may take"),
+    concurrency: int = Option(8, "--concurrency", help="Maximum number of services probing at the same time"),
+    file: List[str] = Option([], "--file", help="Compose file(s) to merge, in order (default: compose file + its override)"),
+):
+    """
+    Measures the latency between the services of a compose project, from inside their containers.
+    """
+    try:
+        project_dir = str(Path(path).absolute().expanduser().resolve())
+        compose_data = resolve_compose(project_dir, files=file or None)
+        services = compose_data["services"]
+        unknown = [name for name in service if name not in services]
+        if unknown:
+            TextDisplay.error_text(f"Unknown service(s): {', '.join(unknown)}")
+            return
+        selected = service or list(services)
+
+        snapshot = get_project_snapshot(project_dir, files=file or None)
+        containers = snapshot.by_service()
+        sources = {
+            name: containers[name]["name"]
+            for name in selected
+            if name in containers and containers[name]["running"]
+        }
+        targets = {}
+        for name in selected:
+            port = get_service_internal_port(services[name])
+            if port:
+                targets[name] = port
+
+        if not sources:
+            TextDisplay.error_text("No running containers found for this project (start it with `mate up`)")
+            return
+        if not targets:
+            TextDisplay.error_text("None of the services defines a port (ports or expose) to connect to")
+            return
+
+        TextDisplay.info_text(
+            f"Measuring {len(sources)} x {len(targets)} service pairs ({samples} samples each)..."
+        )
+        matrix = measure_matrix(
+            sources, targets, samples=samples, timeout=timeout,
+            mode="http" if http else "tcp", concurrency=concurrency,
+        )
+    except Exception as e:
+        TextDisplay.error_text(f"Error: {e}")
+        return
+
+    kind = "HTTP round trip" if http else "TCP connect"
+    table = TableDisplay(
+        title=f"Service Latency ({kind} p50 / p95 in ms, {samples} samples)",
+        columns=[{"header": "From \\ To", "style": "blue", "no_wrap": True}] + [
+            {"header": f"{name}:{port}", "style": "white", "no_wrap": True} for name, port in targets.items()
+        ],
+    )
+    problems = []
+    for source in sources:
+        row = [source]
+        for name in targets:
+            result = matrix[source].get(name)
+            row.append(_cell(result))
+            if result is not None and not result["success"]:
+                problems.append(f"{source} -> {name}: {result['message'] or 'failed'}")
+        table.add_row(row, style="white")
+    table.show()
+
+    for problem in problems:
+        TextDisplay.warn_text(problem)
+    not_running = [name for name in selected if name not in sources]
+    if not_running:
+        TextDisplay.debug_text(f"Not measured from (no running container): {', '.join(not_running)}")
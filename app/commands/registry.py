@@ -0,0 +1,65 @@
+from importlib import import_module
+from typing import NamedTuple
+
+from typer import Context, Typer
+from typer.core import TyperGroup
+from typer.main import get_command
+
+
+class CommandSpec(NamedTuple):
+    """
+    Lightweight manifest entry for a command.
+    The module is only imported when the command is actually resolved.
+    """
+    module: str
+    attr: str
+    short_help: str | None = None
+    help: str | None = None
+    hidden: bool = False
+    group: bool = False
+
+
+class LazyGroup(TyperGroup):
+    """
+    Typer group that resolves commands from a manifest on first use.
+    `mate status` only imports `app.commands.status` (and what it needs),
+    instead of every command module and all of their heavy dependencies.
+    """
+    manifest: dict[str, CommandSpec] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resolved: dict = {}
+
+    def list_commands(self, ctx: Context) -> list[str]:
+        eager = [name for name in super().list_commands(ctx) if name not in self.manifest]
+        return list(self.manifest) + eager
+
+    def get_command(self, ctx: Context, cmd_name: str):
+        spec = self.manifest.get(cmd_name)
+        if spec is None:
+            return super().get_command(ctx, cmd_name)
+
+        if cmd_name not in self._resolved:
+            self._resolved[cmd_name] = load_command(cmd_name, spec)
+        return self._resolved[cmd_name]
+
+
+def load_command(name: str, spec: CommandSpec):
+    """Imports the module behind a manifest entry and converts it to a click command."""
+    target = getattr(import_module(spec.module), spec.attr)
+
+    if spec.group:
+        command = get_command(target)
+        command.name = name
+        command.hidden = spec.hidden
+        return command
+
+    wrapper = Typer(rich_markup_mode="rich", add_completion=False)
+    wrapper.command(
+        name=name,
+        short_help=spec.short_help,
+        help=spec.help,
+        hidden=spec.hidden,
+    )(target)
+    return get_command(wrapper)
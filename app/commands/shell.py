@@ -1,7 +1,7 @@
 from typer import Option, Exit
 from python_on_whales import DockerException
 
-from app.services import detect_configuration, ConfigType, get_project_containers, container_shell 
+from app.services import detect_configuration, ConfigType, get_project_snapshot, container_shell
 from app.utils import TextDisplay, Prompt
 
 def shell(
@@ -25,7 +25,8 @@ def shell(
             return
         
         if config_mode == ConfigType.COMPOSE:
-            containers = get_project_containers(path, return_names=True) 
+            snapshot = get_project_snapshot(path)
+            containers = snapshot.names()
             if not containers:
                 TextDisplay.error_text("No containers found.")
                 raise Exit(1)
@@ -34,7 +35,7 @@ def shell(
                     TextDisplay.error_text(f"Container '{name}' not found.")
                     raise Exit(1)
                 try:
-                    container_shell(name, shell_path)
+                    container_shell(name, shell_path, snapshot=snapshot)
                 except DockerException as de:
                     TextDisplay.error_text(f"Error: {de}")
             else:
@@ -43,12 +44,12 @@ def shell(
                     TextDisplay.info_text("Pick the container name (or use -n / --name option).")
                     selected_container = Prompt.select("Container Name: ", containers)
                     try:
-                        container_shell(selected_container, shell_path)
+                        container_shell(selected_container, shell_path, snapshot=snapshot)
                     except DockerException as de:
                         TextDisplay.error_text(f"Error: {de}")
                 else:
                     try:
-                        container_shell(containers[0], shell_path)
+                        container_shell(containers[0], shell_path, snapshot=snapshot)
                     except DockerException as de:
                         TextDisplay.error_text(f"Error: {de}")
             return
@@ -1,9 +1,16 @@
+import csv
+import json
+import sys
+import time
 import typer
-from python_on_whales import docker
-from app.utils.ui import TableDisplay, TextDisplay
+from app.services import iter_containers, list_containers
+from app.utils.stats import format_bytes, format_ms
+# app.utils.ui (Rich) is imported where a table or message is shown,
+# so --output json|ndjson|csv never loads it
 
 # --- Constants & Configuration ---
 COLUMN_CONFIG = {
+    "host": {"header": "HOST", "style": "magenta", "no_wrap": True},
     "id": {"header": "ID", "style": "dim white", "no_wrap": True},
     "name": {"header": "NAME", "style": "blue", "no_wrap": True, "min_width": 10},
     "image": {"header": "IMAGE", "style": "cyan", "no_wrap": False, "ratio": 1},
@@ -17,8 +24,21 @@ COLUMN_CONFIG = {
     "volumes": {"header": "VOLUMES", "style": "white", "no_wrap": False, "ratio": 3},
     "command": {"header": "COMMAND", "style": "dim white", "no_wrap": False, "ratio": 1},
     "created": {"header": "CREATED", "style": "dim white", "no_wrap": True},
+    "cpu": {"header": "CPU %", "style": "white", "no_wrap": True},
+    "mem": {"header": "MEM", "style": "white", "no_wrap": True},
+    "net": {"header": "NET I/O", "style": "white", "no_wrap": True},
+    "blkio": {"header": "BLOCK I/O", "style": "white", "no_wrap": True},
+    "pids": {"header": "PIDS", "style": "white", "no_wrap": True},
 }
 
+# Columns fed by the streamed container stats
+RESOURCE_KEYS = ("cpu", "mem", "net", "blkio", "pids")
+SORT_KEYS = ("name",) + RESOURCE_KEYS
+OUTPUT_FORMATS = ("table", "json", "ndjson", "csv")
+
+# How long a one-shot `mate status` waits for two stats samples (I/O rates need both)
+STATS_TIMEOUT = 5
+
 # --- Formatting Helpers ---
 def shorten_image(image_name: str) -> str:
     """Shortens long image names by truncating the repository part."""
@@ -33,7 +53,7 @@ def format_mounts(mounts, shorten: bool = True) -> str:
     """Formats mount paths for clean table display. shortening is optional."""
     paths = []
     for m in mounts:
-        src, dest = m.source, m.destination
+        src, dest = m["source"], m["destination"]
         
         # Shorten internal docker volume paths
         if shorten and src.startswith("/var/lib/docker/volumes/"):
@@ -57,53 +77,185 @@ def format_mounts(mounts, shorten: bool = True) -> str:
         paths.append(f"{src}:{dest}")
     return "\n".join(paths) if paths else "-"
 
-def get_container_data(container, key: str) -> str:
-    """Extracts and formats specific data from a container object."""
+def get_container_data(container: dict, key: str) -> str:
+    """Extracts and formats specific data from a container record."""
+    if key == "host":
+        return container.get("host") or "-"
     if key == "id":
-        return container.id[:12]
+        return container["id"][:12]
     if key == "name":
-        return container.name
+        return container["name"]
     if key == "image":
-        return shorten_image(container.config.image)
+        return shorten_image(container["image"])
     if key == "status":
-        return container.state.status.capitalize()
+        return container["status"].capitalize()
     if key == "ports":
-        if not container.network_settings.ports:
+        if not container["ports"]:
             return "-"
         mappings = []
-        for cp, hm in container.network_settings.ports.items():
-            if hm:
-                for m in hm:
-                    mappings.append(f"{m.get('HostIp', '0.0.0.0')}:{m.get('HostPort')}->{cp}")
+        for cp, hm in container["ports"].items():
+            for m in hm:
+                mappings.append(f"{m['host_ip']}:{m['host_port']}->{cp}")
         return "\n".join(mappings) if mappings else "-"
     if key == "health":
-        if not hasattr(container.state, 'health') or not container.state.health:
+        if not container["health"]:
             return "-"
-        h_status = container.state.health.status
+        h_status = container["health"]
         color = "green" if h_status == "healthy" else "yellow" if h_status == "starting" else "red"
         return f"[{color}]{h_status.capitalize()}[/]"
     if key == "network":
-        return "\n".join(container.network_settings.networks.keys()) if container.network_settings.networks else "-"
+        return "\n".join(container["networks"].keys()) if container["networks"] else "-"
     if key == "labels":
-        return "\n".join([f"{k}={v}" for k, v in container.config.labels.items()]) if container.config.labels else "-"
+        return "\n".join([f"{k}={v}" for k, v in container["labels"].items()]) if container["labels"] else "-"
     if key == "mounts":
-        return format_mounts(container.mounts)
+        return format_mounts(container["mounts"])
     if key == "fmounts":
-        return format_mounts(container.mounts, shorten=False)
+        return format_mounts(container["mounts"], shorten=False)
     if key == "volumes":
-        return format_mounts([m for m in container.mounts if m.type == "volume"])
+        return format_mounts([m for m in container["mounts"] if m["type"] == "volume"])
     if key == "command":
-        return container.config.cmd[0] if container.config.cmd else "-"
+        return container["command"][0] if container["command"] else "-"
+    if key in RESOURCE_KEYS:
+        return format_usage(container.get("usage"), key)
     if key == "created":
-        return container.created.strftime("%Y-%m-%d %H:%M:%S") if hasattr(container, 'created') else "-"
+        # ISO 8601 from the engine, e.g. 2024-05-01T10:20:30.123456789Z
+        return container["created"][:19].replace("T", " ") if container["created"] else "-"
+    return "-"
+
+def format_rate(rate: float | None) -> str:
+    return f"{format_bytes(rate)}/s" if rate is not None else "-"
+
+def format_usage(usage: dict | None, key: str) -> str:
+    """Formats one resource column from a ResourceSampler usage dict."""
+    if not usage:
+        return "-"
+    if key == "cpu":
+        return f"{usage['cpu']:.1f}%" if usage["cpu"] is not None else "-"
+    if key == "mem":
+        if usage["mem"] is None:
+            return "-"
+        percent = f" ({usage['mem_percent']:.0f}%)" if usage["mem_percent"] is not None else ""
+        return f"{format_bytes(usage['mem'])}{percent}"
+    if key == "net":
+        return f"↓{format_rate(usage['net_rx'])} ↑{format_rate(usage['net_tx'])}"
+    if key == "blkio":
+        return f"R {format_rate(usage['blk_read'])} W {format_rate(usage['blk_write'])}"
+    if key == "pids":
+        return str(usage["pids"]) if usage["pids"] is not None else "-"
     return "-"
 
-def get_status_indicator(container) -> str:
+def sort_value(container: dict, key: str):
+    """Sort key for --sort: the name, or a resource figure (missing figures sort last)."""
+    if key == "name":
+        return container["name"]
+    usage = container.get("usage") or {}
+    values = {
+        "cpu": [usage.get("cpu")],
+        "mem": [usage.get("mem")],
+        "net": [usage.get("net_rx"), usage.get("net_tx")],
+        "blkio": [usage.get("blk_read"), usage.get("blk_write")],
+        "pids": [usage.get("pids")],
+    }[key]
+    known = [v for v in values if v is not None]
+    return -sum(known) if known else float("inf")
+
+def order_containers(containers, sort: str = None, top: int = None) -> list:
+    """Applies --sort (resources: highest first) and --top."""
+    if sort:
+        containers = sorted(containers, key=lambda c: sort_value(c, sort))
+    return containers[:top] if top else containers
+
+def with_usage(container: dict, sampler) -> dict:
+    """The container record with its latest resource usage, when resources are sampled."""
+    if sampler is None:
+        return container
+    return {**container, "usage": sampler.get(container["id"])}
+
+def get_container_value(container: dict, key: str):
+    """Plain, unshortened value of a column for --output (no markup, numbers stay numbers)."""
+    if key == "ports":
+        return [
+            f"{m['host_ip']}:{m['host_port']}->{cp}"
+            for cp, hm in (container["ports"] or {}).items()
+            for m in hm
+        ]
+    if key == "network":
+        return list(container["networks"] or {})
+    if key == "labels":
+        return dict(container["labels"] or {})
+    if key in ("mounts", "fmounts"):
+        return [f"{m['source']}:{m['destination']}" for m in container["mounts"]]
+    if key == "volumes":
+        return [f"{m['source']}:{m['destination']}" for m in container["mounts"] if m["type"] == "volume"]
+    if key == "command":
+        return container["command"] or []
+    if key in RESOURCE_KEYS:
+        usage = container.get("usage")
+        if not usage:
+            return None
+        if key == "net":
+            return {"rx": usage["net_rx"], "tx": usage["net_tx"]}
+        if key == "blkio":
+            return {"read": usage["blk_read"], "write": usage["blk_write"]}
+        if key == "mem":
+            return {"usage": usage["mem"], "limit": usage["mem_limit"], "percent": usage["mem_percent"]}
+        return usage[key]
+    if key == "host":
+        return container.get("host")
+    if key in ("id", "name", "image", "status", "health", "created"):
+        return container[key]
+    return None
+
+def csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return ";".join(f"{k}={'' if v is None else v}" for k, v in value.items())
+    return str(value)
+
+def emit_records(containers, active_keys: list, output: str, stream=None) -> int:
+    """
+    Writes containers as json (one array), ndjson (one object per line) or csv
+    records of the active columns. ndjson and csv rows are written as soon as
+    they are available; the json array is written once it is complete, so an
+    error while fetching leaves nothing on the stream rather than half an array.
+    Returns the number of records written.
+    """
+    stream = stream or sys.stdout
+    records = []
+    writer = None
+    count = 0
+
+    for container in containers:
+        record = {key: get_container_value(container, key) for key in active_keys}
+        count += 1
+        if output == "json":
+            records.append(record)
+        elif output == "csv":
+            if writer is None:
+                writer = csv.writer(stream, lineterminator="\n")
+                writer.writerow(active_keys)
+            writer.writerow([csv_value(record[key]) for key in active_keys])
+        else:
+            stream.write(json.dumps(record) + "\n")
+            stream.flush()
+
+    if output == "json":
+        body = ",".join("\n  " + json.dumps(record) for record in records)
+        stream.write("[" + body + ("\n]\n" if records else "]\n"))
+    elif output == "csv" and writer is None:
+        csv.writer(stream, lineterminator="\n").writerow(active_keys)
+    stream.flush()
+    return count
+
+def get_status_indicator(container: dict) -> str:
     """Returns a colored status dot for the container."""
     dot = "●"
-    if container.state.paused:
+    if container["paused"]:
         return f"[yellow]{dot}[/yellow]"
-    if container.state.running:
+    if container["running"]:
         return f"[green]{dot}[/green]"
     return f"[red]{dot}[/red]"
 
@@ -114,6 +266,132 @@ def parse_format_flag(format_str: str) -> list:
         fmt = fmt[2:-2].strip()
     return [k.strip().lower() for k in fmt.split(",") if k.strip()]
 
+def get_active_keys(
+    format: str = None,
+    show_id: bool = False,
+    show_health: bool = False,
+    show_network: bool = False,
+    show_labels: bool = False,
+    show_mounts: bool = False,
+    show_volume: bool = False,
+    on_unknown=None,
+) -> list:
+    """Columns to show, from --format or the individual flags."""
+    active_keys = []
+    if format:
+        requested_keys = parse_format_flag(format)
+        for k in requested_keys:
+            if k in COLUMN_CONFIG:
+                active_keys.append(k)
+            elif on_unknown:
+                on_unknown(k)
+            else:
+                from app.utils.ui import TextDisplay
+                TextDisplay.warn_text(f"Unknown column: {k}")
+    else:
+        active_keys = ["name", "image", "status", "ports"]
+        if show_id: active_keys.insert(0, "id")
+        if show_health: active_keys.append("health")
+        if show_network: active_keys.append("network")
+        if show_labels: active_keys.append("labels")
+        if show_mounts: active_keys.append("mounts")
+        if show_volume: active_keys.append("volumes")
+    return active_keys
+
+def build_row(container: dict, active_keys: list) -> tuple:
+    """Returns (cells, style) of one container's row."""
+    row = [get_status_indicator(container)]
+    row.extend([get_container_data(container, k) for k in active_keys])
+    style = "green" if container["running"] else "yellow" if container["paused"] else "red"
+    return tuple(row), style
+
+def build_table(rows: list, active_keys: list, title: str = "[bold blue]Mate Status[/bold blue]"):
+    from app.utils.ui import TableDisplay
+
+    columns = [{"header": "", "style": "white", "no_wrap": True}] # Indicator
+    columns.extend([COLUMN_CONFIG[k] for k in active_keys])
+
+    table = TableDisplay(title=title, columns=columns)
+    for row, style in rows:
+        table.add_row(list(row), style=style)
+    return table
+
+def watch_status(watcher, active_keys: list, refresh: float = 4, sampler=None, sort: str = None, top: int = None):
+    """
+    Keeps a live table up to date until interrupted. Rows are rebuilt only for
+    containers the watcher (or the resource sampler) reports as changed, and
+    the screen is redrawn only when a row actually differs, at most `refresh`
+    times per second.
+    """
+    min_interval = 1 / refresh if refresh > 0 else 0
+    rows = {}
+
+    def table():
+        containers = order_containers(
+            [with_usage(watcher.records[cid], sampler) for cid in rows], sort=sort or "name", top=top
+        )
+        title = f"[bold blue]Mate Status[/bold blue] [dim](watching, {len(rows)} containers, {time.strftime('%H:%M:%S')})[/dim]"
+        return build_table([rows[c["id"]] for c in containers], active_keys, title=title)
+
+    def apply(changed) -> bool:
+        dirty = False
+        for cid in changed:
+            if cid not in watcher.records:
+                dirty |= rows.pop(cid, None) is not None
+                continue
+            row = build_row(with_usage(watcher.records[cid], sampler), active_keys)
+            if rows.get(cid) != row:
+                rows[cid] = row
+                dirty = True
+        return dirty
+
+    def changes(timeout) -> set:
+        changed = watcher.poll(timeout=timeout)
+        if sampler is not None:
+            sampler.track([cid for cid, c in watcher.records.items() if c["running"]])
+            sampled = sampler.take_changed()
+            changed |= {cid for cid in watcher.records if cid[:12] in sampled}
+        return changed
+
+    # Stats arrive about once per second, events whenever something happens
+    poll_timeout = None if sampler is None else 1.0
+
+    apply(watcher.records)
+    from app.utils.ui import LiveDisplay
+
+    with LiveDisplay(refresh_per_second=refresh) as live:
+        live.update(table())
+        drawn = time.monotonic()
+        while True:
+            if not apply(changes(poll_timeout)):
+                continue
+            # Bursts (e.g. `compose up` of a whole stack) coalesce into one redraw
+            wait = min_interval - (time.monotonic() - drawn)
+            if wait > 0:
+                time.sleep(wait)
+                apply(changes(0))
+            live.update(table())
+            drawn = time.monotonic()
+
+def fetch_contexts(contexts: list, all: bool, filters: dict, timeout: float, report) -> list:
+    """
+    Containers of several Docker contexts (queried concurrently), each with a
+    "host". `report(context, result)` is called per context, in the given order.
+    """
+    from app.services.docker_svc import snapshot_contexts
+
+    results = snapshot_contexts(contexts, all=all, filters=filters, timeout=timeout)
+    containers = []
+    for context, result in results.items():
+        report(context, result)
+        containers.extend(result["records"])
+    return containers
+
+def describe_host(context: str, result: dict) -> str:
+    if result["error"]:
+        return f"{context}: {result['error']}"
+    return f"{context}: {len(result['records'])} containers in {format_ms(result['latency'])}"
+
 # --- Main Command ---
 def _status(
     all_containers: bool = False,
@@ -126,57 +404,189 @@ def _status(
     show_labels: bool = False,
     show_mounts: bool = False,
     format: str = None,
+    watch: bool = False,
+    refresh: float = 4,
+    show_resources: bool = False,
+    sort: str = None,
+    top: int = None,
+    output: str = "table",
+    contexts: list = None,
+    host_timeout: float = 10,
 ):
     """
     Shows a clean, beautiful table of container statuses with flexible formatting.
     (Core logic separated from Typer for better modularity and testability).
     """
+    if output != "table":
+        return _status_records(
+            all_containers=all_containers, stopped=stopped, paused=paused,
+            active_keys=get_active_keys(
+                format, show_id, show_health, show_network, show_labels, show_mounts, show_volume,
+                on_unknown=lambda k: sys.stderr.write(f"Unknown column: {k}\n"),
+            ),
+            show_resources=show_resources, sort=sort, top=top, output=output, watch=watch,
+            contexts=contexts, host_timeout=host_timeout,
+        )
+
+    from app.utils.ui import TextDisplay
+
+    sampler = None
     try:
         # 1. Fetch Containers
         filters = {}
         if stopped: filters["status"] = "exited"
         elif paused: filters["status"] = "paused"
-        
-        containers = docker.container.list(all=all_containers or stopped or paused, filters=filters)
+
+        # 2. Determine Active Columns
+        active_keys = get_active_keys(format, show_id, show_health, show_network, show_labels, show_mounts, show_volume)
+        if show_resources:
+            active_keys.extend(k for k in RESOURCE_KEYS if k not in active_keys)
+        if sort and sort not in SORT_KEYS:
+            TextDisplay.error_text(f"Unknown sort key: {sort} (use one of {', '.join(SORT_KEYS)})")
+            return
+        if sort in RESOURCE_KEYS and sort not in active_keys:
+            active_keys.append(sort)
+
+        if contexts:
+            if watch or any(k in RESOURCE_KEYS for k in active_keys):
+                TextDisplay.error_text("--watch and resource columns only work with the current Docker context")
+                return
+            if "host" not in active_keys:
+                active_keys.insert(0, "host")
+            summary = []
+            containers = fetch_contexts(
+                contexts, all_containers or stopped or paused, filters, host_timeout,
+                report=lambda context, result: summary.append((context, result)),
+            )
+            if containers:
+                build_table([build_row(c, active_keys) for c in order_containers(containers, sort, top)], active_keys).show()
+            else:
+                TextDisplay.info_text("No containers found.")
+            for context, result in summary:
+                if result["error"]:
+                    TextDisplay.warn_text(describe_host(context, result))
+                else:
+                    TextDisplay.debug_text(describe_host(context, result))
+            return
+
+        # One `docker stats` stream for all containers, only when a resource column is shown
+        if any(k in RESOURCE_KEYS for k in active_keys):
+            from app.services.stats_svc import ResourceSampler
+            sampler = ResourceSampler()
+
+        if watch:
+            from app.services.watch_svc import ContainerWatcher
+
+            watcher = ContainerWatcher(all=all_containers or stopped or paused, filters=filters)
+            try:
+                watch_status(watcher, active_keys, refresh=refresh, sampler=sampler, sort=sort, top=top)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                watcher.close()
+            return
+
+        # One list + one batched inspect, rows are then built from plain records
+        containers = list_containers(all=all_containers or stopped or paused, filters=filters)
         if not containers:
             TextDisplay.info_text("No containers found.")
             return
 
-        # 2. Determine Active Columns
-        active_keys = []
-        if format:
-            requested_keys = parse_format_flag(format)
-            for k in requested_keys:
-                if k in COLUMN_CONFIG:
-                    active_keys.append(k)
-                else:
-                    TextDisplay.warn_text(f"Unknown column: {k}")
-        else:
-            active_keys = ["name", "image", "status", "ports"]
-            if show_id: active_keys.insert(0, "id")
-            if show_health: active_keys.append("health")
-            if show_network: active_keys.append("network")
-            if show_labels: active_keys.append("labels")
-            if show_mounts: active_keys.append("mounts")
-            if show_volume: active_keys.append("volumes")
+        if sampler is not None:
+            running = [c["id"] for c in containers if c["running"]]
+            sampler.track(running)
+            sampler.wait(running, timeout=STATS_TIMEOUT)
+        containers = order_containers([with_usage(c, sampler) for c in containers], sort=sort, top=top)
 
         # 3. Build & Show Table
-        columns = [{"header": "", "style": "white", "no_wrap": True}] # Indicator
-        columns.extend([COLUMN_CONFIG[k] for k in active_keys])
-        
-        table = TableDisplay(title="[bold blue]Mate Status[/bold blue]", columns=columns)
+        build_table([build_row(c, active_keys) for c in containers], active_keys).show()
+
+    except Exception as e:
+        TextDisplay.error_text(f"Error fetching container status: {str(e)}")
+    finally:
+        if sampler is not None:
+            sampler.close()
+
+def _status_records(
+    all_containers: bool,
+    stopped: bool,
+    paused: bool,
+    active_keys: list,
+    show_resources: bool,
+    sort: str,
+    top: int,
+    output: str,
+    watch: bool = False,
+    contexts: list = None,
+    host_timeout: float = 10,
+):
+    """
+    --output json|ndjson|csv: records are written as containers are inspected
+    (unless --sort/--top or resource columns need all of them first).
+    Errors go to stderr, so stdout only ever holds records.
+    """
+    def fail(message: str):
+        sys.stderr.write(f"Error: {message}\n")
+        raise typer.Exit(1)
+
+    if output not in OUTPUT_FORMATS:
+        fail(f"Unknown output format: {output} (use one of {', '.join(OUTPUT_FORMATS)})")
+    if watch:
+        fail("--watch only works with the table output")
+    if sort and sort not in SORT_KEYS:
+        fail(f"Unknown sort key: {sort} (use one of {', '.join(SORT_KEYS)})")
+    if show_resources:
+        active_keys.extend(k for k in RESOURCE_KEYS if k not in active_keys)
+    if sort in RESOURCE_KEYS and sort not in active_keys:
+        active_keys.append(sort)
+    if contexts and any(k in RESOURCE_KEYS for k in active_keys):
+        fail("Resource columns only work with the current Docker context")
+    if contexts and "host" not in active_keys:
+        active_keys.insert(0, "host")
+
+    filters = {}
+    if stopped: filters["status"] = "exited"
+    elif paused: filters["status"] = "paused"
+    listing = all_containers or stopped or paused
+
+    sampler = None
+    try:
+        if any(k in RESOURCE_KEYS for k in active_keys):
+            from app.services.stats_svc import ResourceSampler
+            sampler = ResourceSampler()
+
+        if contexts:
+            failed = []
 
-        for container in containers:
-            row = [get_status_indicator(container)]
-            row.extend([get_container_data(container, k) for k in active_keys])
-            
-            style = "green" if container.state.running else "yellow" if container.state.paused else "red"
-            table.add_row(row, style=style)
+            def report(context, result):
+                if result["error"]:
+                    failed.append(context)
+                    sys.stderr.write(f"Warning: {describe_host(context, result)}\n")
 
-        table.show()
+            containers = order_containers(fetch_contexts(contexts, listing, filters, host_timeout, report), sort, top)
+            if len(failed) == len(contexts):
+                fail("No Docker context could be reached")
+        elif sampler is None and not sort and not top:
+            containers = iter_containers(all=listing, filters=filters)
+        else:
+            containers = list(list_containers(all=listing, filters=filters))
+            if sampler is not None:
+                running = [c["id"] for c in containers if c["running"]]
+                sampler.track(running)
+                sampler.wait(running, timeout=STATS_TIMEOUT)
+            containers = order_containers([with_usage(c, sampler) for c in containers], sort=sort, top=top)
 
+        emit_records(containers, active_keys, output)
+    except BrokenPipeError:
+        # e.g. `mate status -o ndjson | head -1`
+        sys.stderr.close()
+    except typer.Exit:
+        raise
     except Exception as e:
-        TextDisplay.error_text(f"Error fetching container status: {str(e)}")
+        fail(f"Could not fetch container status: {e}")
+    finally:
+        if sampler is not None:
+            sampler.close()
 
 def status(
     all_containers: bool = typer.Option(False, "--all", "-a", help="Show all containers (default shows just running)"),
@@ -189,10 +599,28 @@ def status(
     show_labels: bool = typer.Option(False, "--labels", help="Show container labels"),
     show_mounts: bool = typer.Option(False, "--mounts", help="Show container mounts"),
     format: str = typer.Option(None, "--format", help="Custom format for status output (e.g., 'name,image,mounts' or '{{ name, image }}')"),
+    watch: bool = typer.Option(False, "--watch", "-w", help="Keep the table open and update it as containers change"),
+    refresh: float = typer.Option(4, "--refresh", help="Maximum redraws per second in --watch mode"),
+    show_resources: bool = typer.Option(False, "--resources", "-r", help="Show CPU, memory, network and block I/O usage and PIDs"),
+    sort: str = typer.Option(None, "--sort", help="Sort by name, cpu, mem, net, blkio or pids (resources: highest first)"),
+    top: int = typer.Option(None, "--top", help="Only show the first N containers (e.g. with --sort cpu)"),
+    output: str = typer.Option("table", "--output", "-o", help="Output format: table, json, ndjson or csv"),
+    context: str = typer.Option(None, "--context", help="Comma-separated Docker contexts to query concurrently (adds a HOST column)"),
+    all_contexts: bool = typer.Option(False, "--all-contexts", help="Query every configured Docker context"),
+    host_timeout: float = typer.Option(10, "--host-timeout", help="Seconds to wait for each Docker context"),
 ):
     """
     Shows a clean, beautiful table of container statuses with flexible formatting.
     """
+    contexts = [c.strip() for c in context.split(",") if c.strip()] if context else None
+    if all_contexts:
+        from app.services.docker_svc import list_contexts
+        try:
+            contexts = list_contexts()
+        except Exception as e:
+            from app.utils.ui import TextDisplay
+            TextDisplay.error_text(f"Error listing Docker contexts: {e}")
+            return
     _status(
         all_containers=all_containers,
         stopped=stopped,
@@ -203,5 +631,13 @@ def status(
         show_network=show_network,
         show_labels=show_labels,
         show_mounts=show_mounts,
-        format=format
+        format=format,
+        watch=watch,
+        refresh=refresh,
+        show_resources=show_resources,
+        sort=sort,
+        top=top,
+        output=output,
+        contexts=contexts,
+        host_timeout=host_timeout,
     )
@@ -1,3 +1,5 @@
+import json
+import threading
 import time
 import traceback
 from typer import Option, Exit
@@ -6,6 +8,9 @@ from pathlib import Path
 
 
 from app.utils import TextDisplay, TableDisplay
+from app.utils.stats import format_bytes
+from app.services.context_svc import LARGE_CONTEXT_BYTES
+from app.services.ports_svc import DEFAULT_PORT_RANGE
 from app.services import (
     detect_configuration, 
     start_compose, 
@@ -13,23 +18,607 @@ from app.services import (
     run_container,
     check_health, # http check
     check_host_port, # tcp check
-    check_internal_tcp, # internal docker check
-    load_compose, 
+    check_host_ports, # tcp check of port ranges
+    BatchProber, # internal docker check
+    resolve_compose,
+    dependency_levels,
+    dependents,
+    build_all,
+    compose_build_specs,
+    build_compose,
     classify_services, 
     get_service_internal_port,
     has_native_healthcheck,
-    get_project_containers,
+    get_project_snapshot,
     get_container_health,
-    has_nc,
-    get_image_exposed_ports,
-    ConfigType
+    analyze_dockerfile,
+    ConfigType,
+    run_checks,
+    inspect_containers,
+    compose_project_name,
+    ReadinessWaiter,
+    wait_for_probe,
+    cache_dir,
+    docker_host_is_local,
+    expand_port_spec,
+    format_port_range,
+    format_port_spec,
+    parse_port_range,
+    parse_port_spec,
+    preflight_ports,
+    probe_address,
+    published_host_port,
 )
 
+
+def _plan_service_check(
+    name: str,
+    svc_def,
+    exposed_services: dict,
+    internal_services: dict,
+    service_container_map: dict,
+    prober: BatchProber | None,
+    probe_timeout: float,
+    snapshot=None,
+    waiter: ReadinessWaiter | None = None,
+    wait_until: float | None = None,
+    slots: threading.Semaphore | None = None,
+):
+    """
+    Returns a zero-argument callable that checks a single compose service and
+    returns {"status": ..., "details": ...}. Nothing is probed until it is called.
+
+    With a `waiter`, checks keep waiting for the service until `wait_until`
+    (a time.monotonic() value): native checks follow Docker health events,
+    TCP checks retry with exponential backoff, each attempt holding one of `slots`.
+    """
+
+    def wait_or_once(probe, container_name: str | None = None) -> bool:
+        if waiter is None:
+            return probe()
+        abort = (lambda: waiter.failure_reason(container_name)) if container_name else None
+        is_up, _ = wait_for_probe(probe, wait_until, abort=abort, slots=slots)
+        return is_up
+
+    # 1. PRIORITY: Native Health Check
+    if has_native_healthcheck(svc_def):
+        container = service_container_map.get(name)
+        if not container:
+            return lambda: {"status": "DOWN", "details": "Container not found for native check"}
+
+        def native_check():
+            reason = None
+            if waiter is None:
+                health = get_container_health(container["name"], snapshot=snapshot)
+            else:
+                health, reason = waiter.wait_healthy(container["name"], wait_until)
+            if health == "healthy":
+                return {"status": "UP", "details": "Native Docker Health Check Passed"}
+            return {"status": "DOWN", "details": f"Native Check: {reason or health}"}
+        return native_check
+
+    # 2. Fallback: Exposed Check
+    if name in exposed_services:
+        container = service_container_map.get(name)
+        targets, skipped = [], []
+        for pd in exposed_services[name]:
+            try:
+                bindings = expand_port_spec(pd)
+            except (ValueError, KeyError, TypeError):
+                continue
+            for binding in bindings:
+                if binding["protocol"] != "tcp":
+                    skipped.append(binding)
+                    continue
+                # Ports without a fixed host port are looked up on the container
+                host_port = published_host_port(container, binding)
+                if host_port:
+                    targets.append((probe_address(binding["host_ip"]), host_port))
+        targets = list(dict.fromkeys(targets))
+
+        if not targets:
+            details = "Only UDP/SCTP ports published (not probed)" if skipped else "No host port found"
+            return lambda: {"status": "UNKNOWN", "details": details}
+
+        container_name = container["name"] if container else None
+
+        def exposed_check():
+            # All published ports (whole ranges included) are probed at once
+            probe, open_ports = _port_group_probe(targets, timeout=min(2, probe_timeout))
+            is_up = wait_or_once(probe, container_name)
+            return {"status": "UP" if is_up else "DOWN", "details": _describe_port_group(targets, open_ports)}
+        return exposed_check
+
+    # 3. Fallback: Internal Check
+    if name in internal_services:
+        if prober is None:
+            return lambda: {"status": "SKIPPED", "details": "No container or network to probe from"}
+
+        target_port = get_service_internal_port(svc_def)
+        if not target_port:
+            return lambda: {"status": "UNKNOWN", "details": "No internal port defined"}
+
+        # Use container name as hostname
+        target_host = name
+        container_name = None
+        if name in service_container_map:
+            target_host = container_name = service_container_map[name]["name"]
+        # Probed together with the other internal services, in one exec per round
+        prober.register(target_host, target_port)
+
+        def internal_check():
+            last = {}
+
+            def probe() -> bool:
+                last.update(prober.probe(target_host, target_port))
+                return last["success"]
+
+            is_up = wait_or_once(probe, container_name)
+            details = f"{target_host}:{target_port}"
+            if last.get("via"):
+                details += f" from {last['via']}"
+            if is_up and last.get("latency") is not None:
+                details += f" ({last['latency'] * 1000:.1f} ms)"
+            elif not is_up and last.get("message"):
+                details += f": {last['message']}"
+            return {"status": "UP" if is_up else "DOWN", "details": details}
+        return internal_check
+
+    return lambda: {"status": "UNKNOWN", "details": "Service not found in analysis?"}
+
+
+def _port_group_probe(targets: list[tuple[str, int]], timeout: float):
+    """
+    Returns (probe, open_ports): probe() connects to every port of `targets` that
+    did not accept a connection yet, all at once, and is true once they all have.
+    """
+    open_ports: set[tuple[str, int]] = set()
+
+    def probe() -> bool:
+        pending = [target for target in targets if target not in open_ports]
+        open_ports.update(target for target, is_open in check_host_ports(pending, timeout=timeout).items() if is_open)
+        return len(open_ports) == len(targets)
+    return probe, open_ports
+
+
+def _describe_port_group(targets: list[tuple[str, int]], open_ports: set) -> str:
+    if len(targets) == 1:
+        host, port = targets[0]
+        return f"{host}:{port} ({'Port Open' if open_ports else 'Port Closed'})"
+    hosts = sorted({host for host, _ in targets})
+    ports = sorted(port for _, port in targets)
+    label = f"{', '.join(hosts)}:{ports[0]}-{ports[-1]}"
+    if len(open_ports) == len(targets):
+        return f"{label} (all {len(targets)} ports open)"
+    closed = sorted(port for host, port in targets if (host, port) not in open_ports)
+    shown = ", ".join(map(str, closed[:5])) + (", ..." if len(closed) > 5 else "")
+    return f"{label} ({len(open_ports)}/{len(targets)} ports open, closed: {shown})"
+
+
+def _warn_large_context(name: str, scan: dict | None):
+    """Warns about build contexts big enough to slow every build down (node_modules, .git, ...)."""
+    if not scan or scan["size"] < LARGE_CONTEXT_BYTES:
+        return
+    largest = ", ".join(f"{entry['path']} ({format_bytes(entry['size'])})" for entry in scan["top"][:3])
+    TextDisplay.warn_text(
+        f"{name}: build context is {format_bytes(scan['size'])} in {scan['files']} files. "
+        f"Largest: {largest}. Consider adding them to .dockerignore."
+    )
+
+
+STATUS_STYLES = {"UP": "green", "BLOCKED": "yellow", "NOT STARTED": "yellow", "SKIPPED": "yellow"}
+
+
+def _pick_source_container(snapshot, exposed_services: dict) -> dict | None:
+    """
+    Picks the container internal checks run from: a running container,
+    preferably of an exposed service. The probe needs no tools in it (see probe_svc).
+    """
+    candidates = sorted(
+        (c for c in snapshot if c["running"]),
+        key=lambda c: c["service"] not in exposed_services,
+    )
+    return candidates[0] if candidates else None
+
+
+def _project_network(snapshot, project: str) -> str | None:
+    """The network a probe container joins: the project's default network, else any project network."""
+    networks = [n for c in snapshot for n in c["networks"]]
+    if f"{project}_default" in networks:
+        return f"{project}_default"
+    return networks[0] if networks else None
+
+
+def _completion_check(container: dict | None, waiter: ReadinessWaiter | None, wait_until: float):
+    """Check for one-shot services (depends_on: service_completed_successfully): UP once they exit with 0."""
+    def check():
+        if not container:
+            return {"status": "DOWN", "details": "Container not found"}
+        if waiter is None:
+            exit_code = container["exit_code"]
+            reason = "Still running" if exit_code is None else None
+        else:
+            exit_code, reason = waiter.wait_exited(container["name"], wait_until)
+        if exit_code == 0:
+            return {"status": "UP", "details": "Completed successfully"}
+        return {"status": "DOWN", "details": reason or f"Exited with code {exit_code}"}
+    return check
+
+
+def _unmet_condition(condition: str, outcome: dict | None, container: dict | None, waiter: ReadinessWaiter | None) -> str | None:
+    """Returns why a started dependency does not satisfy a depends_on condition, or None."""
+    if condition in ("service_healthy", "service_completed_successfully"):
+        if outcome and outcome["status"] != "UP":
+            return outcome["details"]
+        return None
+    # service_started: it only has to keep running
+    if container is None:
+        return "Container not found"
+    reason = waiter.failure_reason(container["name"]) if waiter else None
+    if reason and not (outcome and outcome["status"] == "UP"):
+        return reason
+    return None
+
+
+PORT_STATUS_STYLES = {"free": "green", "reused": "green", "remapped": "yellow", "conflict": "red"}
+
+
+def _preflight_host_ports(entries: list[tuple[str, object]], remap: bool, port_range: str, owned=None) -> list[list[dict] | None]:
+    """
+    Pre-flight: bind-tests every published host port of `entries` ((service, port spec)
+    pairs, ranges expanded) before anything is built, so a taken port doesn't fail
+    the startup halfway. Conflicts abort, or are moved to free ports of `port_range` with `remap`.
+
+    Returns the preflight_ports() results of each entry, one per expanded
+    port (None for specs left to Docker).
+    """
+    if not docker_host_is_local():
+        TextDisplay.debug_text("Docker runs on another host (DOCKER_HOST), skipping the host port check")
+        return [None] * len(entries)
+
+    expanded = []
+    for service, spec in entries:
+        try:
+            expanded.append(expand_port_spec(spec))
+        except (ValueError, KeyError, TypeError):
+            # Docker reports what it can't publish itself
+            expanded.append(None)
+    outcome = iter(preflight_ports(
+        [binding for bindings in expanded if bindings for binding in bindings],
+        remap=remap,
+        port_range=parse_port_range(port_range),
+        owned=owned,
+    ))
+    results = [[next(outcome) for _ in bindings] if bindings else None for bindings in expanded]
+
+    conflicts = [r for entry_results in results if entry_results for r in entry_results if r["status"] == "conflict"]
+    if remap or conflicts:
+        table = TableDisplay(
+            title="Host Ports",
+            columns=["Service", "Requested", "Mapping", "Status", "Held by"],
+        )
+        for (service, spec), entry_results in zip(entries, results):
+            if not entry_results or not isinstance(entry_results[0]["requested"], int):
+                continue
+            if all(r["status"] in ("free", "reused") for r in entry_results):
+                # Kept as requested: one row for the whole range
+                rows = [(format_port_spec(parse_port_spec(spec)), entry_results)]
+            else:
+                rows = [(format_port_spec(r["binding"]), [r]) for r in entry_results]
+            for mapping, row_results in rows:
+                status = row_results[0]["status"]
+                style = PORT_STATUS_STYLES[status]
+                table.add_row([
+                    service,
+                    format_port_range((row_results[0]["requested"], row_results[-1]["requested"])),
+                    mapping,
+                    f"[{style}]{status}[/{style}]",
+                    row_results[0]["holder"] or "",
+                ])
+        table.show()
+
+    if conflicts:
+        taken = ", ".join(f"{r['requested']} ({r['holder'] or 'in use'})" for r in conflicts[:10])
+        if len(conflicts) > 10:
+            taken += f" and {len(conflicts) - 10} more"
+        raise RuntimeError(f"Host port(s) not available: {taken}. Free them or run with --remap")
+    return results
+
+
+def _remapped_specs(spec, results: list[dict] | None) -> list:
+    """The port specs replacing `spec` after the pre-flight: itself, or one per port once one of them moved."""
+    if not results or not any(r["status"] == "remapped" for r in results):
+        return [spec]
+    if isinstance(spec, dict):
+        # Long syntax keeps its other keys (mode, name, app_protocol...)
+        return [{**spec, "published": r["binding"]["published"], "target": r["binding"]["target"]} for r in results]
+    return [format_port_spec(r["binding"]) for r in results]
+
+
+def _remap_compose_ports(project: str, services: dict, results: dict[str, list]) -> Path | None:
+    """
+    Writes a compose override replacing the `ports` of every service that had a
+    port remapped. Returns its path, or None when nothing moved.
+    """
+    lines = []
+    for name, service_results in results.items():
+        specs = [
+            new_spec
+            for spec, spec_results in zip(services[name]["ports"], service_results)
+            for new_spec in _remapped_specs(spec, spec_results)
+        ]
+        if specs == list(services[name]["ports"]):
+            continue
+        lines += [f"  {json.dumps(name)}:", "    ports: !override"]
+        # JSON is valid YAML and keeps long-syntax entries intact
+        lines += [f"      - {json.dumps(spec)}" for spec in specs]
+    if not lines:
+        return None
+
+    override = cache_dir("ports") / f"{project}.compose.yaml"
+    override.write_text("# Written by mate up --remap\nservices:\n" + "\n".join(lines) + "\n")
+    return override
+
+
+def _compose_up(
+    path: str,
+    pull: str,
+    files: list[str],
+    profiles: list[str],
+    concurrency: int,
+    probe_timeout: float,
+    deadline: float,
+    wait: bool,
+    keep_going: bool,
+    force: bool = False,
+    build_concurrency: int = 4,
+    build_cache: bool | None = None,
+    remap: bool = False,
+    port_range: str = DEFAULT_PORT_RANGE,
+) -> list[dict]:
+    """
+    Starts a compose project level by level along its depends_on graph and
+    health checks each level before starting the next one, so a failing
+    dependency is reported right away and the services depending on it are
+    not started (reported as BLOCKED).
+
+    Returns one {"name", "type", "status", "details"} row per service, in compose file order.
+    """
+    # Merged, interpolated and profile-filtered like `docker compose config`;
+    # every file is parsed once and cached across runs (keyed by mtime / content hash)
+    compose_data = resolve_compose(path, files=files, profiles=profiles)
+    services = compose_data["services"]
+    project_dir = Path(path).resolve()
+    project = compose_project_name(project_dir, files=files)
+
+    # Pre-flight: taken host ports are found before building; containers of this
+    # project may hold them already, since compose up replaces those
+    entries = {name: [(name, spec) for spec in svc_def["ports"]] for name, svc_def in services.items()}
+    checked = _preflight_host_ports(
+        [entry for service_entries in entries.values() for entry in service_entries],
+        remap=remap,
+        port_range=port_range,
+        owned=lambda container: container["project"] == project,
+    )
+    port_results = {}
+    for name, service_entries in entries.items():
+        port_results[name], checked = checked[:len(service_entries)], checked[len(service_entries):]
+    override = _remap_compose_ports(project, services, port_results) if remap else None
+    if override:
+        files = [*compose_data["files"], str(override)]
+        compose_data = resolve_compose(path, files=files, profiles=profiles)
+        services = compose_data["services"]
+
+    exposed_services, internal_services = classify_services(compose_data)
+    # Services that others wait on to finish (e.g. migrations) are checked for their exit code
+    one_shot = {
+        dependency
+        for svc_def in services.values()
+        for dependency, options in svc_def["depends_on"].items()
+        if options["condition"] == "service_completed_successfully"
+    }
+
+    # Build stage: images are built in parallel and skipped while their context is unchanged,
+    # so compose up below only builds what mate can't (e.g. remote contexts)
+    specs = compose_build_specs(project_dir, project, services)
+    if specs:
+        TextDisplay.info_text(f"Building {len(specs)} service image(s)...")
+        builds = build_all(specs, state_key=project, concurrency=build_concurrency, force=force, cache=build_cache)
+        warned = set()
+        for name, build in builds.items():
+            if specs[name]["context"] not in warned:
+                warned.add(specs[name]["context"])
+                _warn_large_context(name, build["context"])
+            if build["status"] == "failed":
+                TextDisplay.error_text(f"{name}: build failed: {build['details']}")
+            else:
+                TextDisplay.style_text(f"{name}: {build['details']}", style="cyan")
+        failed_builds = [name for name, build in builds.items() if build["status"] == "failed"]
+        if failed_builds:
+            raise RuntimeError(f"Image build failed for: {', '.join(failed_builds)}")
+
+    # Compose builds the rest itself (remote contexts, secrets, ssh, inline Dockerfiles...):
+    # compose up below runs with build=False, so it would only build images that don't exist yet
+    compose_builds = [name for name, svc_def in services.items() if svc_def.get("build") and name not in specs]
+    if compose_builds:
+        TextDisplay.info_text(f"Building with Compose: {', '.join(compose_builds)}")
+        build_compose(path, compose_files=files, profiles=profiles, services=compose_builds)
+
+    # Without waiting nothing can be verified between levels, so Compose orders the startup itself
+    levels = dependency_levels(compose_data) if wait else [list(services)]
+
+    outcomes: dict[str, dict] = {}
+    blocked: dict[str, str] = {}
+    deferred: list[str] = []
+    source_container = None
+
+    def check_services(names: list[str]):
+        """Health checks `names` (already started); returns (outcomes, snapshot, waiter)."""
+        nonlocal source_container
+
+        # One batched inspect for the whole project; every check reads from it.
+        # When waiting, Docker events keep the container state current from then on.
+        waiter = None
+        if wait:
+            waiter = ReadinessWaiter(
+                lambda: get_project_snapshot(path, refresh=True, files=files),
+                filters={"label": f"com.docker.compose.project={project}"},
+                timeout=deadline,
+            )
+            snapshot = waiter.snapshot
+        else:
+            snapshot = get_project_snapshot(path, refresh=True, files=files)
+        service_container_map = snapshot.by_service()
+        wait_until = time.monotonic() + deadline
+        # All waiting checks run at once, so each one gets the whole deadline;
+        # --concurrency bounds the probes they run, not the time they spend waiting
+        slots = threading.BoundedSemaphore(max(1, concurrency)) if waiter else None
+
+        if source_container is None:
+            source_container = _pick_source_container(snapshot, exposed_services)
+        network = _project_network(snapshot, project)
+        prober = None
+        if source_container or network:
+            prober = BatchProber(
+                source_container["name"] if source_container else None,
+                network,
+                timeout=min(2, probe_timeout),
+            )
+
+        checks = {}
+        for name in names:
+            svc_def = services[name]
+            if name in one_shot:
+                checks[name] = _completion_check(service_container_map.get(name), waiter, wait_until)
+                continue
+            if source_container is None and name in internal_services and not has_native_healthcheck(svc_def) and name not in deferred:
+                # Nothing to probe it from yet; checked again once the later levels are up
+                # (from one of their containers, or from a probe container as a last resort)
+                deferred.append(name)
+                continue
+            checks[name] = _plan_service_check(
+                name,
+                svc_def,
+                exposed_services,
+                internal_services,
+                service_container_map,
+                prober,
+                probe_timeout,
+                snapshot=snapshot,
+                waiter=waiter,
+                wait_until=wait_until,
+                slots=slots,
+            )
+
+        # Waiting checks are bounded by the deadline, not the per-probe timeout
+        try:
+            level_outcomes = run_checks(
+                checks,
+                concurrency=max(1, len(checks)) if waiter else concurrency,
+                probe_timeout=None if waiter else probe_timeout,
+                deadline=deadline + probe_timeout if waiter else deadline,
+                fallback=lambda name, message: {"status": "DOWN", "details": message},
+            )
+        except BaseException:
+            if waiter:
+                waiter.close()
+            raise
+        return level_outcomes, snapshot, waiter
+
+    for index, level in enumerate(levels):
+        to_start = [name for name in level if name not in blocked]
+        if not to_start:
+            continue
+
+        if len(levels) > 1:
+            TextDisplay.info_text(f"Starting level {index + 1}/{len(levels)}: {', '.join(to_start)}")
+            start_compose(path=path, pull=pull, compose_files=files, profiles=profiles, services=to_start, dependencies=False, build=False)
+        else:
+            start_compose(path=path, pull=pull, compose_files=files, profiles=profiles, build=False)
+
+        TextDisplay.info_text("Performing Health Checks...")
+        level_outcomes, snapshot, waiter = check_services(to_start)
+        outcomes.update(level_outcomes)
+        service_container_map = snapshot.by_service()
+
+        # Block everything downstream of a dependency that did not come up
+        failed = []
+        try:
+            for name in (n for later in levels[index + 1:] for n in later):
+                if name in blocked:
+                    continue
+                for dependency, options in services[name]["depends_on"].items():
+                    if dependency in blocked:
+                        blocked[name] = blocked[dependency]
+                        break
+                    if dependency not in level_outcomes and dependency not in to_start:
+                        continue
+                    reason = _unmet_condition(
+                        options["condition"],
+                        level_outcomes.get(dependency),
+                        service_container_map.get(dependency),
+                        waiter,
+                    )
+                    if reason:
+                        blocked[name] = f"{dependency} ({options['condition'].replace('service_', '')}): {reason}"
+                        if dependency not in failed:
+                            failed.append(dependency)
+                        break
+        finally:
+            if waiter:
+                waiter.close()
+
+        for dependency in failed:
+            subtree = [n for n in dependents(compose_data, dependency) if n in blocked]
+            TextDisplay.error_text(f"{dependency} did not come up, not starting: {', '.join(subtree)}")
+        if failed and not keep_going:
+            break
+
+    if deferred:
+        deferred_outcomes, _, waiter = check_services(deferred)
+        try:
+            outcomes.update(deferred_outcomes)
+        finally:
+            if waiter:
+                waiter.close()
+
+    results = []
+    for name, svc_def in services.items():
+        if name in one_shot:
+            service_type = "Job"
+        elif has_native_healthcheck(svc_def):
+            service_type = "Native"
+        else:
+            service_type = "Exposed" if name in exposed_services else "Internal"
+
+        if name in outcomes:
+            outcome = outcomes[name]
+        elif name in blocked:
+            outcome = {"status": "BLOCKED", "details": f"Blocked by {blocked[name]}"}
+        else:
+            outcome = {"status": "NOT STARTED", "details": "Startup stopped after a failed dependency (see --keep-going)"}
+        results.append({"name": name, "type": service_type, **outcome})
+    return results
+
+
 def up(
     path: str = Option(".", "--path", help="Path where the config file is present"),
-    port: List[str] = Option([], "-p", "--port", help="Port mappings in HOST:CONTAINER format (e.g. -p 8080:80)"),
+    port: List[str] = Option([], "-p", "--port", help="Port mappings like docker run -p: IP, ranges and protocol allowed (e.g. -p 8080:80, -p 127.0.0.1:8000-8010:8000-8010/udp)"),
     pull: str = Option("missing", help="Pull policy: always, missing, never. for compose"),
-    force: bool = Option(False, "-f", "--force", help="Force restart container")
+    force: bool = Option(False, "-f", "--force", help="Force restart container"),
+    concurrency: int = Option(8, "--concurrency", help="Maximum number of health checks running in parallel"),
+    probe_timeout: float = Option(10, "--probe-timeout", help="Seconds a single health check may take"),
+    deadline: float = Option(60, "--deadline", help="Seconds the health checks of one startup level may take"),
+    wait: bool = Option(True, "--wait/--no-wait", help="Wait for services to become ready (until --deadline) instead of checking once"),
+    file: List[str] = Option([], "--file", help="Compose file(s) to merge, in order (default: compose file + its override)"),
+    profile: List[str] = Option([], "--profile", help="Enable a compose profile (repeatable, default: COMPOSE_PROFILES)"),
+    keep_going: bool = Option(False, "--keep-going", help="When a dependency fails, still start the services that don't depend on it"),
+    build_concurrency: int = Option(4, "--build-concurrency", help="Maximum number of images built in parallel"),
+    build_cache: bool = Option(None, "--build-cache/--no-build-cache", help="Export/import a local BuildKit cache per image (default: when the builder supports it)"),
+    dockerfile: str = Option(None, "--dockerfile", help="Dockerfile to build, relative to --path (default: Dockerfile)"),
+    target: str = Option(None, "--target", help="Dockerfile stage to build (default: the last one)"),
+    remap: bool = Option(False, "--remap", help="Move published host ports that are already taken to free ports of --port-range"),
+    port_range: str = Option(DEFAULT_PORT_RANGE, "--port-range", help="Host ports --remap may use, as START-END (default: MATE_PORT_RANGE or 20000-20999)"),
 ):
     
     try:
@@ -38,146 +627,33 @@ def up(
         TextDisplay.error_text(f"Error: {e}")
         Exit(1)
 
+    if dockerfile:
+        config_mode = ConfigType.DOCKERFILE
+    elif file:
+        config_mode = ConfigType.COMPOSE
+
     if config_mode == ConfigType.NONE:
         TextDisplay.error_text("Config files didn't present in current directory")
         Exit(1)
     
     try:
         if config_mode == ConfigType.COMPOSE:
-            start_compose(path=path, pull=pull)
-            
-
-            TextDisplay.info_text("Performing Health Checks...")
-            
-            compose_path = None
-
-            p = Path(path).resolve()
-            possible_files = ["compose.yaml", "compose.yml", "docker-compose.yaml", "docker-compose.yml"]
-            for f in possible_files:
-                if (p / f).exists():
-                    compose_path = p / f
-                    break
-            
-            if not compose_path:
-                TextDisplay.error_text("Compose file found during detection but lost now?")
-                return
-
-            compose_data = load_compose(str(compose_path))
-            exposed_services, internal_services = classify_services(compose_data)
-            
-            results = []
-
-            # Check Services
-            
-            # Map of service name to container (if found)
-            containers = get_project_containers(path)
-            service_container_map = {}
-            if containers:
-                for c in containers:
-                    # Check for labels in potential locations
-                    labels = {}
-                    if hasattr(c, 'labels'):
-                         labels = c.labels
-                    elif hasattr(c, 'config') and hasattr(c.config, 'labels'):
-                         labels = c.config.labels
-                    
-                    svc_name = labels.get("com.docker.compose.service")
-                    if svc_name:
-                        service_container_map[svc_name] = c
-
-            
-            # Helper to check if we can run internal checks
-            source_container = None
-            if containers:
-                candidate_fallback = None
-                candidate_exposed = None
-
-                for c in containers:
-                    if not has_nc(c.name):
-                        continue
-                    
-                    # Check for labels in potential locations
-                    labels = {}
-                    if hasattr(c, 'labels'):
-                         labels = c.labels
-                    elif hasattr(c, 'config') and hasattr(c.config, 'labels'):
-                         labels = c.config.labels
-                    
-                    service_name = labels.get("com.docker.compose.service")
-                    if service_name and service_name in exposed_services:
-                        candidate_exposed = c
-                        break 
-                    
-                    if candidate_fallback is None:
-                        candidate_fallback = c
-                
-                source_container = candidate_exposed or candidate_fallback
-
-
-            all_services = set(exposed_services.keys()) | set(internal_services.keys())
-            
-            for name in all_services:
-                # Get service definition
-                svc_def = exposed_services.get(name) or internal_services.get(name)
-                
-                status = "UNKNOWN"
-                details = "Service not found in analysis?"
-                
-                # 1. PRIORITY: Native Health Check
-                if has_native_healthcheck(svc_def):
-                    container = service_container_map.get(name)
-                    if container:
-                        health = get_container_health(container.name)
-                        if health == "healthy":
-                            status = "UP"
-                            details = "Native Docker Health Check Passed"
-                        else:
-                            status = "DOWN"
-                            details = f"Native Check: {health}"
-                    else:
-                        status = "DOWN"
-                        details = "Container not found for native check"
-                
-                # 2. Fallback: Exposed Check
-                elif name in exposed_services:
-                    port_def = exposed_services[name]
-                    host_port = None
-                    for pd in port_def:
-                        if isinstance(pd, str):
-                            host_port = int(pd.split(":")[0])
-                        elif isinstance(pd, dict) and "published" in pd:
-                            host_port = int(pd["published"])
-                        if host_port: break
-                    
-                    if host_port:
-                        is_up = check_host_port(host_port)
-                        status = "UP" if is_up else "DOWN"
-                        details = f"localhost:{host_port} ({'Port Open' if is_up else 'Port Closed'})"
-                    else:
-                        details = "No host port found"
-
-                # 3. Fallback: Internal Check
-                elif name in internal_services:
-                    if source_container:
-                        target_port = get_service_internal_port(svc_def)
-                        if target_port:
-                            # Use container name as hostname
-                            target_host = name
-                            if name in service_container_map:
-                                target_host = service_container_map[name].name
-                            TextDisplay.style_text(f"Checking {target_host}:{target_port} from {source_container.name}", style="cyan")
-                            is_up = check_internal_tcp(source_container.name, target_host, target_port)
-                            status = "UP" if is_up else "DOWN"
-                            details = f"{target_host}:{target_port} from {source_container.name}"
-                        else:
-                            details = "No internal port defined"
-                    else:
-                        status = "SKIPPED"
-                        details = "No source container for internal check"
-
-                results.append({"name": name, "type": "Native" if has_native_healthcheck(svc_def) else ("Exposed" if name in exposed_services else "Internal"), "status": status, "details": details})
-
-
+            results = _compose_up(
+                path,
+                pull=pull,
+                files=file,
+                profiles=profile,
+                concurrency=concurrency,
+                probe_timeout=probe_timeout,
+                deadline=deadline,
+                wait=wait,
+                keep_going=keep_going,
+                force=force,
+                build_concurrency=build_concurrency,
+                build_cache=build_cache,
+                remap=remap,
+                port_range=port_range,
+            )
 
             # Display Report
             table = TableDisplay(
@@ -186,7 +662,7 @@ def up(
             )
 
             for res in results:
-                status_style = "green" if res["status"] == "UP" else "red"
+                status_style = STATUS_STYLES.get(res["status"], "red")
                 table.add_row([
                     res["name"], 
                     res["type"], 
@@ -198,40 +674,71 @@ def up(
 
 
         if config_mode == ConfigType.DOCKERFILE:
-            # Check exposed ports
-            dockerfile_path = Path(path).resolve() / "Dockerfile"
-            exposed_ports = get_image_exposed_ports(str(dockerfile_path))
+            # Ports, health check and stage come from the stage that gets built (cached per Dockerfile)
+            analysis = analyze_dockerfile(Path(path).resolve() / (dockerfile or "Dockerfile"), target=target)
+            stage = analysis["target"]
+            if len(analysis["stages"]) > 1:
+                TextDisplay.info_text(
+                    f"Build target: stage {stage['name'] or stage['index']} "
+                    f"({stage['index'] + 1} of {len(analysis['stages'])})"
+                )
+            exposed_ports = stage["expose"]
+            healthcheck_http = (stage["healthcheck"] or {}).get("http")
             
-            # User ports are in format HOST:CONTAINER
+            # User ports are in format [IP:]HOST:CONTAINER[/PROTOCOL]
             # We need to check if CONTAINER port is in exposed_ports
             if exposed_ports:
+                exposed = {
+                    (b["target"], b["protocol"]): ep for ep in exposed_ports for b in expand_port_spec(ep)
+                }
+
+                def same_port(spec) -> str:
+                    parsed = parse_port_spec(spec)
+                    return format_port_spec({**parsed, "published": parsed["target"]})
+
                 if not port:
                     # Case 1: auto-map exposed ports
-                    port = [f"{p}:{p}" for p in exposed_ports]
+                    port = [same_port(p) for p in exposed_ports]
                     TextDisplay.warn_text(f"No ports provided. Auto-mapping exposed ports: {port}")
                 else: 
                     # Case 2: validate user provided ports and merge missing exposed ports
-                    user_mapped_container_ports = set()
+                    user_mapped = set()
                     for p in port:
-                        parts = p.split(":")
-                        if len(parts) >= 2:
-                            container_port = parts[-1]
-                            user_mapped_container_ports.add(container_port)
-                            if container_port not in exposed_ports:
-                                TextDisplay.warn_text(f"Warning: Port {container_port} is mapped but not exposed in Dockerfile (Exposed: {', '.join(exposed_ports)})")
+                        for binding in expand_port_spec(p):
+                            key = (binding["target"], binding["protocol"])
+                            user_mapped.add(key)
+                            if key not in exposed:
+                                label = format_port_spec({**binding, "host_ip": "", "published": None})
+                                TextDisplay.warn_text(f"Warning: Port {label} is mapped but not exposed in Dockerfile (Exposed: {', '.join(exposed_ports)})")
                     
-                    # Add missing exposed ports
+                    # Add missing exposed ports (a range only where none of it is mapped)
                     added_ports = []
                     for ep in exposed_ports:
-                        if ep not in user_mapped_container_ports:
-                            mapping = f"{ep}:{ep}"
-                            port.append(mapping)
-                            added_ports.append(mapping)
+                        missing = [key for key, spec in exposed.items() if spec == ep and key not in user_mapped]
+                        if len(missing) == len(expand_port_spec(ep)):
+                            added_ports.append(same_port(ep))
+                        else:
+                            added_ports.extend(same_port(f"{target_port}/{protocol}") for target_port, protocol in missing)
+                    port.extend(added_ports)
                     
                     if added_ports:
                         TextDisplay.warn_text(f"Added missing exposed ports: {added_ports}")
 
-            img = build_dockerfile(path=path)
+            # Pre-flight before the build; with --force the previous container (and its ports) is replaced
+            container_name = f"{Path(path).resolve().name}_app"
+            checked = _preflight_host_ports(
+                [("app", p) for p in port],
+                remap=remap,
+                port_range=port_range,
+                owned=lambda c: force and c["name"] == container_name,
+            )
+            port = [new_spec for p, results in zip(port, checked) for new_spec in _remapped_specs(p, results)]
+
+            img, build = build_dockerfile(
+                path=path, force=force, cache=build_cache, return_result=True,
+                dockerfile=dockerfile, target=target,
+            )
+            _warn_large_context(img, build["context"])
             TextDisplay.warn_text(f"{img} is completely build ....")
 
             container = run_container(
@@ -241,31 +748,108 @@ def up(
                 detach=True
             )
             
-            time.sleep(2)
-            
             TextDisplay.warn_text(f"Starting {container} ....")
 
             TextDisplay.warn_text("Perfoming health check ....")
-            host_port = [int(p.split(":",1)[0]) for p in port]
+            # One check per published port; a range is probed as a group, all its ports at once
+            groups = {}
+            record = None
+            for p in port:
+                bindings = expand_port_spec(p)
+                if any(not isinstance(b["published"], int) for b in bindings) and record is None:
+                    # Host ports picked by Docker are read back from the container
+                    record = next(iter(inspect_containers([container])), None)
+                targets = []
+                for binding in bindings:
+                    host_port = published_host_port(record, binding)
+                    if binding["protocol"] == "tcp" and host_port:
+                        targets.append((probe_address(binding["host_ip"]), host_port))
+                groups[format_port_spec(parse_port_spec(p))] = (targets, bindings)
             
             table = TableDisplay(
                 title="Container Health Report",
                 columns=["Port", "Status", "Message"]
             )
 
-            for p in host_port:
-                # Try HTTP first for Dockerfile single service
-                res = check_health(f"http://localhost:{p}", max_retries=5)
-                if res["success"]:
-                     table.add_row([f"{p}", "[green]UP[/green]", res["message"]])
-                else:
+            # Follow the container through Docker events so a crash ends the wait right away
+            waiter = None
+            if wait:
+                waiter = ReadinessWaiter(
+                    lambda: inspect_containers([container]),
+                    filters={"container": container},
+                    timeout=deadline,
+                )
+            wait_until = time.monotonic() + deadline
+            slots = threading.BoundedSemaphore(max(1, concurrency))
+
+            def port_check(host: str, p: int, http_path: str = ""):
+                def check():
+                    last = {"http": None, "tcp_only": 0}
+                    url_host = f"[{host}]" if ":" in host else host
+
+                    def probe() -> bool:
+                        # Try HTTP first for Dockerfile single service
+                        last["http"] = check_health(f"http://{url_host}:{p}{http_path}", max_retries=1, timeout=probe_timeout, delay=0)
+                        if last["http"]["success"]:
+                            return True
+                        # A port that keeps accepting TCP but never speaks HTTP is as ready as it gets
+                        last["tcp_only"] = last["tcp_only"] + 1 if check_host_port(p, host=host) else 0
+                        return last["tcp_only"] >= 3
+
+                    if waiter:
+                        wait_for_probe(probe, wait_until, abort=lambda: waiter.failure_reason(container), slots=slots)
+                    else:
+                        probe()
+
+                    if last["http"]["success"]:
+                        return ["[green]UP[/green]", last["http"]["message"]]
                     # Fallback to TCP
-                    is_up = check_host_port(p)
-                    if is_up:
-                         table.add_row([f"{p}", "[green]UP (TCP)[/green]", "Port is open, but HTTP failed"])
+                    if last["tcp_only"] or check_host_port(p, host=host):
+                        return ["[green]UP (TCP)[/green]", "Port is open, but HTTP failed"]
+                    reason = waiter.failure_reason(container) if waiter else None
+                    return ["[red]DOWN[/red]", reason or "Port unreachable"]
+                return check
+
+            def range_check(targets: list[tuple[str, int]]):
+                def check():
+                    probe, open_ports = _port_group_probe(targets, timeout=min(2, probe_timeout))
+                    if waiter:
+                        is_up, _ = wait_for_probe(probe, wait_until, abort=lambda: waiter.failure_reason(container), slots=slots)
                     else:
-                         table.add_row([f"{p}", "[red]DOWN[/red]", "Port unreachable"])
-            
+                        is_up = probe()
+                    details = _describe_port_group(targets, open_ports)
+                    return ["[green]UP (TCP)[/green]" if is_up else "[red]DOWN[/red]", details]
+                return check
+
+            checks = {}
+            for label, (targets, bindings) in groups.items():
+                if not targets:
+                    udp = all(b["protocol"] != "tcp" for b in bindings)
+                    message = "UDP/SCTP ports are not probed" if udp else "Host port not found"
+                    checks[label] = lambda message=message: ["[yellow]SKIPPED[/yellow]", message]
+                elif len(targets) == 1:
+                    # The endpoint the image's own HEALTHCHECK calls, when it is on this port
+                    http_path = ""
+                    if healthcheck_http and bindings[0]["target"] == healthcheck_http["port"]:
+                        http_path = healthcheck_http["path"]
+                    checks[label] = port_check(*targets[0], http_path=http_path)
+                else:
+                    checks[label] = range_check(targets)
+
+            # Checks wait on their own, so only the overall deadline applies here;
+            # waiting ones all run at once and share --concurrency probe slots
+            outcomes = run_checks(
+                checks,
+                concurrency=max(1, len(checks)) if waiter else concurrency,
+                probe_timeout=None,
+                deadline=deadline + probe_timeout,
+                fallback=lambda p, message: ["[red]DOWN[/red]", message],
+            )
+            if waiter:
+                waiter.close()
+            for p, (status, message) in outcomes.items():
+                table.add_row([f"{p}", status, message])
+
             table.show()
 
     except Exception as e:
@@ -1,58 +1,106 @@
-from .net_svc import (
-    check_health,
-    check_host_port,
-    check_internal_tcp,
-    has_nc
-)
-from .git_svc import clone_repo
-from .yaml_svc import (
-    load_compose, 
-    classify_services, 
-    extract_ports_from_compose,
-    get_service_internal_port,
-    has_native_healthcheck
-)
-
-from .docker_svc import (
-    detect_configuration, 
-    start_compose, 
-    run_container, 
-    build_dockerfile,
-    get_project_containers,
-    get_container_health,
-    get_image_exposed_ports,
-    ConfigType,
-    PullPolicy,
-    compose_logs,
-    container_logs,
-    container_shell,
-    compose_down,
-    container_down
-)
-
-__all__ = [
-    "check_health",
-    "check_host_port",
-    "check_internal_tcp",
-    "has_nc",
-    "clone_repo",
-    "load_compose",
-    "classify_services",
-    "extract_ports_from_compose",
-    "get_service_internal_port",
-    "has_native_healthcheck",
-    "detect_configuration", 
-    "start_compose", 
-    "run_container", 
-    "build_dockerfile",
-    "get_project_containers",
-    "get_container_health",
-    "get_image_exposed_ports",
-    "ConfigType",
-    "PullPolicy",
-    "compose_logs",
-    "container_logs",
-    "container_shell",
-    "compose_down",
-    "container_down"
-]
+from importlib import import_module
+
+# Public name -> submodule that defines it.
+# Submodules are imported on first attribute access so that commands only
+# pay for the dependencies they use (GitPython, requests, PyYAML, docker).
+_EXPORTS = {
+    "check_health": "net_svc",
+    "check_endpoints": "net_svc",
+    "check_host_port": "net_svc",
+    "check_host_ports": "net_svc",
+    "probe_targets": "probe_svc",
+    "BatchProber": "probe_svc",
+    "parse_port_spec": "ports_svc",
+    "format_port_spec": "ports_svc",
+    "format_port_range": "ports_svc",
+    "expand_port_spec": "ports_svc",
+    "published_host_port": "ports_svc",
+    "probe_address": "ports_svc",
+    "parse_port_range": "ports_svc",
+    "port_in_use": "ports_svc",
+    "scan_host_ports": "ports_svc",
+    "find_port_holders": "ports_svc",
+    "allocate_ports": "ports_svc",
+    "preflight_ports": "ports_svc",
+    "docker_host_is_local": "ports_svc",
+    "clone_repo": "git_svc",
+    "build_compose_model": "yaml_svc",
+    "resolve_compose": "compose_svc",
+    "discover_compose_files": "compose_svc",
+    "interpolate": "compose_svc",
+    "dependency_levels": "compose_svc",
+    "dependents": "compose_svc",
+    "ComposeError": "compose_svc",
+    "build_all": "build_svc",
+    "scan_context": "context_svc",
+    "DockerIgnore": "context_svc",
+    "compose_build_specs": "build_svc",
+    "cache_dir": "cache_svc",
+    "cached_file_model": "cache_svc",
+    "classify_services": "yaml_svc",
+    "get_service_internal_port": "yaml_svc",
+    "has_native_healthcheck": "yaml_svc",
+    "detect_configuration": "docker_svc",
+    "start_compose": "docker_svc",
+    "build_compose": "docker_svc",
+    "run_container": "docker_svc",
+    "build_dockerfile": "docker_svc",
+    "get_container_health": "docker_svc",
+    "get_project_snapshot": "docker_svc",
+    "inspect_containers": "docker_svc",
+    "image_id": "docker_svc",
+    "list_containers": "docker_svc",
+    "iter_containers": "docker_svc",
+    "list_contexts": "docker_svc",
+    "list_context_containers": "docker_svc",
+    "snapshot_contexts": "docker_svc",
+    "container_exists": "docker_svc",
+    "container_exec": "docker_svc",
+    "get_transport": "docker_svc",
+    "Transport": "docker_svc",
+    "EngineClient": "engine_svc",
+    "EngineError": "engine_svc",
+    "ContainerSnapshot": "snapshot_svc",
+    "analyze_dockerfile": "dockerfile_svc",
+    "ConfigType": "docker_svc",
+    "PullPolicy": "docker_svc",
+    "compose_logs": "docker_svc",
+    "container_logs": "docker_svc",
+    "container_shell": "docker_svc",
+    "show_logs": "docker_svc",
+    "stream_container_logs": "docker_svc",
+    "merge_streams": "log_svc",
+    "LogStore": "logstore_svc",
+    "search_logs": "logstore_svc",
+    "LineFilter": "log_svc",
+    "BufferedLogWriter": "log_svc",
+    "iter_lines": "log_svc",
+    "compose_down": "docker_svc",
+    "container_down": "docker_svc",
+    "run_checks": "scheduler_svc",
+    "compose_project_name": "docker_svc",
+    "stream_events": "docker_svc",
+    "ReadinessWaiter": "readiness_svc",
+    "ContainerWatcher": "watch_svc",
+    "ResourceSampler": "stats_svc",
+    "stream_stats": "docker_svc",
+    "wait_for_probe": "readiness_svc",
+    "backoff_delays": "readiness_svc",
+}
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
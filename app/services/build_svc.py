@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from app.services.cache_svc import cache_dir, read_json, write_json
+from app.services.scheduler_svc import run_checks
+
+# Bump when the fingerprint inputs change, so older build records never match
+BUILD_STATE_VERSION = 2
+
+# Compose `build:` keys mate's own builds honor. Services using any other key
+# (secrets, ssh, additional_contexts, dockerfile_inline, platforms...) are built by Compose.
+MATE_BUILD_KEYS = {"context", "dockerfile", "args", "target"}
+
+
+def compose_build_specs(project_dir: Path, project: str, services: dict) -> dict[str, dict]:
+    """
+    Returns {service: spec} for the compose services mate can build itself,
+    where spec is {"context", "dockerfile", "args", "target", "image"}.
+    Services without a build section, with a remote (git/URL) context or with
+    build options outside MATE_BUILD_KEYS are left to Compose.
+    """
+    specs = {}
+    for name, service in services.items():
+        build = service.get("build")
+        if not build:
+            continue
+        if isinstance(build, str):
+            build = {"context": build}
+        if any(key not in MATE_BUILD_KEYS and not key.startswith("x-") for key in build):
+            continue
+
+        context = str(build.get("context") or ".")
+        if "://" in context or context.startswith("git@"):
+            continue
+        context_dir = (project_dir / context).resolve()
+
+        args = build.get("args") or {}
+        if isinstance(args, list):
+            args = dict(a.split("=", 1) if "=" in a else (a, None) for a in args)
+        # A bare `ARG` entry takes its value from the environment, like Compose
+        args = {k: str(v) if v is not None else os.environ.get(k) for k, v in args.items()}
+
+        specs[name] = {
+            "context": str(context_dir),
+            "dockerfile": str(context_dir / build.get("dockerfile", "Dockerfile")),
+            "args": {k: v for k, v in args.items() if v is not None},
+            "target": build.get("target"),
+            # Compose names built images <project>-<service> unless `image:` is set
+            "image": service.get("image") or f"{project}-{name}",
+        }
+    return specs
+
+
+def context_fingerprint(spec: dict) -> tuple[str, dict]:
+    """
+    Hashes everything a build depends on: the context as Docker sends it
+    (see context_svc.scan_context), the Dockerfile, build args and target.
+
+    Returns:
+        tuple: (fingerprint, context scan)
+    """
+    from app.services.context_svc import scan_context
+
+    scan = scan_context(spec["context"], spec["dockerfile"])
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {k: spec[k] for k in ("dockerfile", "args", "target")}, sort_keys=True
+    ).encode())
+    dockerfile = Path(spec["dockerfile"])
+    if dockerfile.exists():
+        digest.update(dockerfile.read_bytes())
+    digest.update(scan["fingerprint"].encode())
+    return digest.hexdigest(), scan
+
+
+def supports_cache_export() -> bool:
+    """
+    Local cache export/import needs a BuildKit builder such as the
+    docker-container driver; the default `docker` driver rejects it.
+    """
+    from app.services.docker_svc import docker
+    try:
+        return docker.buildx.inspect().driver != "docker"
+    except Exception:
+        return False
+
+
+def build_image(spec: dict, cache: bool = False):
+    """
+    Builds one image with BuildKit. With `cache`, layers are imported from and
+    exported to a local cache directory per image (type=local, mode=max).
+    """
+    from app.services.docker_svc import docker
+
+    cache_from = cache_to = None
+    if cache:
+        directory = cache_dir("buildkit", spec["image"].replace("/", "_").replace(":", "_"))
+        if (directory / "index.json").exists():
+            cache_from = {"type": "local", "src": str(directory)}
+        cache_to = {"type": "local", "dest": str(directory), "mode": "max"}
+
+    docker.build(
+        context_path=spec["context"],
+        file=spec["dockerfile"],
+        build_args=spec["args"],
+        target=spec["target"],
+        tags=[spec["image"]],
+        cache_from=cache_from,
+        cache_to=cache_to,
+        load=True,
+        # Output is captured: parallel builds would interleave on the terminal
+        progress=False,
+    )
+
+
+def _error_summary(error: Exception) -> str:
+    lines = [line.strip() for line in str(error).splitlines() if line.strip()]
+    return lines[-1] if lines else error.__class__.__name__
+
+
+def build_all(
+    specs: dict[str, dict],
+    state_key: str,
+    concurrency: int = 4,
+    force: bool = False,
+    cache: bool | None = None,
+) -> dict[str, dict]:
+    """
+    Builds the given images in parallel (at most `concurrency` at once).
+
+    An image is skipped when its context fingerprint matches the last
+    successful build recorded under `state_key` and that image still exists.
+    Services sharing one build spec are built once. `cache` enables the local
+    BuildKit cache (None: only when the builder supports it).
+
+    Returns:
+        dict: {service: {"status": "built" | "unchanged" | "failed", "image", "details", "context"}}
+        where "context" is the context scan (size, largest entries) or None.
+    """
+    from app.services.docker_svc import image_id
+
+    state_path = cache_dir("builds") / f"{hashlib.sha1(state_key.encode()).hexdigest()}.json"
+    state = read_json(state_path)
+    if not isinstance(state, dict) or state.get("version") != BUILD_STATE_VERSION:
+        state = {"version": BUILD_STATE_VERSION, "images": {}}
+
+    if cache is None and specs:
+        cache = supports_cache_export()
+
+    # One build per distinct spec, e.g. api and worker built from the same context
+    groups: dict[str, list[str]] = {}
+    for name, spec in specs.items():
+        groups.setdefault(json.dumps(spec, sort_keys=True), []).append(name)
+
+    def plan(spec: dict):
+        def build():
+            started = time.monotonic()
+            fingerprint, scan = context_fingerprint(spec)
+            record = state["images"].get(spec["image"])
+            if not force and record and record["fingerprint"] == fingerprint:
+                if image_id(spec["image"]) == record["image_id"]:
+                    return {"status": "unchanged", "details": "Context unchanged, build skipped", "fingerprint": fingerprint, "context": scan}
+            try:
+                build_image(spec, cache=cache)
+            except Exception as e:
+                return {"status": "failed", "details": _error_summary(e), "fingerprint": None, "context": scan}
+            duration = time.monotonic() - started
+            return {"status": "built", "details": f"Built in {duration:.1f}s", "fingerprint": fingerprint, "context": scan}
+        return build
+
+    outcomes = run_checks(
+        {key: plan(specs[names[0]]) for key, names in groups.items()},
+        concurrency=concurrency,
+        probe_timeout=None,
+        deadline=None,
+        fallback=lambda key, message: {"status": "failed", "details": message, "fingerprint": None, "context": None},
+    )
+
+    results = {}
+    for key, outcome in outcomes.items():
+        image = specs[groups[key][0]]["image"]
+        if outcome["status"] == "built":
+            state["images"][image] = {"fingerprint": outcome["fingerprint"], "image_id": image_id(image)}
+        for name in groups[key]:
+            results[name] = {
+                "status": outcome["status"],
+                "image": image,
+                "details": outcome["details"],
+                "context": outcome["context"],
+            }
+    write_json(state_path, state)
+    return results
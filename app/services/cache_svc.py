@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+
+def cache_dir(*parts: str) -> Path:
+    """
+    Returns (and creates) a directory under mate's cache root:
+    MATE_CACHE_DIR, else $XDG_CACHE_HOME/mate, else ~/.cache/mate.
+    """
+    root = os.environ.get("MATE_CACHE_DIR")
+    if root:
+        base = Path(root)
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "mate"
+    directory = base.joinpath(*parts)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def read_json(path: Path) -> Any:
+    """Reads a JSON cache file, returning None when it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, data: Any):
+    """Writes a JSON cache file atomically; failures (e.g. read-only home) are ignored."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+# In-process memo, so the same file is only looked up once per command
+_memo: dict[tuple[str, str], tuple[int, int, Any]] = {}
+
+
+def cached_file_model(
+    path: str | Path,
+    namespace: str,
+    parse: Callable[[bytes], Any],
+    version: int = 1,
+) -> Any:
+    """
+    Returns parse(<file contents>) for `path`, cached on disk under `namespace`.
+
+    The cache entry is keyed by the resolved path. It is reused as-is while the
+    file's mtime and size are unchanged; otherwise the content hash decides
+    (a touched but unchanged file is not parsed again). `version` invalidates
+    entries written by an older model format.
+    """
+    path = Path(path).expanduser().resolve()
+    stat = path.stat()
+
+    memo_key = (namespace, str(path))
+    memo = _memo.get(memo_key)
+    if memo and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+        return memo[2]
+
+    entry_path = cache_dir(namespace) / f"{hashlib.sha1(str(path).encode()).hexdigest()}.json"
+    entry = read_json(entry_path)
+    if not isinstance(entry, dict) or entry.get("version") != version or entry.get("path") != str(path):
+        entry = None
+
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        model = entry["model"]
+    else:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == digest:
+            model = entry["model"]
+        else:
+            model = parse(data)
+        write_json(entry_path, {
+            "version": version,
+            "path": str(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "model": model,
+        })
+
+    _memo[memo_key] = (stat.st_mtime_ns, stat.st_size, model)
+    return model
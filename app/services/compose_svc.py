@@ -0,0 +1,485 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from app.services.cache_svc import cached_file_model
+from app.services.yaml_svc import SafeLoader, build_compose_model, normalize_depends_on, ComposeModel
+
+# Bump when the cached per-file document format changes
+COMPOSE_DOCUMENT_VERSION = 2
+
+# Looked up in this order, like `docker compose` does
+DEFAULT_FILES = ["compose.yaml", "compose.yml", "docker-compose.yaml", "docker-compose.yml"]
+
+# Escapes decoded in double-quoted .env values; anything else stays as written
+_ENV_ESCAPE_RE = re.compile(r'\\([nt"\\])')
+_ENV_ESCAPES = {"n": "\n", "t": "\t"}
+
+# Compose merge rules (https://docs.docker.com/compose/multiple-compose-files/merge/)
+# Keys whose override value replaces the base value instead of being merged
+REPLACED_KEYS = {"command", "entrypoint", "test", "profiles"}
+# Keys given either as a list of KEY=VALUE or as a mapping; merged as mappings
+MAPPING_KEYS = {"environment", "labels", "extra_hosts", "args", "sysctls", "annotations"}
+# Sequences merged by a key, the later entry wins
+KEYED_SEQUENCES = {
+    "volumes": lambda v: _volume_target(v),
+    "secrets": lambda v: v.get("source") if isinstance(v, dict) else v,
+    "configs": lambda v: v.get("source") if isinstance(v, dict) else v,
+}
+
+# Marker left in documents for the `!reset` and `!override` YAML tags
+TAG_KEY = "__compose_tag__"
+
+
+class ComposeError(ValueError):
+    """Raised when compose files can't be resolved (missing file, bad interpolation, extends cycle)."""
+
+
+# --- loading ---
+class _ComposeLoader(SafeLoader):
+    """SafeLoader that understands the Compose `!reset` / `!override` tags."""
+
+
+def _tagged(tag: str):
+    def construct(loader, node):
+        if isinstance(node, yaml.MappingNode):
+            value = loader.construct_mapping(node, deep=True)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_scalar(node)
+        return {TAG_KEY: tag, "value": value}
+    return construct
+
+
+_ComposeLoader.add_constructor("!reset", _tagged("reset"))
+_ComposeLoader.add_constructor("!override", _tagged("override"))
+
+# Compose reads YAML 1.2, which has no base 60 numbers: `- 22:22` is the
+# string "22:22" there, not the int 1342 of YAML 1.1
+_INT_TAG, _FLOAT_TAG = "tag:yaml.org,2002:int", "tag:yaml.org,2002:float"
+_ComposeLoader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag not in (_INT_TAG, _FLOAT_TAG)]
+    for first, resolvers in SafeLoader.yaml_implicit_resolvers.items()
+}
+_ComposeLoader.add_implicit_resolver(
+    _INT_TAG,
+    re.compile(r"""^(?:[-+]?0b[0-1_]+
+    |[-+]?0[0-7_]+
+    |[-+]?(?:0|[1-9][0-9_]*)
+    |[-+]?0x[0-9a-fA-F_]+)$""", re.X),
+    list("-+0123456789"),
+)
+_ComposeLoader.add_implicit_resolver(
+    _FLOAT_TAG,
+    re.compile(r"""^(?:[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+    |\.[0-9][0-9_]*(?:[eE][-+][0-9]+)?
+    |[-+]?\.(?:inf|Inf|INF)
+    |\.(?:nan|NaN|NAN))$""", re.X),
+    list("-+0123456789."),
+)
+
+
+def _is_tag(value, tag: str | None = None) -> bool:
+    return isinstance(value, dict) and TAG_KEY in value and (tag is None or value[TAG_KEY] == tag)
+
+
+def load_document(path: Path) -> dict:
+    """Parses one compose file; parsed documents are cached per file, so only changed files are re-read."""
+    def parse(data: bytes):
+        document = yaml.load(data, Loader=_ComposeLoader) or {}
+        return json.loads(json.dumps(document, default=str))
+
+    return cached_file_model(path, namespace="compose-documents", parse=parse, version=COMPOSE_DOCUMENT_VERSION)
+
+
+# --- file discovery ---
+def discover_compose_files(project_dir: Path, files: list[str] | None = None) -> list[Path]:
+    """
+    Returns the compose files in merge order, like `docker compose`:
+    explicit -f files, else COMPOSE_FILE, else the default file plus its override file.
+    """
+    if not files and os.environ.get("COMPOSE_FILE"):
+        separator = os.environ.get("COMPOSE_PATH_SEPARATOR", os.pathsep)
+        files = [f for f in os.environ["COMPOSE_FILE"].split(separator) if f]
+
+    if files:
+        resolved = []
+        for f in files:
+            path = Path(f).expanduser()
+            if not path.is_absolute():
+                path = project_dir / path
+            if not path.exists():
+                raise ComposeError(f"Compose file not found: {path}")
+            resolved.append(path.resolve())
+        return resolved
+
+    for name in DEFAULT_FILES:
+        base = project_dir / name
+        if base.exists():
+            stem, suffix = name.rsplit(".", 1)
+            found = [base]
+            for override in (f"{stem}.override.{suffix}", f"{stem}.override.{'yml' if suffix == 'yaml' else 'yaml'}"):
+                if (project_dir / override).exists():
+                    found.append(project_dir / override)
+                    break
+            return found
+    return []
+
+
+# --- environment & interpolation ---
+def parse_env_file(path: Path) -> dict[str, str]:
+    """Parses a .env file: KEY=VALUE lines, optional `export`, quotes and # comments."""
+    env = {}
+    if not path.exists():
+        return env
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):].lstrip()
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        if value[:1] in ("'", '"') and value[-1:] == value[:1] and len(value) > 1:
+            quote = value[0]
+            value = value[1:-1]
+            if quote == '"':
+                value = _ENV_ESCAPE_RE.sub(lambda m: _ENV_ESCAPES.get(m[1], m[1]), value)
+        else:
+            value = re.split(r"\s+#", value, maxsplit=1)[0].rstrip()
+        env[key.strip()] = value
+    return env
+
+
+def load_environment(project_dir: Path, env_file: str | None = None) -> dict[str, str]:
+    """Variables available for interpolation: the .env file, overridden by the shell environment."""
+    path = Path(env_file).expanduser() if env_file else project_dir / ".env"
+    if not path.is_absolute():
+        path = project_dir / path
+    return {**parse_env_file(path), **os.environ}
+
+
+_NAME = r"[A-Za-z_][A-Za-z0-9_]*"
+
+
+def interpolate_string(value: str, env: dict[str, str]) -> str:
+    """
+    Expands $VAR, ${VAR}, ${VAR:-default}, ${VAR-default}, ${VAR:?error},
+    ${VAR?error}, ${VAR:+alt}, ${VAR+alt} and the $$ escape. Defaults may nest.
+    """
+    out = []
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char != "$":
+            out.append(char)
+            i += 1
+            continue
+
+        nxt = value[i + 1:i + 2]
+        if nxt == "$":
+            out.append("$")
+            i += 2
+            continue
+
+        if nxt == "{":
+            # find the matching brace, allowing nested ${...} in defaults
+            depth, j = 1, i + 2
+            while j < len(value) and depth:
+                if value[j] == "{":
+                    depth += 1
+                elif value[j] == "}":
+                    depth -= 1
+                j += 1
+            if depth:
+                raise ComposeError(f"Invalid interpolation format: {value!r}")
+            out.append(_expand(value[i + 2:j - 1], env))
+            i = j
+            continue
+
+        match = re.match(_NAME, value[i + 1:])
+        if match:
+            out.append(env.get(match.group(0), ""))
+            i += 1 + match.end()
+        else:
+            out.append("$")
+            i += 1
+    return "".join(out)
+
+
+def _expand(expression: str, env: dict[str, str]) -> str:
+    match = re.match(rf"({_NAME})(:?[-?+])?(.*)\Z", expression, re.S)
+    if not match:
+        raise ComposeError(f"Invalid interpolation format: ${{{expression}}}")
+    name, operator, argument = match.groups()
+    value = env.get(name)
+
+    if not operator:
+        return value or ""
+
+    unset_or_empty = value is None or (operator.startswith(":") and value == "")
+    kind = operator[-1]
+    if kind == "-":
+        return interpolate_string(argument, env) if unset_or_empty else value
+    if kind == "+":
+        return "" if unset_or_empty else interpolate_string(argument, env)
+    # "?" - required variable
+    if unset_or_empty:
+        message = interpolate_string(argument, env) or f"variable {name} is not set"
+        raise ComposeError(f"Required variable {name} is missing a value: {message}")
+    return value
+
+
+def interpolate(value: Any, env: dict[str, str]) -> Any:
+    """Interpolates every string (keys are left as-is) of a compose document."""
+    if isinstance(value, str):
+        return interpolate_string(value, env)
+    if isinstance(value, list):
+        return [interpolate(v, env) for v in value]
+    if isinstance(value, dict):
+        return {k: interpolate(v, env) for k, v in value.items()}
+    return value
+
+
+# --- merging ---
+def _volume_target(volume) -> str:
+    if isinstance(volume, dict):
+        return volume.get("target", "")
+    parts = str(volume).split(":")
+    return parts[1] if len(parts) > 1 else parts[0]
+
+
+def _as_mapping(value) -> dict:
+    """Turns the list form (KEY=VALUE / KEY) of environment-like keys into a mapping."""
+    if isinstance(value, dict):
+        return dict(value)
+    mapping = {}
+    for item in value or []:
+        key, sep, val = str(item).partition("=")
+        mapping[key] = val if sep else None
+    return mapping
+
+
+def _merge_sequence(key: str, base: list, override: list) -> list:
+    key_of = KEYED_SEQUENCES.get(key)
+    if key_of:
+        merged = {key_of(item): item for item in base}
+        for item in override:
+            merged[key_of(item)] = item
+        return list(merged.values())
+
+    merged = list(base)
+    for item in override:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
+def merge_values(path: tuple[str, ...], base, override):
+    """
+    Merges one compose value into another following the Compose merge rules.
+    `path` locates the value in the document (e.g. ("services", "web", "ports")):
+    the per-key rules only apply inside a definition, so a service or network
+    that happens to be named `test` or `labels` is still merged as a whole.
+    """
+    if _is_tag(override, "reset"):
+        return None
+    if _is_tag(override, "override"):
+        return override["value"]
+    key = path[-1] if len(path) >= 3 else None
+    if key in REPLACED_KEYS:
+        return override
+    if key == "depends_on":
+        return {**normalize_depends_on(base), **normalize_depends_on(override)}
+    if key in MAPPING_KEYS:
+        return {**_as_mapping(base), **_as_mapping(override)}
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for k, v in override.items():
+            if k in merged:
+                value = merge_values((*path, k), merged[k], v)
+                if value is None and _is_tag(v, "reset"):
+                    del merged[k]
+                    continue
+                merged[k] = value
+            elif not _is_tag(v, "reset"):
+                merged[k] = v["value"] if _is_tag(v) else v
+        return merged
+    if isinstance(base, list) and isinstance(override, list):
+        return _merge_sequence(key, base, override)
+    return override
+
+
+def _strip_tags(value):
+    if _is_tag(value):
+        return None if value[TAG_KEY] == "reset" else _strip_tags(value["value"])
+    if isinstance(value, dict):
+        return {k: _strip_tags(v) for k, v in value.items() if not _is_tag(v, "reset")}
+    if isinstance(value, list):
+        return [_strip_tags(v) for v in value]
+    return value
+
+
+# --- extends ---
+def _resolve_extends(
+    name: str,
+    services: dict,
+    path: Path,
+    env: dict[str, str],
+    stack: tuple = (),
+) -> dict:
+    """Returns the service definition with its `extends` chain merged in (base first)."""
+    marker = (str(path), name)
+    if marker in stack:
+        chain = " -> ".join(f"{Path(p).name}:{s}" for p, s in stack + (marker,))
+        raise ComposeError(f"Circular extends: {chain}")
+
+    service = services.get(name)
+    if service is None:
+        raise ComposeError(f"Cannot extend service '{name}' in {path}: service not found")
+    service = dict(service)
+
+    extends = service.pop("extends", None)
+    if not extends:
+        return service
+
+    if isinstance(extends, str):
+        extends = {"service": extends}
+
+    base_path = path
+    base_services = services
+    if extends.get("file"):
+        base_path = (path.parent / extends["file"]).resolve()
+        if not base_path.exists():
+            raise ComposeError(f"Extended file not found: {base_path}")
+        base_document = interpolate(load_document(base_path), env)
+        base_services = base_document.get("services") or {}
+
+    base = _resolve_extends(extends["service"], base_services, base_path, env, stack + (marker,))
+    if base_path != path:
+        base = _rebase_paths(base, base_path.parent, path.parent)
+    return merge_values(("services", name), base, service)
+
+
+def _rebase_paths(service: dict, source_dir: Path, target_dir: Path) -> dict:
+    """Keeps relative build contexts of an extended service pointing at the same directory."""
+    build = service.get("build")
+    if build is None:
+        return service
+
+    def rebase(context: str) -> str:
+        if "://" in context or Path(context).is_absolute():
+            return context
+        return os.path.relpath((source_dir / context).resolve(), target_dir)
+
+    service = dict(service)
+    if isinstance(build, str):
+        service["build"] = rebase(build)
+    elif isinstance(build, dict):
+        service["build"] = {**build, "context": rebase(build.get("context", "."))}
+    return service
+
+
+# --- resolution ---
+def active_profiles(profiles: list[str] | None = None) -> list[str]:
+    """Profiles from --profile, else COMPOSE_PROFILES."""
+    if profiles:
+        return list(profiles)
+    return [p.strip() for p in os.environ.get("COMPOSE_PROFILES", "").split(",") if p.strip()]
+
+
+def resolve_compose(
+    path: str,
+    files: list[str] | None = None,
+    profiles: list[str] | None = None,
+    env_file: str | None = None,
+) -> ComposeModel:
+    """
+    Resolves a compose project the way `docker compose config` does: merges
+    all files in order, interpolates variables, applies `extends` and drops
+    services whose profiles are not active.
+
+    Each file is parsed once and cached (see load_document), so re-resolving
+    after an edit only re-reads the file that changed.
+
+    Returns:
+        ComposeModel with two extra keys: "files" (list of paths) and "profiles".
+    """
+    project_dir = Path(path).absolute().expanduser().resolve()
+    compose_files = discover_compose_files(project_dir, files)
+    if not compose_files:
+        raise FileNotFoundError("Docker Compose file not found")
+
+    env = load_environment(project_dir, env_file)
+
+    merged: dict = {}
+    for compose_path in compose_files:
+        document = interpolate(load_document(compose_path), env)
+        services = document.get("services") or {}
+        # extends is resolved per file, relative to the file that declares it
+        document["services"] = {
+            name: _resolve_extends(name, services, compose_path, env) for name in services
+        }
+        merged = merge_values((), merged, document)
+
+    merged = _strip_tags(merged)
+
+    enabled = set(active_profiles(profiles))
+    merged["services"] = {
+        name: service
+        for name, service in (merged.get("services") or {}).items()
+        if not service.get("profiles") or enabled & set(service["profiles"])
+    }
+
+    model = build_compose_model(merged)
+    model["files"] = [str(f) for f in compose_files]
+    model["profiles"] = sorted(enabled)
+    return model
+
+
+def dependency_levels(model: ComposeModel) -> list[list[str]]:
+    """
+    Groups services into startup levels from their depends_on: every service
+    only depends on services of earlier levels, so each level can start in
+    parallel once the previous one is up. Levels keep the compose file order.
+    """
+    services = model.get("services") or {}
+    pending = {}
+    for name, service in services.items():
+        for dependency in service.get("depends_on") or {}:
+            if dependency not in services:
+                raise ComposeError(f"Service '{name}' depends on undefined service '{dependency}'")
+        pending[name] = set(service.get("depends_on") or {})
+
+    levels = []
+    done: set[str] = set()
+    while pending:
+        level = [name for name, deps in pending.items() if deps <= done]
+        if not level:
+            raise ComposeError(f"Dependency cycle between services: {', '.join(pending)}")
+        levels.append(level)
+        done.update(level)
+        for name in level:
+            del pending[name]
+    return levels
+
+
+def dependents(model: ComposeModel, name: str) -> list[str]:
+    """Returns every service that (transitively) depends on `name`, in compose file order."""
+    services = model.get("services") or {}
+    found = {name}
+    changed = True
+    while changed:
+        changed = False
+        for service, definition in services.items():
+            if service not in found and found & set(definition.get("depends_on") or {}):
+                found.add(service)
+                changed = True
+    return [service for service in services if service in found and service != name]
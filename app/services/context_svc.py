@@ -0,0 +1,209 @@
+import hashlib
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.services.cache_svc import cache_dir, read_json, write_json
+
+# Bump when the index format or the fingerprint inputs change
+CONTEXT_INDEX_VERSION = 2
+
+# Contexts above this size get a warning in `mate up`
+LARGE_CONTEXT_BYTES = 512 * 1024 * 1024
+
+_CHUNK = 1024 * 1024
+
+
+class DockerIgnore:
+    """
+    .dockerignore rules, matched the way BuildKit does: patterns are
+    relative to the context root, `*` and `?` stay within one path segment,
+    `**` spans directories, a rule also matches everything below a matched
+    directory, `!` re-includes, and the last matching rule wins.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.rules: list[tuple[bool, re.Pattern, str]] = []
+        for raw in patterns:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:].strip()
+            line = os.path.normpath(line).replace(os.sep, "/").lstrip("/")
+            if line in ("", "."):
+                continue
+            self.rules.append((negated, _compile(line), line))
+        self.has_negations = any(negated for negated, _, _ in self.rules)
+
+    @classmethod
+    def load(cls, context_dir: Path, dockerfile: Path | None = None) -> "DockerIgnore":
+        """Reads <Dockerfile>.dockerignore when present (BuildKit prefers it), else <context>/.dockerignore."""
+        candidates = []
+        if dockerfile:
+            candidates.append(dockerfile.with_name(f"{dockerfile.name}.dockerignore"))
+        candidates.append(context_dir / ".dockerignore")
+        for candidate in candidates:
+            if candidate.is_file():
+                return cls(candidate.read_text(encoding="utf-8", errors="replace").splitlines())
+        return cls([])
+
+    def excluded(self, path: str) -> bool:
+        """Whether `path` (relative, '/'-separated) is left out of the build context."""
+        parents = path.split("/")
+        candidates = ["/".join(parents[:i]) for i in range(1, len(parents) + 1)]
+        result = False
+        for negated, regex, _ in self.rules:
+            if any(regex.match(candidate) for candidate in candidates):
+                result = not negated
+        return result
+
+    def can_prune(self, directory: str) -> bool:
+        """Whether an excluded directory can be skipped without walking it."""
+        if not self.has_negations:
+            return True
+        # A `!` rule may re-include something below it
+        for negated, _, pattern in self.rules:
+            if negated and (pattern.startswith(directory + "/") or pattern[:1] in "*?["):
+                return False
+        return True
+
+
+def _compile(pattern: str) -> re.Pattern:
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            if pattern[i + 1:i + 2] == "*":
+                i += 1
+                if pattern[i + 1:i + 2] == "/":
+                    # `**/` matches zero or more directories
+                    i += 1
+                    regex.append("(?:.*/)?")
+                else:
+                    regex.append(".*")
+            else:
+                regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile("".join(regex) + r"\Z")
+
+
+def _walk(context_dir: Path, ignore: DockerIgnore):
+    """Yields (relative path, os.stat_result) for every file that ends up in the build context."""
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            entries = list(os.scandir(context_dir / relative_dir))
+        except OSError:
+            continue
+        for entry in entries:
+            relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                info = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            excluded = ignore.excluded(relative)
+            if is_dir:
+                if not (excluded and ignore.can_prune(relative)):
+                    stack.append(relative)
+                continue
+            # Docker skips FIFOs, sockets and devices; opening a FIFO would block
+            if not (stat.S_ISREG(info.st_mode) or stat.S_ISLNK(info.st_mode)):
+                continue
+            if not excluded:
+                yield relative, info
+
+
+def _hash_file(path: Path, info: os.stat_result) -> str:
+    digest = hashlib.sha256()
+    if stat.S_ISLNK(info.st_mode):
+        digest.update(os.readlink(path).encode())
+        return digest.hexdigest()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_context(context_dir: str | Path, dockerfile: str | Path | None = None, workers: int = 8, top: int = 5) -> dict:
+    """
+    Fingerprints a build context as Docker would send it (honoring .dockerignore).
+
+    File digests are kept in a persistent index keyed by (size, mtime, ctime),
+    so a repeat scan only reads files that changed; those are hashed in parallel.
+    The mode always comes from the current scan, so a chmod +x is never missed.
+
+    Returns:
+        dict: {"fingerprint", "files", "size", "rehashed", "top": [{"path", "size", "files"}]}
+        where "top" lists the largest top-level entries of the context.
+    """
+    context_dir = Path(context_dir).expanduser().resolve()
+    ignore = DockerIgnore.load(context_dir, Path(dockerfile) if dockerfile else None)
+
+    index_path = cache_dir("contexts") / f"{hashlib.sha1(str(context_dir).encode()).hexdigest()}.json"
+    index = read_json(index_path)
+    if not isinstance(index, dict) or index.get("version") != CONTEXT_INDEX_VERSION:
+        index = {"version": CONTEXT_INDEX_VERSION, "files": {}}
+    known = index["files"]
+
+    files = {}
+    stale = []
+    for relative, info in _walk(context_dir, ignore):
+        entry = known.get(relative)
+        files[relative] = [info.st_size, info.st_mtime_ns, None, info.st_mode, info.st_ctime_ns]
+        if entry and (entry[0], entry[1], entry[4]) == (info.st_size, info.st_mtime_ns, info.st_ctime_ns):
+            files[relative][2] = entry[2]
+        else:
+            stale.append((relative, info))
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = pool.map(lambda item: _hash_file(context_dir / item[0], item[1]), stale)
+            for (relative, _), digest in zip(stale, digests):
+                files[relative][2] = digest
+
+    write_json(index_path, {"version": CONTEXT_INDEX_VERSION, "files": files})
+
+    digest = hashlib.sha256()
+    size = 0
+    by_top_level: dict[str, list[int]] = {}
+    for relative in sorted(files):
+        file_size, _, file_digest, mode, _ = files[relative]
+        # The executable bit changes the image, the rest of the mode does not
+        digest.update(f"{relative}\0{file_digest}\0{mode & 0o111:o}\n".encode())
+        size += file_size
+        totals = by_top_level.setdefault(relative.split("/", 1)[0], [0, 0])
+        totals[0] += file_size
+        totals[1] += 1
+
+    largest = sorted(by_top_level.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "fingerprint": digest.hexdigest(),
+        "files": len(files),
+        "size": size,
+        "rehashed": len(stale),
+        "top": [{"path": path, "size": s, "files": n} for path, (s, n) in largest],
+    }
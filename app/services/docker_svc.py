@@ -1,6 +1,58 @@
-from python_on_whales import docker, DockerClient
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from enum import Enum
+from typing import TYPE_CHECKING, Iterator
+
+from app.services.snapshot_svc import ContainerSnapshot, record_from_inspect, COMPOSE_PROJECT_LABEL
+
+if TYPE_CHECKING:
+    from app.services.engine_svc import Stream
+    from python_on_whales import DockerClient
+
+
+class _LazyDocker:
+    """
+    Stands in for `python_on_whales.docker` and imports it on first use, so the
+    socket transport never pays for python_on_whales (and the CLI it wraps).
+    """
+    def __getattr__(self, name):
+        from python_on_whales import docker as client
+        return getattr(client, name)
+
+docker = _LazyDocker()
+
+
+def _compose_client(**kwargs) -> "DockerClient":
+    from python_on_whales import DockerClient
+    return DockerClient(**kwargs)
+
+
+class Transport(Enum):
+    CLI = "cli"
+    SOCKET = "socket"
+
+
+def get_transport() -> Transport:
+    """
+    Returns how mate talks to Docker, selected with MATE_DOCKER_TRANSPORT:
+    'cli' (default, python_on_whales / docker CLI) or 'socket' (Engine API
+    over the Unix socket, see engine_svc).
+    """
+    value = os.environ.get("MATE_DOCKER_TRANSPORT", Transport.CLI.value).strip().lower()
+    try:
+        return Transport(value)
+    except ValueError:
+        raise ValueError(f"Invalid MATE_DOCKER_TRANSPORT '{value}', values must be ['cli', 'socket']")
+
+
+def _engine():
+    from app.services.engine_svc import get_engine_client
+    return get_engine_client()
 
 class ConfigType(Enum):
     COMPOSE = "compose"
@@ -40,96 +92,154 @@ def detect_configuration(path: str) -> ConfigType:
 def start_compose(
     path: str, 
     compose_file: str | None = None, 
-    pull: str | None = None
-):
+    pull: str | None = None,
+    compose_files: list[str] | None = None,
+    profiles: list[str] | None = None,
+    services: list[str] | None = None,
+    dependencies: bool = True,
+    build: bool = True,
+) -> list[Path]:
+    """
+    Runs `compose up` for the project at `path`. Without `compose_files`, the
+    files are discovered like Compose does (COMPOSE_FILE, or the default file
+    plus its override). `services` limits it to some services, and
+    dependencies=False starts them without their dependencies (--no-deps).
+    build=False only builds images that don't exist yet (see build_svc).
+    Returns the compose files used, in merge order.
+    """
+    from app.services.compose_svc import discover_compose_files, active_profiles
 
     compose_dir = Path(path).absolute().expanduser().resolve()
 
-    compose_candidates = [
-        compose_file,
-        "docker-compose.yaml",
-        "docker-compose.yml",
-        "compose.yaml",
-        "compose.yml",
-    ]
+    if compose_file:
+        compose_files = [compose_file, *(compose_files or [])]
+    files = discover_compose_files(compose_dir, compose_files)
 
-    compose_path = None
-    for file in compose_candidates:
-        if file and (compose_dir / str(file)).exists():
-            compose_path = compose_dir / str(file)
-            break
-
-    if not compose_path:
+    if not files:
         raise FileNotFoundError("Docker Compose file not found")
 
     if pull and pull not in {p.value for p in PullPolicy}:
             raise ValueError("Not Value For Pull Always, values must be ['missing', 'never', 'always']")
 
-    client = DockerClient(
-        compose_files=[str(compose_path)],
+    client = _compose_client(
+        compose_files=[str(f) for f in files],
+        compose_profiles=active_profiles(profiles),
         compose_project_directory=str(compose_dir)
     )
 
     client.compose.up(
+        services=services,
         detach=True, 
-        build=True,
-        pull=pull
+        build=build,
+        pull=pull,
+        dependencies=dependencies,
     )
 
+    return files
+
+
+def build_compose(
+    path: str,
+    compose_files: list[str] | None = None,
+    profiles: list[str] | None = None,
+    services: list[str] | None = None,
+):
+    """Runs `compose build` for `services` (the images mate doesn't build itself, see build_svc)."""
+    from app.services.compose_svc import discover_compose_files, active_profiles
+
+    compose_dir = Path(path).absolute().expanduser().resolve()
+    files = discover_compose_files(compose_dir, compose_files)
+    if not files:
+        raise FileNotFoundError("Docker Compose file not found")
+
+    client = _compose_client(
+        compose_files=[str(f) for f in files],
+        compose_profiles=active_profiles(profiles),
+        compose_project_directory=str(compose_dir)
+    )
+    client.compose.build(services=services)
+
+
+def image_id(reference: str) -> str | None:
+    """Returns the id of a local image, or None when it doesn't exist."""
+    if get_transport() == Transport.SOCKET:
+        from app.services.engine_svc import EngineError
+        try:
+            return _engine().inspect_image(reference)["Id"]
+        except EngineError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    from python_on_whales.exceptions import NoSuchImage
+    try:
+        return docker.image.inspect(reference).id
+    except NoSuchImage:
+        return None
+
 
 def build_dockerfile(
     path: str,
     image_name: str | None = None,
     build_args: dict[str, str] | None = None,
-) -> str:
+    force: bool = False,
+    cache: bool | None = None,
+    return_result: bool = False,
+    dockerfile: str | None = None,
+    target: str | None = None,
+):
+    """
+    Builds the Dockerfile at `path` (or `dockerfile`, relative to it), up to the
+    `target` stage when given. The build is skipped while the build context is
+    unchanged, unless `force`. Returns the image name, or
+    (image name, build result) with return_result=True (see build_svc.build_all).
+    """
+    from app.services.build_svc import build_all
 
     build_dir = Path(path).expanduser().absolute().resolve()
-    if (build_dir / "Dockerfile").exists():
-        build_file = build_dir / "Dockerfile"
-
-    else:
-        raise FileNotFoundError("Dockerfile Not Found")
-    
+    build_file = build_dir / (dockerfile or "Dockerfile")
+    if not build_file.exists():
+        raise FileNotFoundError(f"Dockerfile Not Found: {build_file}")
 
     if not image_name:
         image_name = f"{build_dir.name}:latest"
-    
-    docker.build(
-        context_path=str(build_dir),
-        file=str(build_file),
-        build_args=build_args or {},
-        tags=[image_name],
-    )
 
+    spec = {
+        "context": str(build_dir),
+        "dockerfile": str(build_file),
+        "args": build_args or {},
+        "target": target,
+        "image": image_name,
+    }
+    result = build_all({image_name: spec}, state_key=str(build_dir), force=force, cache=cache)[image_name]
+    if result["status"] == "failed":
+        raise RuntimeError(f"Build failed: {result['details']}")
+
+    if return_result:
+        return image_name, result
     return image_name
 
 
-def get_image_exposed_ports(dockerfile_path: str) -> list[str]:
+def normalize_ports(port_list: list[str]) -> list[tuple]:
     """
-    Returns a list of exposed ports from a Dockerfile.
+    Converts `-p` style specs (IP, ranges and protocols included, see
+    ports_svc.parse_port_spec) into python-on-whales publish tuples:
+    (host, container, protocol), or (container/protocol,) for a random host port.
     """
-    if not Path(dockerfile_path).exists():
-        raise FileNotFoundError("Dockerfile path not found")
-    
-    ports = []
-    with open(dockerfile_path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line.upper().startswith("EXPOSE"):
-                # Handle "EXPOSE 80 443" or "EXPOSE 80/tcp"
-                parts = line[6:].strip().split()
-                for p in parts:
-                    # Remove protocol if present (e.g. 80/tcp -> 80)
-                    port = p.split("/")[0]
-                    ports.append(port)
-    return ports
-
+    from app.services.ports_svc import parse_port_spec, format_port_range
 
-def normalize_ports(port_list: list[str]) -> list[tuple]:
     published = []
     for p in port_list or []:
-        host, container = p.split(":", 1)
-        published.append((container, host))
+        port = parse_port_spec(p)
+        container = format_port_range(port["target"])
+        host_ip = f"[{port['host_ip']}]" if ":" in port["host_ip"] else port["host_ip"]
+        if port["published"] is None and not host_ip:
+            published.append((f"{container}/{port['protocol']}",))
+            continue
+        host = format_port_range(port["published"]) if port["published"] else ""
+        if host_ip:
+            host = f"{host_ip}:{host}"
+        published.append((host, container, port["protocol"]))
     return published
 
 
@@ -141,17 +251,24 @@ def run_container(
     volumes: list[str] | None = None,
     detach: bool = False,
 ) -> str:
-
+    """
+    Runs an image as a new container. The existence check and the removal of
+    an old container follow the transport; `docker run` itself always goes
+    through the CLI, which attaches to the container when not detached.
+    """
     if not image_name:
         raise ValueError("Image Not Found, check for image name and version/tag")
     
     if not container_name:
         container_name = f"{image_name.split(':')[0]}_app"
 
-    if docker.container.exists(container_name):
+    if container_exists(container_name):
         if start_new:
-            docker.container.stop(container_name)
-            docker.container.remove(container_name, force=True)
+            if get_transport() == Transport.SOCKET:
+                _engine().stop_container(container_name)
+            else:
+                docker.container.stop(container_name)
+            _remove_container(container_name, force=True)
 
         else:
             raise RuntimeError("Container Already Exist")
@@ -169,40 +286,301 @@ def run_container(
     return container_name
 
 
-def get_project_containers(path: str, return_names: bool = False) -> list[str]:
+def inspect_containers(references: list[str], client: "DockerClient | None" = None) -> ContainerSnapshot:
     """
-    Returns a list of container objects/names for the given compose project path.
+    Inspects all given containers with a single `docker container inspect` call
+    (or concurrent keep-alive requests with the socket transport).
+    """
+    if not references:
+        return ContainerSnapshot()
+
+    if client is None and get_transport() == Transport.SOCKET:
+        engine = _engine()
+        with ThreadPoolExecutor(max_workers=min(engine.pool_size, len(references))) as pool:
+            inspected = list(pool.map(engine.inspect_container, references))
+        return ContainerSnapshot([record_from_inspect(data) for data in inspected])
+
+    from python_on_whales.utils import run
+
+    client = client or docker
+    output = run(client.client_config.docker_cmd + ["container", "inspect", *references])
+    return ContainerSnapshot([record_from_inspect(data) for data in json.loads(output)])
+
+
+def list_containers(all: bool = False, filters: dict | None = None) -> ContainerSnapshot:
+    """
+    Lists containers (like `docker ps`) and inspects them in one batch.
+    """
+    if get_transport() == Transport.SOCKET:
+        ids = [c["Id"] for c in _engine().list_containers(all=all, filters=filters)]
+    else:
+        ids = [c.id for c in docker.container.list(all=all, filters=filters or {})]
+    return inspect_containers(ids)
+
+
+def list_contexts() -> list[str]:
+    """Names of the configured Docker contexts (`docker context ls`)."""
+    output = _run_cli(["context", "ls", "--format", "{{.Name}}"], timeout=10)
+    return [name.strip() for name in output.splitlines() if name.strip()]
+
+
+def _run_cli(args: list[str], context: str | None = None, timeout: float | None = None) -> str:
+    """
+    Runs a docker CLI command (against `context` when given) and returns its stdout.
+    The process is killed after `timeout` seconds, so an unreachable host can't hang mate.
+    """
+    client = _compose_client(context=context) if context else docker
+    command = [str(c) for c in client.client_config.docker_cmd] + args
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"Timed out after {timeout:g}s")
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"docker exited with {result.returncode}")
+    return result.stdout
+
+
+def list_context_containers(
+    context: str,
+    all: bool = False,
+    filters: dict | None = None,
+    timeout: float | None = None,
+) -> ContainerSnapshot:
+    """
+    list_containers for another Docker context (always through the CLI, which
+    knows how to reach ssh:// and tcp:// hosts). `timeout` bounds the whole call.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def remaining():
+        return max(0.1, deadline - time.monotonic()) if deadline else None
+
+    args = ["container", "ls", "--quiet", "--no-trunc"]
+    if all:
+        args.append("--all")
+    for key, value in (filters or {}).items():
+        args += ["--filter", f"{key}={value}"]
+    ids = _run_cli(args, context=context, timeout=remaining()).split()
+    if not ids:
+        return ContainerSnapshot()
+    output = _run_cli(["container", "inspect", *ids], context=context, timeout=remaining())
+    return ContainerSnapshot([record_from_inspect(data) for data in json.loads(output)])
+
+
+def run_probe_container(image: str, network: str, command: list[str], timeout: float | None = None) -> str:
+    """Runs a throwaway container attached to `network` and returns its output (see probe_svc)."""
+    return _run_cli(["run", "--rm", "--network", network, image, *command], timeout=timeout)
+
+
+def snapshot_contexts(
+    contexts: list[str],
+    all: bool = False,
+    filters: dict | None = None,
+    timeout: float = 10,
+) -> dict[str, dict]:
+    """
+    Lists the containers of several Docker contexts concurrently.
+    A slow or unreachable host only costs its own `timeout`.
+
+    Returns:
+        dict: {context: {"records": [records, each with "host"], "latency": seconds | None, "error": str | None}}
+    """
+    from app.services.scheduler_svc import run_checks
+
+    def check(context: str):
+        def run():
+            started = time.monotonic()
+            try:
+                snapshot = list_context_containers(context, all=all, filters=filters, timeout=timeout)
+            except TimeoutError:
+                return {"records": [], "latency": None, "error": f"Timed out after {timeout:g}s"}
+            except Exception as e:
+                return {"records": [], "latency": None, "error": str(e)}
+            return {
+                "records": [{**record, "host": context} for record in snapshot],
+                "latency": time.monotonic() - started,
+                "error": None,
+            }
+        return run
+
+    return run_checks(
+        {context: check(context) for context in contexts},
+        concurrency=len(contexts),
+        # The CLI calls enforce `timeout` themselves; this is only a safety net
+        probe_timeout=timeout + 1,
+        deadline=None,
+        fallback=lambda context, message: {"records": [], "latency": None, "error": message},
+    )
+
+
+def iter_containers(all: bool = False, filters: dict | None = None) -> Iterator[dict]:
+    """
+    Like list_containers, but yields each record as soon as it is inspected:
+    in completion order with the socket transport (concurrent inspects), and
+    from the one batched inspect call on the CLI.
+    """
+    if get_transport() != Transport.SOCKET:
+        yield from list_containers(all=all, filters=filters)
+        return
+
+    engine = _engine()
+    ids = [c["Id"] for c in engine.list_containers(all=all, filters=filters)]
+    if not ids:
+        return
+    with ThreadPoolExecutor(max_workers=min(engine.pool_size, len(ids))) as pool:
+        for future in as_completed([pool.submit(engine.inspect_container, i) for i in ids]):
+            yield record_from_inspect(future.result())
+
+
+def compose_project_name(project_dir: Path, files: list[str] | None = None) -> str:
+    """
+    Resolves the compose project name the way Compose does:
+    COMPOSE_PROJECT_NAME, then the top-level `name:` of the merged files, then the directory name.
+    """
+    name = os.environ.get("COMPOSE_PROJECT_NAME")
+    if not name:
+        from app.services.compose_svc import resolve_compose, ComposeError
+        try:
+            name = resolve_compose(str(project_dir), files=files)["name"]
+        except (FileNotFoundError, ComposeError):
+            name = None
+    if not name:
+        name = project_dir.name
+    # Compose lowercases and drops anything outside [a-z0-9_-]
+    return re.sub(r"[^a-z0-9_-]", "", name.lower()).lstrip("_-")
+
+
+# Per-invocation cache: every `mate` run is its own process, so a snapshot
+# taken once is shared by everything that runs during that command.
+_project_snapshots: dict[str, ContainerSnapshot] = {}
+
+
+def get_project_snapshot(path: str, refresh: bool = False, files: list[str] | None = None) -> ContainerSnapshot:
+    """
+    Returns a snapshot of all containers of the compose project at `path`,
+    taken with one `compose ps` and one batched inspect call.
+    Pass refresh=True after changing the project (e.g. after `compose up`).
     """
     project_dir = Path(path).absolute().expanduser().resolve()
-    
-    client = DockerClient(compose_project_directory=str(project_dir))
-    containers = client.compose.ps()
-    if return_names:
-        return [c.name for c in containers]
-    return containers
+    key = str(project_dir)
+
+    if refresh or key not in _project_snapshots:
+        if get_transport() == Transport.SOCKET:
+            project = compose_project_name(project_dir, files=files)
+            containers = _engine().list_containers(
+                all=True, filters={"label": f"{COMPOSE_PROJECT_LABEL}={project}"}
+            )
+            _project_snapshots[key] = inspect_containers([c["Id"] for c in containers])
+        else:
+            from app.services.compose_svc import discover_compose_files
+            client = _compose_client(
+                compose_files=[str(f) for f in discover_compose_files(project_dir, files)],
+                compose_project_directory=key,
+            )
+            # ids are immutable, reading them does not trigger an inspect
+            ids = [c.id for c in client.compose.ps(all=True)]
+            _project_snapshots[key] = inspect_containers(ids, client=client)
+
+    return _project_snapshots[key]
 
 
-def get_container_health(container_name: str) -> str | None:
+def get_container_health(container_name: str, snapshot: ContainerSnapshot | None = None) -> str | None:
     """
     Returns the health status of a container (e.g. 'healthy', 'unhealthy', 'starting').
     Returns None if no health check is defined or container not found.
+    Reads from `snapshot` when given instead of inspecting the container again.
     """
     try:
-        inspect_data = docker.container.inspect(container_name)
-        # docker.container.inspect returns a Container object.
-        # Container.state is a helper object usually.
-        # Assuming inspect returns object with .state.health.status.
-        
-        if inspect_data.state.health:
-            return inspect_data.state.health.status
-        return None
+        if snapshot is None:
+            snapshot = inspect_containers([container_name])
+        return snapshot.health(container_name)
     except Exception:
         return None
 
+def container_exists(container_name: str) -> bool:
+    if get_transport() == Transport.SOCKET:
+        return _engine().container_exists(container_name)
+    return docker.container.exists(container_name)
+
+
+def _remove_container(container_name: str, volumes: bool = False, force: bool = False):
+    if get_transport() == Transport.SOCKET:
+        _engine().remove_container(container_name, volumes=volumes, force=force)
+        return
+    docker.container.remove(container_name, volumes=volumes, force=force)
+
+
+def container_exec(container_name: str, command: list[str]) -> str:
+    """
+    Runs a non-interactive command in a container and returns its stdout.
+    Raises RuntimeError when the command exits with a non-zero status.
+    """
+    if get_transport() == Transport.SOCKET:
+        exit_code, stdout, stderr = _engine().exec_run(container_name, command)
+        if exit_code != 0:
+            raise RuntimeError(
+                f"{command} exited with {exit_code}: {stderr.decode('utf-8', errors='replace').strip()}"
+            )
+        return stdout.decode("utf-8", errors="replace")
+    return docker.container.execute(container_name, command)
+
+
+def _event_from_engine(event: dict) -> dict:
+    actor = event.get("Actor") or {}
+    return {
+        "type": event.get("Type"),
+        "action": event.get("Action") or event.get("status") or "",
+        "id": actor.get("ID") or event.get("id"),
+        "attributes": actor.get("Attributes") or {},
+        "time": event.get("timeNano", 0) / 1e9 or event.get("time"),
+    }
+
+
+def stream_events(filters: dict | None = None, since: float | None = None, until: float | None = None) -> "Stream":
+    """
+    Streams Docker events as plain dicts: {"type", "action", "id", "attributes", "time"}.
+    `since` / `until` are UNIX timestamps; without `until` the stream never ends,
+    so whoever stops reading it early closes it (see engine_svc.Stream).
+    """
+    from app.services.engine_svc import Stream
+
+    filters = {k: v if isinstance(v, list) else [v] for k, v in (filters or {}).items()}
+    if get_transport() == Transport.SOCKET:
+        params = {}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+        if until is not None:
+            params["until"] = f"{until:.9f}"
+        events = _engine().stream_json("GET", "/events", params=params)
+        return Stream(map(_event_from_engine, events), events.close)
+
+    from app.services.log_svc import iter_lines
+
+    # `docker events` prints the Engine API objects, which python_on_whales
+    # would read in a process of its own that nothing could stop
+    command = docker.client_config.docker_cmd + ["events", "--format", "{{json .}}"]
+    for key, values in filters.items():
+        command += [arg for value in values for arg in ("--filter", f"{key}={value}")]
+    if since is not None:
+        command += ["--since", f"{since:.9f}"]
+    if until is not None:
+        command += ["--until", f"{until:.9f}"]
+    output = _stream_process(command)
+    return Stream((_event_from_engine(json.loads(line)) for line in iter_lines(output) if line.strip()), output.close)
+
+
 # shell
-def container_shell(container_name: str, shell_path: str = "/bin/sh"):
-    
-    if not docker.container.exists(container_name):
+def container_shell(container_name: str, shell_path: str = "/bin/sh", snapshot: ContainerSnapshot | None = None):
+    """
+    Opens an interactive shell in a container. This always uses the docker CLI,
+    whatever the transport: it hands the terminal over to `docker exec -it`.
+    """
+    # A snapshot that already knows the container saves the `exists` round trip
+    known = snapshot is not None and snapshot.get(container_name) is not None
+    if not known and not container_exists(container_name):
         raise RuntimeError(f"Container '{container_name}' not found")
 
     docker.container.execute(
@@ -214,40 +592,279 @@ def container_shell(container_name: str, shell_path: str = "/bin/sh"):
 
 
 # Logs
-def compose_logs(path: str, tail: int = 100, follow: bool = True):
-    project_dir = Path(path).absolute().expanduser().resolve()
-    client = DockerClient(compose_project_directory=str(project_dir))
+def stream_container_logs(
+    container_name: str,
+    tail: int | None = 100,
+    follow: bool = False,
+    since: str | None = None,
+    timestamps: bool = False,
+):
+    """
+    Yields ("stdout" | "stderr", bytes) chunks of a container's logs as they
+    are read, so nothing is buffered beyond the current chunk.
+    """
+    if get_transport() == Transport.SOCKET:
+        from app.services.logstore_svc import parse_time
 
+        # The Engine API only takes a UNIX timestamp, the CLI converts it the same way
+        yield from _engine().container_logs(
+            container_name, tail=tail, follow=follow, timestamps=timestamps,
+            since=parse_time(since).timestamp() if since else None,
+        )
+        return
+
+    command = docker.client_config.docker_cmd + ["container", "logs"]
     if follow:
-        for line in client.compose.logs(tail=tail, follow=True, stream=True):
-            # python-on-whales returns (container_object, log_line_bytes)
-            if isinstance(line, tuple):
-                print(line[1].decode("utf-8", errors="replace"), end="", flush=True)
-            elif isinstance(line, bytes):
-                print(line.decode("utf-8", errors="replace"), end="", flush=True)
-            else:
-                print(line, end="", flush=True)
-    else:
-        print(client.compose.logs(tail=tail))
+        command.append("--follow")
+    if tail is not None:
+        command += ["--tail", str(tail)]
+    if since:
+        command += ["--since", since]
+    if timestamps:
+        command.append("--timestamps")
+    # One pipe for both streams keeps the order docker writes them in
+    for chunk in _stream_process(command + [container_name]):
+        yield "stdout", chunk
+
+
+def _stream_process(command: list[str]) -> "Stream":
+    """
+    Streams chunks of a command's output (stdout and stderr combined), read
+    only as fast as they are consumed, so nothing is buffered ahead. The
+    process starts with the first read; closing the stream kills it.
+    """
+    from app.services.engine_svc import Stream
+
+    state = {"process": None, "closed": False}
+
+    def chunks():
+        process = subprocess.Popen([str(c) for c in command], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        state["process"] = process
+        tail = b""
+        try:
+            while not state["closed"]:
+                data = os.read(process.stdout.fileno(), 65536)
+                if not data:
+                    break
+                tail = (tail + data)[-2048:]
+                yield data
+            if state["closed"]:
+                return
+            exit_code = process.wait()
+            if exit_code != 0:
+                lines = tail.decode(errors="replace").strip().splitlines()
+                raise RuntimeError(lines[-1] if lines else f"{command[0]} exited with {exit_code}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+    def close():
+        state["closed"] = True
+        process = state["process"]
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    return Stream(chunks(), close)
+
+
+# `docker stats` sizes: decimal units for I/O (kB, MB), binary ones for memory (KiB, MiB)
+_SIZE_UNITS = {
+    "b": 1, "kb": 1e3, "mb": 1e6, "gb": 1e9, "tb": 1e12,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+_SIZE_RE = re.compile(r"^\s*([\d.]+)\s*([a-z]*)\s*$", re.I)
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+
+def parse_size(text: str) -> float | None:
+    """Parses a size as printed by `docker stats` (e.g. 27.9MiB, 1.1kB, 0B) into bytes."""
+    match = _SIZE_RE.match(text or "")
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        return None
+    return float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
 
 
-def container_logs(container_name: str, tail: int = 100, follow: bool = True):
-    if follow:
-        for line in docker.container.logs(
-            container_name,
-            follow=True,
-            tail=tail,
-            stream=True,
-        ):
-            if isinstance(line, tuple):
-                print(line[1].decode("utf-8", errors="replace"), end="", flush=True)
-            elif isinstance(line, bytes):
-                print(line.decode("utf-8", errors="replace"), end="", flush=True)
-            else:
-                print(line, end="", flush=True)
-    else:
-        logs = docker.container.logs(container_name, tail=tail)
-        print(logs)
+def _stats_from_cli(data: dict) -> dict:
+    def pair(value: str) -> tuple[float | None, float | None]:
+        first, _, second = (value or "").partition("/")
+        return parse_size(first), parse_size(second)
+
+    mem_usage, mem_limit = pair(data.get("MemUsage"))
+    net_rx, net_tx = pair(data.get("NetIO"))
+    blk_read, blk_write = pair(data.get("BlockIO"))
+    try:
+        cpu = float((data.get("CPUPerc") or "").rstrip("%"))
+    except ValueError:
+        cpu = None
+    return {
+        "id": data.get("ID") or data.get("Container") or "",
+        "name": data.get("Name") or "",
+        "cpu": cpu,
+        "mem": mem_usage,
+        "mem_limit": mem_limit,
+        "net_rx": net_rx,
+        "net_tx": net_tx,
+        "blk_read": blk_read,
+        "blk_write": blk_write,
+        "pids": int(data["PIDs"]) if str(data.get("PIDs", "")).isdigit() else None,
+    }
+
+
+def _stats_from_engine(data: dict) -> dict:
+    """Same computation as the docker CLI, from one Engine API stats frame."""
+    cpu_stats, precpu = data.get("cpu_stats") or {}, data.get("precpu_stats") or {}
+    cpu = None
+    system_delta = (cpu_stats.get("system_cpu_usage") or 0) - (precpu.get("system_cpu_usage") or 0)
+    if precpu.get("system_cpu_usage") and system_delta > 0:
+        cpu_delta = cpu_stats["cpu_usage"]["total_usage"] - precpu["cpu_usage"]["total_usage"]
+        cpus = cpu_stats.get("online_cpus") or len(cpu_stats["cpu_usage"].get("percpu_usage") or []) or 1
+        cpu = cpu_delta / system_delta * cpus * 100
+
+    memory = data.get("memory_stats") or {}
+    mem = memory.get("usage")
+    if mem is not None:
+        details = memory.get("stats") or {}
+        # Page cache is not counted, as in `docker stats` (cgroup v1 / v2 keys)
+        mem -= details.get("total_inactive_file", details.get("inactive_file", 0))
+
+    networks = (data.get("networks") or {}).values()
+    blkio = (data.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+    return {
+        "id": data.get("id", ""),
+        "name": (data.get("name") or "").lstrip("/"),
+        "cpu": cpu,
+        "mem": mem,
+        "mem_limit": memory.get("limit"),
+        "net_rx": sum(n.get("rx_bytes", 0) for n in networks) if networks else None,
+        "net_tx": sum(n.get("tx_bytes", 0) for n in networks) if networks else None,
+        "blk_read": sum(e["value"] for e in blkio if e.get("op", "").lower() == "read"),
+        "blk_write": sum(e["value"] for e in blkio if e.get("op", "").lower() == "write"),
+        "pids": (data.get("pids_stats") or {}).get("current"),
+    }
+
+
+def stream_stats(container: str | None = None) -> "Stream":
+    """
+    Streams resource samples as plain dicts: {"id", "name", "cpu" (percent),
+    "mem", "mem_limit", "pids"} plus the cumulative byte counters "net_rx",
+    "net_tx", "blk_read" and "blk_write". The stream never ends by itself:
+    close it to stop the `docker stats` process or the Engine API connection.
+
+    On the CLI one `docker stats` process streams every running container
+    (including ones started later) when `container` is None.
+    The Engine API streams one container per connection, so it needs `container`.
+    """
+    from app.services.engine_svc import Stream
+
+    if get_transport() == Transport.SOCKET:
+        if container is None:
+            raise ValueError("The socket transport streams stats per container")
+        stats = _engine().container_stats(container)
+        return Stream(map(_stats_from_engine, stats), stats.close)
+
+    from app.services.log_svc import iter_lines
+
+    command = docker.client_config.docker_cmd + ["stats", "--format", "{{json .}}"]
+    if container:
+        command.append(container)
+    output = _stream_process(command)
+
+    def samples():
+        for line in iter_lines(output):
+            # Each refresh is wrapped in terminal escapes (clear screen, erase line)
+            line = _ANSI_RE.sub("", line).strip()
+            if line.startswith("{"):
+                yield _stats_from_cli(json.loads(line))
+
+    return Stream(samples(), output.close)
+
+
+def _log_labels(records: list[dict]) -> dict[str, str]:
+    """Prefix per container: the service name, or the container name for scaled services."""
+    services = [r["service"] for r in records]
+    return {
+        r["name"]: r["service"] if r["service"] and services.count(r["service"]) == 1 else r["name"]
+        for r in records
+    }
+
+
+def show_logs(
+    containers: list[str],
+    labels: dict[str, str] | None = None,
+    tail: int | None = 100,
+    follow: bool = False,
+    since: str | None = None,
+    grep: str | None = None,
+    level: str | None = None,
+    timestamps: bool = False,
+    color: bool = True,
+    capture: str | None = None,
+    where: list[str] | None = None,
+    fields: list[str] | None = None,
+    stats: bool = False,
+    window: float = 60,
+):
+    """
+    Follows the logs of several containers at once (one reader each), merged
+    by timestamp, filtered by `grep`/`level`/`where` before rendering and prefixed
+    with each container's label. `since` is applied by Docker.
+    With `capture`, every line is also persisted to that log store (see logstore_svc).
+    With `stats`, a table of line counts per service, level and message template
+    (over the last `window` seconds when following) is shown instead of the lines.
+    """
+    from app.services.log_svc import merge_streams, render_lines, render_stats
+    from app.services.logstore_svc import LogStore
+
+    labels = labels or {name: name for name in containers}
+    sources = {
+        labels[name]: (lambda name=name: (
+            chunk for _, chunk in stream_container_logs(name, tail=tail, follow=follow, since=since, timestamps=True)
+        ))
+        for name in containers
+    }
+    store = LogStore(capture).open() if capture else None
+    try:
+        lines = merge_streams(
+            sources, follow=follow, grep=grep, level=level, where=where,
+            fields=None if stats else fields, capture=store.append if store else None,
+        )
+        if stats:
+            render_stats(lines, follow=follow, window=window)
+        else:
+            render_lines(lines, labels=list(sources), timestamps=timestamps, color=color)
+    finally:
+        if store:
+            store.close()
+
+
+def compose_logs(
+    path: str,
+    tail: int = 100,
+    follow: bool = True,
+    services: list[str] | None = None,
+    capture: bool = False,
+    **options,
+):
+    """
+    Logs of every container of the compose project at `path` (or only `services`);
+    see show_logs. `capture` persists them in the project's log store.
+    """
+    if capture:
+        options["capture"] = compose_project_name(Path(path).absolute().expanduser().resolve())
+    snapshot = get_project_snapshot(path)
+    records = [r for r in snapshot if not services or r["service"] in services]
+    if not records:
+        raise RuntimeError("No containers found for this project" + (f" (services: {', '.join(services)})" if services else ""))
+    labels = _log_labels(records)
+    show_logs([r["name"] for r in records], labels=labels, tail=tail, follow=follow, **options)
+
+
+def container_logs(container_name: str, tail: int = 100, follow: bool = True, capture: bool = False, **options):
+    if capture:
+        options["capture"] = container_name
+    show_logs([container_name], tail=tail, follow=follow, **options)
 
 
 # down
@@ -259,7 +876,7 @@ def compose_down(
 ):
     try:
         project_dir = Path(path).absolute().expanduser().resolve()
-        client = DockerClient(compose_project_directory=str(project_dir))
+        client = _compose_client(compose_project_directory=str(project_dir))
         
         rmi = "all" if remove_images else None
         
@@ -280,20 +897,19 @@ def container_down(
         image_to_remove = None
         if remove_images:
             try:
-                inspect_data = docker.container.inspect(container_name)
-                image_to_remove = inspect_data.image
+                record = inspect_containers([container_name]).get(container_name)
+                image_to_remove = record["image_id"] if record else None
             except Exception:
                 pass
 
-        docker.container.remove(
-            container_name, 
-            volumes=remove_volumes, 
-            force=True
-        )
+        _remove_container(container_name, volumes=remove_volumes, force=True)
 
         if image_to_remove:
             try:
-                docker.image.remove(image_to_remove, force=True)
+                if get_transport() == Transport.SOCKET:
+                    _engine().remove_image(image_to_remove, force=True)
+                else:
+                    docker.image.remove(image_to_remove, force=True)
             except Exception:
                 pass
                 
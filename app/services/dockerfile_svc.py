@@ -0,0 +1,301 @@
+import json
+import re
+import shlex
+from pathlib import Path
+
+from app.services.cache_svc import cached_file_model
+
+# Bump when the shape of the parsed instructions changes, to invalidate cached models
+DOCKERFILE_MODEL_VERSION = 1
+
+_DIRECTIVE_RE = re.compile(r"^#\s*([a-zA-Z][a-zA-Z0-9_-]*)\s*=\s*(.*?)\s*$")
+_HEREDOC_RE = re.compile(r"<<-?\s*([\"']?)([A-Za-z_][A-Za-z0-9_]*)\1")
+_VAR_RE = re.compile(
+    r"\$(?:\{(?P<braced>[A-Za-z_][A-Za-z0-9_]*)(?:(?P<op>:?[-+])(?P<word>[^}]*))?\}"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*))"
+)
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ns|us|µs|ms|s|m|h)")
+_DURATION_UNITS = {"ns": 1e-9, "us": 1e-6, "µs": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600}
+_URL_RE = re.compile(
+    r"(?:(?P<scheme>https?)://)?(?P<host>localhost|127\.0\.0\.1|0\.0\.0\.0|\[::1\])"
+    r"(?::(?P<port>\d+))?(?P<path>/[^\s'\"|;&)]*)?"
+)
+
+# Instructions whose arguments Docker expands ARG/ENV variables in
+_EXPANDED = {"ADD", "COPY", "ENV", "EXPOSE", "FROM", "LABEL", "STOPSIGNAL", "USER", "VOLUME", "WORKDIR"}
+
+
+def parse_instructions(data: bytes) -> dict:
+    """
+    Splits a Dockerfile into logical instructions: parser directives (escape),
+    comments, line continuations and heredocs are handled here, variables are not.
+
+    Returns:
+        dict: {"escape": str, "instructions": [{"keyword", "value", "line"}]}
+    """
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    escape = "\\"
+
+    # Parser directives are only recognized before anything else
+    start = 0
+    for start, line in enumerate(lines):
+        match = _DIRECTIVE_RE.match(line)
+        if not match:
+            break
+        if match[1].lower() == "escape" and match[2] in ("\\", "`"):
+            escape = match[2]
+    else:
+        start = len(lines)
+
+    instructions = []
+    index = start
+    while index < len(lines):
+        line = lines[index].strip()
+        number = index + 1
+        index += 1
+        if not line or line.startswith("#"):
+            continue
+
+        # Join continuation lines; comments and blank lines inside are dropped
+        parts = []
+        while line.rstrip().endswith(escape) and index < len(lines):
+            parts.append(line.rstrip()[:-1])
+            line = lines[index].strip()
+            index += 1
+            while (not line or line.startswith("#")) and index < len(lines):
+                line = lines[index].strip()
+                index += 1
+        parts.append(line.rstrip()[:-1] if line.rstrip().endswith(escape) else line)
+        text = " ".join(p.strip() for p in parts if p.strip())
+
+        keyword, _, value = text.partition(" ")
+        keyword = keyword.upper()
+
+        # Heredoc bodies (RUN <<EOF ... EOF) belong to the instruction, not the parser
+        for match in _HEREDOC_RE.finditer(value) if keyword in ("RUN", "COPY", "ADD") else ():
+            body = []
+            while index < len(lines) and lines[index].strip() != match[2]:
+                body.append(lines[index])
+                index += 1
+            index += 1
+            value += "\n" + "\n".join(body)
+
+        instructions.append({"keyword": keyword, "value": value.strip(), "line": number})
+    return {"escape": escape, "instructions": instructions}
+
+
+def substitute(value: str, variables: dict[str, str], escape: str = "\\") -> str:
+    """
+    Expands $VAR, ${VAR}, ${VAR:-default} and ${VAR:+alternative} like Docker
+    does; unknown variables are empty and an escaped \\$ stays a literal $.
+    """
+    placeholder = "\0"
+    value = value.replace(f"{escape}$", placeholder)
+
+    def expand(match) -> str:
+        name = match["braced"] or match["name"]
+        current = variables.get(name)
+        op = match["op"]
+        if op:
+            is_set = current is not None and (current != "" or not op.startswith(":"))
+            word = substitute(match["word"], variables, escape)
+            if op.endswith("-"):
+                return current if is_set else word
+            return word if is_set else ""
+        return current or ""
+
+    return _VAR_RE.sub(expand, value).replace(placeholder, "$")
+
+
+def _words(value: str) -> list[str]:
+    try:
+        return shlex.split(value)
+    except ValueError:
+        return value.split()
+
+
+def _parse_duration(text: str) -> float | None:
+    parts = _DURATION_RE.findall(text)
+    if not parts or "".join(n + u for n, u in parts) != text:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _parse_from(value: str) -> dict:
+    words = value.split()
+    platform = None
+    while words and words[0].startswith("--"):
+        flag = words.pop(0)
+        if flag.startswith("--platform="):
+            platform = flag.split("=", 1)[1]
+    image = words[0] if words else ""
+    name = words[2] if len(words) >= 3 and words[1].upper() == "AS" else None
+    return {"image": image, "name": name.lower() if name else None, "platform": platform}
+
+
+def _parse_healthcheck(value: str, env: dict[str, str]) -> dict:
+    words = value.split(None, 1)
+    options = {}
+    while words and words[0].startswith("--"):
+        flag, _, option = words[0][2:].partition("=")
+        options[flag.replace("-", "_")] = option
+        words = words[1].split(None, 1) if len(words) > 1 else []
+
+    kind = words[0].upper() if words else "NONE"
+    if kind != "CMD":
+        return {"disabled": True, "test": None, "http": None}
+
+    command = words[1] if len(words) > 1 else ""
+    if command.startswith("["):
+        try:
+            # Exec form: no shell, so no variables are expanded at runtime either
+            command = " ".join(json.loads(command))
+        except ValueError:
+            pass
+    else:
+        # Shell form: the shell in the container expands the image's ENV
+        command = substitute(command, env)
+
+    healthcheck = {"disabled": False, "test": command, "http": None}
+    for option in ("interval", "timeout", "start_period", "start_interval"):
+        if option in options:
+            healthcheck[option] = _parse_duration(options[option])
+    if options.get("retries", "").isdigit():
+        healthcheck["retries"] = int(options["retries"])
+
+    # curl/wget against the container itself: that's the endpoint the app answers health on
+    match = _URL_RE.search(command)
+    if match and (match["scheme"] or match["port"] or match["path"]):
+        scheme = match["scheme"] or "http"
+        healthcheck["http"] = {
+            "scheme": scheme,
+            "port": int(match["port"]) if match["port"] else (443 if scheme == "https" else 80),
+            "path": match["path"] or "/",
+        }
+    return healthcheck
+
+
+def _parse_expose(value: str) -> list[str]:
+    from app.services.ports_svc import format_port_range, parse_port_range
+
+    exposed = []
+    for word in value.split():
+        ports, _, protocol = word.partition("/")
+        try:
+            exposed.append(format_port_range(parse_port_range(ports)) + (f"/{protocol.lower()}" if protocol.lower() not in ("", "tcp") else ""))
+        except ValueError:
+            # e.g. a variable that is not set: Docker fails the build on it
+            continue
+    return exposed
+
+
+def analyze_dockerfile(
+    dockerfile_path: str | Path,
+    build_args: dict[str, str] | None = None,
+    target: str | None = None,
+) -> dict:
+    """
+    Builds a model of every stage of a Dockerfile, the way the image config
+    ends up: ARG/ENV substitution, stages inheriting ENV, EXPOSE and HEALTHCHECK
+    from the stage they start FROM, and the stage `docker build --target` builds
+    (the last one by default). Parsing is cached per file (see cache_svc).
+
+    Returns:
+        dict: {"path", "args" (global ARGs), "stages": [stage...], "target": stage}
+        where a stage is {"index", "name", "image", "parent", "args", "env",
+        "expose", "healthcheck", "depends_on"}; "expose" holds container port specs
+        ("80", "53/udp", "8000-8010") and "healthcheck" is None when never set.
+
+    Raises ValueError when `target` names no stage.
+    """
+    path = Path(dockerfile_path).expanduser().resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"Dockerfile not found: {path}")
+    parsed = cached_file_model(path, namespace="dockerfiles", parse=parse_instructions, version=DOCKERFILE_MODEL_VERSION)
+    escape = parsed["escape"]
+    build_args = build_args or {}
+
+    global_args: dict[str, str | None] = {}
+    stages: list[dict] = []
+    stage = None
+    for instruction in parsed["instructions"]:
+        keyword, value = instruction["keyword"], instruction["value"]
+
+        if keyword == "FROM":
+            source = _parse_from(substitute(value, {k: v for k, v in global_args.items() if v is not None}, escape))
+            names = {s["name"]: s for s in stages if s["name"]}
+            parent = names.get(source["image"].lower())
+            stage = {
+                "index": len(stages),
+                "name": source["name"],
+                "image": source["image"],
+                "platform": source["platform"],
+                "parent": parent["index"] if parent else None,
+                "args": {},
+                "env": dict(parent["env"]) if parent else {},
+                "expose": list(parent["expose"]) if parent else [],
+                "healthcheck": parent["healthcheck"] if parent else None,
+                "depends_on": [parent["index"]] if parent else [],
+                "line": instruction["line"],
+            }
+            stages.append(stage)
+            continue
+
+        if keyword == "ARG":
+            for word in _words(value):
+                name, has_default, default = word.partition("=")
+                if name in build_args:
+                    arg = build_args[name]
+                elif has_default:
+                    arg = substitute(default, {**(stage["args"] if stage else {}), **(stage["env"] if stage else {})}, escape)
+                else:
+                    # Re-declaring a global ARG in a stage brings its value in
+                    arg = global_args.get(name) if stage else None
+                if stage is None:
+                    global_args[name] = arg
+                elif arg is not None:
+                    stage["args"][name] = arg
+            continue
+
+        if stage is None:
+            continue
+        variables = {**stage["args"], **stage["env"]}
+        if keyword in _EXPANDED:
+            value = substitute(value, variables, escape)
+
+        if keyword == "ENV":
+            words = _words(value)
+            if words and "=" not in words[0]:
+                # Legacy form: ENV KEY the rest is the value
+                key, _, rest = value.partition(" ")
+                stage["env"][key] = rest.strip()
+            else:
+                for word in words:
+                    key, _, env_value = word.partition("=")
+                    stage["env"][key] = env_value
+        elif keyword == "EXPOSE":
+            for spec in _parse_expose(value):
+                if spec not in stage["expose"]:
+                    stage["expose"].append(spec)
+        elif keyword == "HEALTHCHECK":
+            stage["healthcheck"] = _parse_healthcheck(value, stage["env"])
+        elif keyword in ("COPY", "ADD", "RUN"):
+            # COPY --from=<stage> and RUN --mount=from=<stage> need that stage built first
+            for match in re.finditer(r"--(?:from|mount=[^ ]*\bfrom)=([^\s,]+)", value):
+                reference = substitute(match[1], variables, escape).lower()
+                for other in stages[:-1]:
+                    if (other["name"] == reference or str(other["index"]) == reference) and other["index"] not in stage["depends_on"]:
+                        stage["depends_on"].append(other["index"])
+
+    if not stages:
+        raise ValueError(f"No FROM instruction in {path}")
+
+    if target:
+        chosen = next((s for s in stages if s["name"] == target.lower()), None)
+        if chosen is None:
+            names = ", ".join(s["name"] for s in stages if s["name"]) or "none are named"
+            raise ValueError(f"Build target '{target}' is not a stage of {path.name} (stages: {names})")
+    else:
+        chosen = stages[-1]
+
+    return {"path": str(path), "args": global_args, "stages": stages, "target": chosen}
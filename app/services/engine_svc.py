@@ -0,0 +1,356 @@
+import json
+import os
+import queue
+import socket
+import struct
+from http.client import HTTPConnection, HTTPException
+from typing import Callable, Iterator
+from urllib.parse import quote, urlencode
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+
+
+class EngineError(RuntimeError):
+    """Raised when the Docker Engine API answers with an error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker Engine API error {status}: {message}")
+        self.status = status
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """HTTPConnection that talks to a Unix domain socket instead of TCP."""
+
+    def __init__(self, socket_path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def default_socket_path() -> str:
+    """
+    Resolves the Engine socket: MATE_DOCKER_SOCKET, then a unix:// DOCKER_HOST,
+    then the standard /var/run/docker.sock.
+    """
+    explicit = os.environ.get("MATE_DOCKER_SOCKET")
+    if explicit:
+        return explicit
+    host = os.environ.get("DOCKER_HOST", "")
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return DEFAULT_SOCKET
+
+
+def demux_stream(raw: bytes) -> tuple[bytes, bytes]:
+    """
+    Splits a multiplexed (non-TTY) attach/exec/logs payload into stdout and stderr.
+    Each frame is an 8 byte header [stream, 0, 0, 0, size(uint32 BE)] plus payload.
+    """
+    stdout, stderr = bytearray(), bytearray()
+    offset = 0
+    while offset + 8 <= len(raw):
+        stream_type, size = struct.unpack(">BxxxL", raw[offset:offset + 8])
+        payload = raw[offset + 8:offset + 8 + size]
+        (stderr if stream_type == 2 else stdout).extend(payload)
+        offset += 8 + size
+    return bytes(stdout), bytes(stderr)
+
+
+class StreamDemuxer:
+    """
+    Incremental demux_stream for streamed (follow) output: frames may be split
+    across chunks, so incomplete frames are kept until the rest arrives.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[tuple[str, bytes]]:
+        self._buffer.extend(chunk)
+        frames = []
+        while len(self._buffer) >= 8:
+            stream_type, size = struct.unpack(">BxxxL", self._buffer[:8])
+            if len(self._buffer) < 8 + size:
+                break
+            payload = bytes(self._buffer[8:8 + size])
+            del self._buffer[:8 + size]
+            frames.append(("stderr" if stream_type == 2 else "stdout", payload))
+        return frames
+
+
+class Stream:
+    """
+    Iterator over a streamed source (an Engine API response, a docker CLI
+    process) that another thread can close: close() shuts the connection down
+    or kills the process, so a consumer blocked reading it wakes up and the
+    iteration ends. Closing a generator from another thread does not work.
+    """
+
+    def __init__(self, items: Iterator, close: Callable[[], None]):
+        self._items = items
+        self._close = close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def close(self):
+        self._close()
+
+
+class EngineClient:
+    """
+    Minimal Docker Engine API client over the Unix socket.
+
+    Connections are kept alive and pooled, so a command that issues many
+    requests pays for neither a fork/exec of the docker CLI nor a new
+    connection per call.
+    """
+
+    def __init__(self, socket_path: str | None = None, pool_size: int = 8, timeout: float | None = 30):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    # --- connection pool ---
+    def _acquire(self) -> UnixHTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+
+    def _release(self, conn: UnixHTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # --- raw requests ---
+    @staticmethod
+    def _url(path: str, params: dict | None = None) -> str:
+        if not params:
+            return path
+        return f"{path}?{urlencode(params)}"
+
+    def request(self, method: str, path: str, params: dict | None = None, body=None) -> tuple[int, bytes]:
+        """Performs a request on a pooled connection and returns (status, body)."""
+        url = self._url(path, params)
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        # A kept-alive connection may have been closed by the daemon; retry once on a fresh one
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (HTTPException, ConnectionError, BrokenPipeError):
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+
+    def request_json(self, method: str, path: str, params: dict | None = None, body=None):
+        status, data = self.request(method, path, params=params, body=body)
+        if status >= 400:
+            raise EngineError(status, self._error_message(data))
+        return json.loads(data) if data else None
+
+    def stream(self, method: str, path: str, params: dict | None = None, body=None, timeout: float | None = None) -> Stream:
+        """
+        Returns a Stream of the raw chunks of a streaming response (events, logs,
+        stats). The stream gets its own connection, which is closed when the
+        stream ends or is closed.
+        """
+        conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        closed = False
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        def chunks() -> Iterator[bytes]:
+            try:
+                conn.request(method, self._url(path, params), body=payload, headers=headers)
+                response = conn.getresponse()
+                if response.status >= 400:
+                    raise EngineError(response.status, self._error_message(response.read()))
+                while not closed:
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        return
+                    yield chunk
+            except (OSError, HTTPException):
+                # Reading a connection close() shut down fails (e.g. mid-chunk)
+                if not closed:
+                    raise
+            finally:
+                conn.close()
+
+        def close():
+            nonlocal closed
+            closed = True
+            if conn.sock is not None:
+                try:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        return Stream(chunks(), close)
+
+    def stream_json(self, method: str, path: str, params: dict | None = None, timeout: float | None = None) -> Stream:
+        """Returns a Stream of the decoded objects of a JSON-lines stream, one per line."""
+        chunks = self.stream(method, path, params=params, timeout=timeout)
+
+        def objects() -> Iterator[dict]:
+            buffer = b""
+            for chunk in chunks:
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+
+        return Stream(objects(), chunks.close)
+
+    @staticmethod
+    def _error_message(data: bytes) -> str:
+        try:
+            return json.loads(data).get("message", "") or data.decode(errors="replace")
+        except (ValueError, AttributeError):
+            return data.decode(errors="replace")
+
+    # --- containers ---
+    def ping(self) -> bool:
+        try:
+            status, _ = self.request("GET", "/_ping")
+            return status == 200
+        except OSError:
+            return False
+
+    def list_containers(self, all: bool = False, filters: dict | None = None) -> list[dict]:
+        params = {"all": "1" if all else "0"}
+        if filters:
+            # Engine filters are {key: [values]}
+            params["filters"] = json.dumps({
+                k: v if isinstance(v, list) else [v] for k, v in filters.items()
+            })
+        return self.request_json("GET", "/containers/json", params=params)
+
+    def inspect_container(self, reference: str) -> dict:
+        return self.request_json("GET", f"/containers/{quote(reference, safe='')}/json")
+
+    def container_exists(self, reference: str) -> bool:
+        try:
+            self.inspect_container(reference)
+            return True
+        except EngineError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def stop_container(self, reference: str):
+        status, data = self.request("POST", f"/containers/{quote(reference, safe='')}/stop")
+        # 304: already stopped
+        if status >= 400:
+            raise EngineError(status, self._error_message(data))
+
+    def remove_container(self, reference: str, volumes: bool = False, force: bool = False):
+        params = {"v": "1" if volumes else "0", "force": "1" if force else "0"}
+        self.request_json("DELETE", f"/containers/{quote(reference, safe='')}", params=params)
+
+    def remove_image(self, reference: str, force: bool = False):
+        self.request_json("DELETE", f"/images/{quote(reference, safe='')}", params={"force": "1" if force else "0"})
+
+    def inspect_image(self, reference: str) -> dict:
+        return self.request_json("GET", f"/images/{quote(reference, safe='')}/json")
+
+    def container_logs(
+        self,
+        container: str,
+        tail: int | None = None,
+        follow: bool = False,
+        since: float | None = None,
+        timestamps: bool = False,
+    ) -> Iterator[tuple[str, bytes]]:
+        """Yields ("stdout" | "stderr", chunk) as the daemon sends the log stream."""
+        info = self.inspect_container(container)
+        params = {"stdout": "1", "stderr": "1", "follow": "1" if follow else "0", "timestamps": "1" if timestamps else "0"}
+        if tail is not None:
+            params["tail"] = str(tail)
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+        chunks = self.stream("GET", f"/containers/{quote(container, safe='')}/logs", params=params)
+
+        # TTY containers send raw output, the others multiplexed frames
+        if (info.get("Config") or {}).get("Tty"):
+            for chunk in chunks:
+                yield "stdout", chunk
+            return
+        demuxer = StreamDemuxer()
+        for chunk in chunks:
+            yield from demuxer.feed(chunk)
+
+    def container_stats(self, container: str, stream: bool = True) -> Stream:
+        """Yields the container's resource stats, about once per second while streaming."""
+        return self.stream_json(
+            "GET", f"/containers/{quote(container, safe='')}/stats", params={"stream": "1" if stream else "0"}
+        )
+
+    def exec_run(self, container: str, cmd: list[str]) -> tuple[int, bytes, bytes]:
+        """Runs a command in a container and returns (exit_code, stdout, stderr)."""
+        created = self.request_json(
+            "POST",
+            f"/containers/{quote(container, safe='')}/exec",
+            body={"Cmd": cmd, "AttachStdout": True, "AttachStderr": True, "Tty": False},
+        )
+        exec_id = created["Id"]
+        status, raw = self.request("POST", f"/exec/{exec_id}/start", body={"Detach": False, "Tty": False})
+        if status >= 400:
+            raise EngineError(status, self._error_message(raw))
+        stdout, stderr = demux_stream(raw)
+        info = self.request_json("GET", f"/exec/{exec_id}/json")
+        return info.get("ExitCode") or 0, stdout, stderr
+
+
+_client: EngineClient | None = None
+
+
+def get_engine_client() -> EngineClient:
+    """Returns the process-wide Engine client (one connection pool per `mate` run)."""
+    global _client
+    if _client is None:
+        _client = EngineClient()
+    return _client
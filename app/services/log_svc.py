@@ -0,0 +1,600 @@
+import codecs
+import heapq
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+# Lines longer than this are emitted in pieces, so one runaway line can't grow the buffer
+MAX_LINE_CHARS = 1024 * 1024
+
+
+class LineDecoder:
+    """
+    Turns a stream of byte chunks into complete text lines. UTF-8 is decoded
+    incrementally, so a character split across two chunks is never garbled,
+    and at most one partial line is held in memory.
+    """
+
+    def __init__(self, max_line: int = MAX_LINE_CHARS):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+        self.max_line = max_line
+
+    def feed(self, chunk: bytes) -> list[str]:
+        text = self._pending + self._decoder.decode(chunk)
+        *lines, self._pending = text.split("\n")
+        if len(self._pending) > self.max_line:
+            lines.append(self._pending)
+            self._pending = ""
+        return [line + "\n" for line in lines]
+
+    def flush(self) -> list[str]:
+        """Returns whatever is left once the stream ended (a last line without newline)."""
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return [text + "\n"] if text else []
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yields complete, decoded lines from an iterable of byte chunks."""
+    decoder = LineDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+class BufferedLogWriter:
+    """
+    Collects output and writes it in batches: when `max_chars` characters are buffered,
+    or at the latest `max_delay` seconds after the first buffered line
+    (a background thread flushes quiet streams). Chatty services then cost a
+    few large writes per second instead of one write and flush per line.
+    """
+
+    def __init__(self, stream=None, max_chars: int = 64 * 1024, max_delay: float = 0.1):
+        self.stream = stream or sys.stdout
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self.closed = False
+        self._parts: list[str] = []
+        self._size = 0
+        self._since: float | None = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._thread.start()
+
+    def write(self, text: str):
+        if self.closed:
+            return
+        with self._lock:
+            if self._since is None:
+                self._since = time.monotonic()
+            self._parts.append(text)
+            self._size += len(text)
+            if self._size >= self.max_chars:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._parts:
+            return
+        data = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        self._since = None
+        try:
+            self.stream.write(data)
+            self.stream.flush()
+        except BrokenPipeError:
+            # e.g. `mate logs | head`: the reader is gone, stop writing
+            self.closed = True
+
+    def _flush_periodically(self):
+        while not self._wakeup.wait(self.max_delay):
+            with self._lock:
+                if self._since is not None and time.monotonic() - self._since >= self.max_delay:
+                    self._flush_locked()
+
+    def close(self):
+        self._wakeup.set()
+        self.flush()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# --- multiplexed followers ---
+LEVELS = {
+    "trace": 0,
+    "debug": 1,
+    "info": 2,
+    "notice": 2,
+    "warn": 3,
+    "warning": 3,
+    "err": 4,
+    "error": 4,
+    "critical": 5,
+    "fatal": 5,
+    "panic": 5,
+}
+_LEVEL_RE = re.compile(r"\b(trace|debug|info|notice|warn(?:ing)?|err(?:or)?|critical|fatal|panic)\b", re.I)
+
+# Service prefix colors, cycled like `docker compose logs`
+PREFIX_COLORS = ["36", "33", "32", "35", "34", "96", "93", "92", "95", "94"]
+
+
+def detect_level(text: str) -> int | None:
+    """Returns the severity (see LEVELS) of the first level word in a log line, if any."""
+    match = _LEVEL_RE.search(text)
+    return LEVELS[match.group(1).lower()] if match else None
+
+
+# --- structured (JSON) lines ---
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Field names services commonly use for the level and the message
+LEVEL_FIELDS = ("level", "lvl", "severity", "log.level", "levelname")
+MESSAGE_FIELDS = ("msg", "message", "event", "log")
+# pino / bunyan numeric levels
+NUMERIC_LEVELS = {10: 0, 20: 1, 30: 2, 40: 3, 50: 4, 60: 5}
+
+
+def parse_json_line(text: str) -> dict | None:
+    """Returns the object of a JSON log line, or None for plain text lines."""
+    stripped = text.strip()
+    if not stripped.startswith("{"):
+        return None
+    try:
+        record = _json_loads(stripped)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def get_field(record: dict, path: str):
+    """Looks up a field by name, or a dotted path into nested objects (e.g. http.status)."""
+    if path in record:
+        return record[path]
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def record_level(record: dict) -> int | None:
+    """Severity (see LEVELS) of a JSON log record, from its level field."""
+    for field in LEVEL_FIELDS:
+        value = get_field(record, field)
+        if isinstance(value, str) and value.lower() in LEVELS:
+            return LEVELS[value.lower()]
+        if isinstance(value, int) and not isinstance(value, bool):
+            return NUMERIC_LEVELS.get(value)
+    return None
+
+
+def record_message(record: dict) -> str | None:
+    for field in MESSAGE_FIELDS:
+        value = get_field(record, field)
+        if isinstance(value, str):
+            return value
+    return None
+
+
+_CONDITION_RE = re.compile(r"^([^<>=!~]+?)\s*(>=|<=|!=|=|>|<|~)\s*(.*)$")
+
+
+def parse_condition(condition: str):
+    """
+    Turns a --where condition into a predicate on a JSON record.
+    Operators: = and != (case-insensitive), > >= < <= (numeric) and ~ (regex).
+    """
+    match = _CONDITION_RE.match(condition.strip())
+    if not match:
+        raise ValueError(f"Invalid condition '{condition}', use e.g. level=error, status>=500 or msg~timeout")
+    field, operator, expected = match.groups()
+
+    if operator == "~":
+        pattern = re.compile(expected, re.I)
+        return lambda record: (value := get_field(record, field)) is not None and bool(pattern.search(str(value)))
+
+    if operator in ("=", "!="):
+        def equals(record):
+            value = get_field(record, field)
+            if value is None:
+                return False
+            if isinstance(value, bool):
+                value = str(value).lower()
+            return str(value).lower() == expected.lower()
+        return equals if operator == "=" else (lambda record: not equals(record))
+
+    try:
+        limit = float(expected)
+    except ValueError:
+        raise ValueError(f"Invalid condition '{condition}': {operator} needs a number")
+    compare = {
+        ">": lambda v: v > limit,
+        ">=": lambda v: v >= limit,
+        "<": lambda v: v < limit,
+        "<=": lambda v: v <= limit,
+    }[operator]
+
+    def numeric(record):
+        value = get_field(record, field)
+        try:
+            return compare(float(value))
+        except (TypeError, ValueError):
+            return False
+    return numeric
+
+
+def format_fields(record: dict, fields: list[str]) -> str:
+    """Projects a JSON record to `field=value` pairs, in the order asked for."""
+    parts = []
+    for field in fields:
+        value = get_field(record, field)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value if value and not any(c.isspace() or c in "\"=" for c in value) else json.dumps(value)
+        elif not isinstance(value, (int, float)):
+            value = json.dumps(value, default=str)
+        parts.append(f"{field}={value}")
+    return " ".join(parts) + "\n"
+
+
+class LineFilter:
+    """
+    --grep / --level / --where / --fields stage for one log stream.
+    JSON lines are parsed once (with orjson when installed): their level
+    field takes precedence and --where conditions apply to their fields.
+    Lines without a level (e.g. stack trace continuations) inherit the level
+    of the line before them.
+    """
+
+    def __init__(
+        self,
+        grep: str | None = None,
+        level: str | None = None,
+        where: list[str] | None = None,
+        fields: list[str] | None = None,
+    ):
+        if level and level.lower() not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}', values must be {sorted(set(LEVELS))}")
+        self.pattern = re.compile(grep, re.I) if grep else None
+        self.min_level = LEVELS[level.lower()] if level else None
+        self.conditions = [parse_condition(c) for c in where or []]
+        self.fields = fields or None
+        self._needs_json = bool(self.conditions or self.fields or self.min_level is not None)
+        self._last_level = None
+
+    def process(self, text: str) -> str | None:
+        """Returns the line as it should be shown, or None when it is filtered out."""
+        record = parse_json_line(text) if self._needs_json else None
+
+        if self.min_level is not None:
+            level = record_level(record) if record else None
+            if level is None:
+                level = detect_level(text)
+            if level is None:
+                level = self._last_level
+            else:
+                self._last_level = level
+            if level is None or level < self.min_level:
+                return None
+        if self.conditions and (record is None or not all(c(record) for c in self.conditions)):
+            return None
+        if self.pattern and not self.pattern.search(text):
+            return None
+        if self.fields and record is not None:
+            return format_fields(record, self.fields)
+        return text
+
+    def __call__(self, text: str) -> bool:
+        return self.process(text) is not None
+
+
+# --- aggregation ---
+_TEMPLATE_RULES = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(?:0x)?[0-9a-f]*\d[0-9a-f]*[a-f][0-9a-f]*\b|\b[0-9a-f]*[a-f][0-9a-f]*\d[0-9a-f]*\b", re.I), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\"[^\"]*\"|'[^']*'"), "<str>"),
+]
+
+
+def message_template(message: str, limit: int = 120) -> str:
+    """Collapses the variable parts of a message (ids, numbers, addresses, quoted values) into placeholders."""
+    template = message.strip()
+    for pattern, placeholder in _TEMPLATE_RULES:
+        template = pattern.sub(placeholder, template)
+    return template[:limit]
+
+
+LEVEL_NAMES = {0: "trace", 1: "debug", 2: "info", 3: "warn", 4: "error", 5: "fatal"}
+
+
+class LogStats:
+    """
+    Counts log lines per (service, level, message template) over a sliding
+    window of `window` seconds (None: everything seen). Counts are kept in
+    one-second buckets, so memory depends on the window, not the log volume.
+    """
+
+    def __init__(self, window: float | None = 60):
+        self.window = window
+        self.buckets: deque = deque()
+        self.total = Counter()
+        self._last_level: dict[str, int | None] = {}
+
+    def add(self, label: str, text: str, now: float | None = None):
+        record = parse_json_line(text)
+        level = record_level(record) if record else None
+        if level is None:
+            level = detect_level(text)
+        if level is None:
+            level = self._last_level.get(label)
+        else:
+            self._last_level[label] = level
+        message = (record_message(record) if record else None) or text
+        key = (label, LEVEL_NAMES.get(level, "-"), message_template(message))
+
+        second = int(now if now is not None else time.monotonic())
+        if not self.buckets or self.buckets[-1][0] != second:
+            self.buckets.append((second, Counter()))
+        self.buckets[-1][1][key] += 1
+        self.total[key] += 1
+        self.expire(second)
+
+    def expire(self, now: float | None = None):
+        if self.window is None:
+            return
+        cutoff = (now if now is not None else time.monotonic()) - self.window
+        while self.buckets and self.buckets[0][0] <= cutoff:
+            _, counts = self.buckets.popleft()
+            self.total.subtract(counts)
+        self.total = +self.total
+
+    def rows(self, top: int = 25) -> list[dict]:
+        """The most frequent groups with their count and rate (lines per second) in the window."""
+        if self.window:
+            span = self.window
+        elif self.buckets:
+            span = max(1, self.buckets[-1][0] - self.buckets[0][0] + 1)
+        else:
+            span = 1
+        return [
+            {"service": label, "level": level, "template": template, "count": count, "rate": count / span}
+            for (label, level, template), count in self.total.most_common(top)
+        ]
+
+
+def render_stats(
+    lines: Iterable[tuple[str, str, str]],
+    follow: bool = False,
+    window: float = 60,
+    top: int = 25,
+):
+    """
+    Shows a per service / level / message template table instead of the
+    lines: refreshed every second while following, printed once otherwise.
+    Following counts lines at the time they arrive; otherwise rates are over
+    the time span of the log timestamps.
+    """
+    from app.utils import TableDisplay, LiveDisplay
+
+    stats = LogStats(window=window if follow else None)
+
+    def table():
+        title = f"Log Stats (last {window:g}s)" if follow else "Log Stats"
+        view = TableDisplay(
+            title=title,
+            columns=[
+                {"header": "Service", "style": "cyan", "no_wrap": True},
+                {"header": "Level", "no_wrap": True},
+                {"header": "Message Template", "ratio": 1},
+                {"header": "Count"},
+                {"header": "Rate/s"},
+            ],
+        )
+        for row in stats.rows(top):
+            style = "red" if row["level"] in ("error", "fatal") else "yellow" if row["level"] == "warn" else "white"
+            view.add_row([
+                row["service"],
+                f"[{style}]{row['level']}[/{style}]",
+                row["template"],
+                str(row["count"]),
+                f"{row['rate']:.2f}",
+            ])
+        return view
+
+    if not follow:
+        # Rates over the logs' own time span, from their timestamps only: a line
+        # without one counts at the timestamp of the line before it (or after
+        # it, at the start), never at the wall clock time it was read
+        seconds: dict[str, float | None] = {}
+        last = None
+        leading = []
+        for key, label, text in lines:
+            second = key[:19]
+            if second and second not in seconds:
+                try:
+                    seconds[second] = datetime.fromisoformat(second).timestamp()
+                except ValueError:
+                    seconds[second] = None
+            last = seconds.get(second) or last
+            if last is None:
+                leading.append((label, text))
+                continue
+            for leading_label, leading_text in leading:
+                stats.add(leading_label, leading_text, now=last)
+            leading = []
+            stats.add(label, text, now=last)
+        # No timestamps at all: everything counts in a single second
+        for leading_label, leading_text in leading:
+            stats.add(leading_label, leading_text, now=0)
+        table().show()
+        return
+
+    with LiveDisplay() as live:
+        shown = 0.0
+        for _, label, text in lines:
+            stats.add(label, text)
+            if time.monotonic() - shown >= 1:
+                live.update(table())
+                shown = time.monotonic()
+        live.update(table())
+
+
+def split_timestamp(line: str) -> tuple[str, str]:
+    """
+    Splits a `--timestamps` log line into (sort key, text). Docker trims
+    trailing zeros of the RFC3339Nano fraction, so it is padded to sort as text.
+    """
+    stamp, sep, text = line.partition(" ")
+    if not sep or not stamp.endswith("Z"):
+        return "", line
+    seconds, _, fraction = stamp[:-1].partition(".")
+    return f"{seconds}.{fraction.ljust(9, '0')}", text
+
+
+def _read_stream(
+    label: str,
+    source: Callable[[], Iterable[bytes]],
+    line_filter: LineFilter,
+    errors: list[str],
+    capture: Callable[[str, str, str], None] | None = None,
+) -> Iterator[tuple[str, str, str]]:
+    """
+    Yields (sort key, label, text) for the lines of one container that pass
+    the filter. Every line, filtered or not, is handed to `capture` first.
+    A failing stream is recorded in `errors` and ends quietly, so it doesn't
+    cut the other containers' output short.
+    """
+    try:
+        for line in iter_lines(source()):
+            key, text = split_timestamp(line)
+            if capture:
+                capture(key, label, text)
+            shown = line_filter.process(text)
+            if shown is not None:
+                yield key, label, shown
+    except Exception as e:
+        errors.append(f"{label}: {e}")
+
+
+def merge_streams(
+    sources: dict[str, Callable[[], Iterable[bytes]]],
+    follow: bool = False,
+    grep: str | None = None,
+    level: str | None = None,
+    window: float = 0.1,
+    capture: Callable[[str, str, str], None] | None = None,
+    where: list[str] | None = None,
+    fields: list[str] | None = None,
+) -> Iterator[tuple[str, str, str]]:
+    """
+    Reads many containers' `--timestamps` log streams at once and yields
+    (sort key, label, text) in timestamp order, filtered before anything is
+    rendered. Streams that failed are raised as one RuntimeError at the end.
+    `capture(key, label, text)` receives every line before filtering (see logstore_svc).
+
+    Without `follow` every stream is already ordered, so they are merged
+    lazily. When following, one reader thread per container feeds a bounded
+    queue and lines are held back for `window` seconds to be put in order.
+    """
+    filters = {label: LineFilter(grep, level, where, fields) for label in sources}
+    errors: list[str] = []
+
+    if not follow:
+        yield from heapq.merge(
+            *(_read_stream(label, source, filters[label], errors, capture) for label, source in sources.items()),
+            key=lambda item: item[0],
+        )
+        if errors:
+            raise RuntimeError("; ".join(errors))
+        return
+
+    done = object()
+    # Bounded: a slow terminal makes the readers wait instead of buffering without limit
+    lines: queue.Queue = queue.Queue(maxsize=10000)
+
+    def reader(label, source):
+        try:
+            for item in _read_stream(label, source, filters[label], errors, capture):
+                lines.put(item)
+        finally:
+            lines.put(done)
+
+    for label, source in sources.items():
+        threading.Thread(target=reader, args=(label, source), daemon=True).start()
+
+    pending: list = []
+    running = len(sources)
+    sequence = 0
+    while running or pending:
+        try:
+            item = lines.get(timeout=window if pending else None)
+            if item is done:
+                running -= 1
+            else:
+                sequence += 1
+                heapq.heappush(pending, (item[0], sequence, time.monotonic(), item))
+        except queue.Empty:
+            pass
+
+        now = time.monotonic()
+        while pending and (not running or now - pending[0][2] >= window or len(pending) > 10000):
+            yield heapq.heappop(pending)[3]
+
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+
+def render_lines(
+    lines: Iterable[tuple[str, str, str]],
+    labels: list[str],
+    timestamps: bool = False,
+    color: bool = True,
+    writer: BufferedLogWriter | None = None,
+):
+    """Writes merged log lines with aligned, colored `label |` prefixes."""
+    width = max((len(label) for label in labels), default=0)
+    prefixes = {}
+    for index, label in enumerate(labels):
+        prefix = f"{label.ljust(width)} | "
+        if color:
+            prefix = f"\033[{PREFIX_COLORS[index % len(PREFIX_COLORS)]}m{prefix}\033[0m"
+        prefixes[label] = prefix
+
+    own_writer = writer is None
+    writer = writer or BufferedLogWriter()
+    try:
+        for key, label, text in lines:
+            prefix = prefixes.get(label) or f"{label} | "
+            stamp = f"{key[:19]}.{key[20:26]}Z " if timestamps and key else ""
+            writer.write(f"{prefix}{stamp}{text}")
+            if writer.closed:
+                break
+    finally:
+        if own_writer:
+            writer.close()
@@ -0,0 +1,356 @@
+import json
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from app.services.cache_svc import cache_dir, read_json, write_json
+
+try:
+    import fcntl
+except ImportError:  # Windows: captures are not locked against each other
+    fcntl = None
+
+# Index entry: data offset, compressed length, line count, labels length, bloom length,
+# then the first and last timestamp key of the block (29 chars each)
+_ENTRY = struct.Struct("<QIIHI29s29s")
+
+# Bloom filter bits per distinct trigram of a block (2 hash functions)
+BLOOM_BITS_PER_TRIGRAM = 4
+
+
+def time_key(moment: datetime) -> str:
+    """Formats a datetime as a log sort key (see log_svc.split_timestamp)."""
+    moment = moment.astimezone(timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S") + f".{moment.microsecond:06d}000"
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parses a `--since` value like `docker logs` does: relative (30s, 15m, 1h30m, 7d),
+    a UNIX timestamp or RFC 3339. Raises ValueError for anything else.
+    """
+    value = value.strip()
+    parts = _DURATION_RE.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        seconds = sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+        return datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        pass
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}', use e.g. 30m, 2h, 1d or 2024-01-02T13:23:37Z")
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment
+
+
+def parse_since(value: str) -> str:
+    """Turns a relative (30s, 15m, 2h, 7d) or RFC 3339 time into a log sort key."""
+    return time_key(parse_time(value))
+
+
+def _trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _bloom_positions(trigram: str, bits: int) -> tuple[int, int]:
+    data = trigram.encode()
+    return zlib.crc32(data) % bits, zlib.adler32(data) % bits
+
+
+class LogStore:
+    """
+    Append-only, segmented on-disk log store for one project (or container).
+
+    Lines are written in zlib-compressed blocks to `<segment>.dat`; each
+    block gets an entry in `<segment>.idx` with its time range, labels and a
+    Bloom filter of its trigrams, so a search only decompresses the blocks
+    that can contain the term. Segments rotate by age and size, and the
+    oldest ones are dropped beyond `max_bytes` or `max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        root: Path | None = None,
+        block_bytes: int = 256 * 1024,
+        flush_interval: float = 2.0,
+        segment_seconds: float = 3600,
+        max_segment_bytes: int = 32 * 1024 * 1024,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        self.name = name
+        self.root = root or cache_dir("logs", name)
+        self.block_bytes = block_bytes
+        self.flush_interval = flush_interval
+        self.segment_seconds = segment_seconds
+        self.max_segment_bytes = max_segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.RLock()
+        self._lines: list[str] = []
+        self._messages: list[str] = []
+        self._size = 0
+        self._labels: set[str] = set()
+        self._first = self._last = None
+        self._block_started = None
+        self._segment: Path | None = None
+        self._segment_started = 0.0
+        self._state = None
+        self._lock_file = None
+        self._closed = threading.Event()
+
+    # --- writing ---
+    def open(self):
+        """Starts capturing: takes the store lock and starts the periodic block flush."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if fcntl:
+            self._lock_file = open(self.root / ".lock", "w")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise RuntimeError(f"Logs of '{self.name}' are already being captured by another mate process")
+        state = read_json(self.root / "state.json")
+        self._state = state if isinstance(state, dict) else {"last": {}, "labels": []}
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
+        return self
+
+    def append(self, key: str, label: str, text: str):
+        """Adds one line. Lines at or before the last captured one of `label` are skipped (re-read tails)."""
+        with self._lock:
+            if not key:
+                key = time_key(datetime.now(timezone.utc))
+            elif key <= self._state["last"].get(label, ""):
+                return
+            self._state["last"][label] = key
+
+            line = f"{key}\t{label}\t{text if text.endswith(chr(10)) else text + chr(10)}"
+            if self._block_started is None:
+                self._block_started = time.monotonic()
+                self._first = key
+            self._first = min(self._first, key)
+            self._last = max(self._last or key, key)
+            self._lines.append(line)
+            self._messages.append(text)
+            self._size += len(line)
+            self._labels.add(label)
+            if self._size >= self.block_bytes:
+                self.flush()
+
+    def flush(self):
+        """Writes the pending lines as one compressed, indexed block."""
+        with self._lock:
+            if not self._lines:
+                return
+            segment = self._current_segment()
+            data = zlib.compress("".join(self._lines).encode(), 6)
+
+            # One pass over the block's messages (not their timestamps and labels);
+            # the few trigrams spanning line ends are harmless
+            trigrams = _trigrams("".join(self._messages))
+            bloom = bytearray(max(32, (len(trigrams) * BLOOM_BITS_PER_TRIGRAM + 7) // 8))
+            bits = len(bloom) * 8
+            for trigram in trigrams:
+                for position in _bloom_positions(trigram, bits):
+                    bloom[position >> 3] |= 1 << (position & 7)
+            labels = json.dumps(sorted(self._labels)).encode()
+
+            with open(segment.with_suffix(".dat"), "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            with open(segment.with_suffix(".idx"), "ab") as f:
+                f.write(_ENTRY.pack(
+                    offset, len(data), len(self._lines), len(labels), len(bloom),
+                    self._first.encode(), self._last.encode(),
+                ) + labels + bytes(bloom))
+
+            self._state["labels"] = sorted(set(self._state["labels"]) | self._labels)
+            write_json(self.root / "state.json", self._state)
+
+            self._lines.clear()
+            self._messages.clear()
+            self._size = 0
+            self._labels = set()
+            self._first = self._last = None
+            self._block_started = None
+
+    def _current_segment(self) -> Path:
+        now = time.time()
+        if self._segment is not None:
+            size = self._segment.with_suffix(".dat").stat().st_size
+            if now - self._segment_started < self.segment_seconds and size < self.max_segment_bytes:
+                return self._segment
+        self._segment = self.root / f"{int(now * 1000):015d}"
+        self._segment_started = now
+        self._apply_retention()
+        return self._segment
+
+    def _apply_retention(self):
+        segments = self.segments()
+        total = sum(s.with_suffix(".dat").stat().st_size + s.with_suffix(".idx").stat().st_size for s in segments)
+        cutoff = time.time() - self.max_age
+        for segment in segments:
+            data_file, index_file = segment.with_suffix(".dat"), segment.with_suffix(".idx")
+            if total <= self.max_bytes and data_file.stat().st_mtime >= cutoff:
+                break
+            total -= data_file.stat().st_size + index_file.stat().st_size
+            data_file.unlink(missing_ok=True)
+            index_file.unlink(missing_ok=True)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval / 2):
+            with self._lock:
+                if self._block_started is not None and time.monotonic() - self._block_started >= self.flush_interval:
+                    self.flush()
+
+    def close(self):
+        self._closed.set()
+        if self._state is not None:
+            self.flush()
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- reading ---
+    def segments(self) -> list[Path]:
+        """Segments (without suffix), oldest first; each has a .dat and an .idx file."""
+        if not self.root.exists():
+            return []
+        return sorted(p.with_suffix("") for p in self.root.glob("*.idx") if p.with_suffix(".dat").exists())
+
+    def labels(self) -> list[str]:
+        state = read_json(self.root / "state.json")
+        return state.get("labels", []) if isinstance(state, dict) else []
+
+    def _blocks(self, segment: Path) -> Iterator[dict]:
+        index = segment.with_suffix(".idx").read_bytes()
+        position = 0
+        while position + _ENTRY.size <= len(index):
+            offset, length, lines, labels_length, bloom_length, first, last = _ENTRY.unpack_from(index, position)
+            position += _ENTRY.size
+            labels = index[position:position + labels_length]
+            bloom = index[position + labels_length:position + labels_length + bloom_length]
+            position += labels_length + bloom_length
+            if len(bloom) < bloom_length:
+                return  # entry still being written
+            yield {
+                "offset": offset,
+                "length": length,
+                "lines": lines,
+                "first": first.decode(),
+                "last": last.decode(),
+                "labels": labels,
+                "bloom": bloom,
+            }
+
+    def search(
+        self,
+        term: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        labels: list[str] | None = None,
+    ) -> Iterator[tuple[str, str, str]]:
+        """
+        Yields (sort key, label, text) of captured lines containing `term`
+        (case-insensitive) within [since, until], oldest first.
+        Blocks outside the time range, without the labels or whose Bloom
+        filter lacks one of the term's trigrams are never decompressed.
+        """
+        needle = term.lower() if term else None
+        trigrams = _trigrams(term) if term else set()
+        wanted = set(labels or [])
+
+        for segment in self.segments():
+            with open(segment.with_suffix(".dat"), "rb") as data:
+                for block in self._blocks(segment):
+                    if since and block["last"] < since:
+                        continue
+                    if until and block["first"] > until:
+                        continue
+                    if wanted and not wanted & set(json.loads(block["labels"])):
+                        continue
+                    bits = len(block["bloom"]) * 8
+                    if any(
+                        not block["bloom"][p >> 3] & (1 << (p & 7))
+                        for trigram in trigrams
+                        for p in _bloom_positions(trigram, bits)
+                    ):
+                        continue
+
+                    data.seek(block["offset"])
+                    text = zlib.decompress(data.read(block["length"])).decode(errors="replace")
+                    for line in text.split("\n")[:-1]:
+                        key, label, message = line.split("\t", 2)
+                        message += "\n"
+                        if since and key < since or until and key > until:
+                            continue
+                        if wanted and label not in wanted:
+                            continue
+                        if needle and needle not in message.lower():
+                            continue
+                        yield key, label, message
+
+
+def search_logs(
+    name: str,
+    term: str | None = None,
+    since: str | None = None,
+    services: list[str] | None = None,
+    grep: str | None = None,
+    level: str | None = None,
+    timestamps: bool = False,
+    color: bool = True,
+    where: list[str] | None = None,
+    fields: list[str] | None = None,
+    stats: bool = False,
+) -> int:
+    """
+    Prints the captured lines of store `name` that contain `term` (and pass
+    the --grep/--level/--where filters), oldest first, or with `stats` their
+    counts per service, level and message template. Returns the number of matches.
+    """
+    from app.services.log_svc import LineFilter, render_lines, render_stats
+
+    store = LogStore(name)
+    if not store.segments():
+        raise FileNotFoundError(f"No captured logs for '{name}' (capture them with `mate logs -f --capture`)")
+
+    filters: dict[str, LineFilter] = {}
+    matches = 0
+
+    def matching():
+        nonlocal matches
+        for key, label, text in store.search(term, since=parse_since(since) if since else None, labels=services):
+            line_filter = filters.setdefault(label, LineFilter(grep, level, where, None if stats else fields))
+            shown = line_filter.process(text)
+            if shown is not None:
+                matches += 1
+                yield key, label, shown
+
+    if stats:
+        render_stats(matching())
+    else:
+        render_lines(matching(), labels=store.labels(), timestamps=timestamps, color=color)
+    return matches
@@ -1,25 +1,68 @@
+import re
 import time
+import threading
 import requests
 import socket
-from python_on_whales import docker
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, ConnectionError, Timeout
 
-from app.utils import ProgressBar, TextDisplay
+from app.utils import ProgressBar
+from app.utils.stats import summarize_latencies
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size: int = 32) -> requests.Session:
+    """
+    Returns the shared HTTP session. Connections are pooled per host and kept
+    alive, so repeated probes of the same endpoint skip the TCP handshake.
+    `pool_size` only applies when the session is first created.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def _is_expected(response: requests.Response, expected_status: list[int] | None, body_match: str | None) -> tuple[bool, str]:
+    if expected_status:
+        if response.status_code not in expected_status:
+            return False, f"Service returned {response.status_code}, expected {', '.join(map(str, expected_status))}"
+    elif not 200 <= response.status_code < 300:
+        return False, "Service returned non-2xx status"
+
+    if body_match and not re.search(body_match, response.text):
+        return False, f"Response body does not match '{body_match}'"
+    return True, ""
+
 
 def check_health(
     url: str, 
     max_retries: int = 3, 
     timeout: int = 5, 
     delay: int = 1,
-    progress: ProgressBar = None
+    progress: ProgressBar = None,
+    method: str = "GET",
+    expected_status: list[int] | None = None,
+    body_match: str | None = None,
 ):
     """
-    Pings a URL to see if it returns a 200 OK.
+    Pings a URL to see if it returns a 200 OK (or one of `expected_status`,
+    with a body matching the `body_match` regex when given).
     Retries automatically to allow containers time to spin up.
     
     Returns:
-        dict: {"success": bool, "status_code": int, "message": str}
+        dict: {"success": bool, "status_code": int, "message": str, "latency": float}
     """
+    session = get_session()
+
     for attempt in range(1, max_retries + 1):
 
         if progress:
@@ -27,45 +70,106 @@ def check_health(
                 f"Checking health ({attempt}/{max_retries})"
             )
 
-        start = time.time()
+        start = time.perf_counter()
 
         try:
-            response = requests.get(url, timeout=timeout)
-            end = time.time()
-            elapsed = end - start
+            response = session.request(method, url, timeout=timeout)
+            elapsed = time.perf_counter() - start
 
-            if 200 <= response.status_code < 300:
+            ok, reason = _is_expected(response, expected_status, body_match)
+            if ok:
                 if progress:
                     progress.finish()
                     
                 return {
                     "success": True, 
                     "status_code": response.status_code, 
-                    "message": f"Service is healthy (responded in {elapsed:.2f}s)"
+                    "message": f"Service is healthy (responded in {elapsed:.2f}s)",
+                    "latency": elapsed,
                 }
 
             else:
                 error = {
                     "success": False, 
                     "status_code": response.status_code, 
-                    "message": "Service returned non-2xx status"
+                    "message": reason,
+                    "latency": elapsed,
                 }
 
         except (RequestException, ConnectionError, Timeout) as e:
             error = {
                 "success": False, 
                 "status_code": None, 
-                "message": f"Service is not reachable: {str(e)}"
+                "message": f"Service is not reachable: {str(e)}",
+                "latency": None,
             }
 
         if progress:
             progress.advance()
 
-        if attempt < max_retries + 1:
+        if attempt < max_retries:
             time.sleep(delay)
 
     return error
 
+
+def check_endpoints(
+    urls: list[str],
+    samples: int = 1,
+    max_retries: int = 3,
+    timeout: int = 5,
+    delay: int = 1,
+    method: str = "GET",
+    expected_status: list[int] | None = None,
+    body_match: str | None = None,
+    concurrency: int = 16,
+) -> dict[str, dict]:
+    """
+    Checks many URLs concurrently over the shared session.
+    Each endpoint is first retried until healthy (like check_health), then
+    sampled `samples` times in total to get its latency distribution.
+
+    Returns:
+        dict: url -> check_health result plus "latency_stats" (see summarize_latencies)
+    """
+    from app.services.scheduler_svc import run_checks
+
+    def endpoint_check(url: str):
+        def check():
+            result = check_health(
+                url, max_retries, timeout, delay,
+                method=method, expected_status=expected_status, body_match=body_match,
+            )
+            latencies = [result["latency"]] if result["success"] else []
+            if result["success"]:
+                for _ in range(max(0, samples - 1)):
+                    sample = check_health(
+                        url, 1, timeout, 0,
+                        method=method, expected_status=expected_status, body_match=body_match,
+                    )
+                    if sample["success"]:
+                        latencies.append(sample["latency"])
+            result["latency_stats"] = summarize_latencies(latencies)
+            return result
+        return check
+
+    # Make room for every concurrent probe in the connection pool
+    get_session(pool_size=max(concurrency, 32))
+
+    return run_checks(
+        {url: endpoint_check(url) for url in dict.fromkeys(urls)},
+        concurrency=concurrency,
+        probe_timeout=None,
+        deadline=None,
+        fallback=lambda url, message: {
+            "success": False,
+            "status_code": None,
+            "message": message,
+            "latency": None,
+            "latency_stats": summarize_latencies([]),
+        },
+    )
+
 def check_host_port(port: int, host: str = "127.0.0.1", timeout=2) -> bool:
     try:
         with socket.create_connection((host, port), timeout=timeout):
@@ -74,39 +178,12 @@ def check_host_port(port: int, host: str = "127.0.0.1", timeout=2) -> bool:
         return False
 
 
-def check_internal_tcp(
-    source_container: str,
-    target_service: str,
-    port: int,
-) -> bool:
-    try:
-        docker.container.execute(
-            source_container,
-            ["nc", "-z", target_service, str(port)],
-        )
-        return True
-    except Exception:
-        return False
-
-
-def has_nc(container: str) -> bool:
+def check_host_ports(targets: list[tuple[str, int]], timeout=2, concurrency: int = 64) -> dict[tuple[str, int], bool]:
     """
-    Checks if 'nc' (netcat) is available in the container.
+    Checks many (host, port) pairs at once, e.g. a published port range,
+    with one check_host_port per pair. Returns (host, port) -> open.
     """
-    cmd_variants = [
-        ["which", "nc"],
-        ["sh", "-c", "command -v nc"],
-        ["sh", "-c", "whereis nc"] # fallback
-    ]
-    
-    errors = []
-    for cmd in cmd_variants:
-        try:
-            docker.container.execute(container, cmd)
-            return True
-        except Exception as e:
-            errors.append(f"{cmd}: {e}")
-            continue
-            
-    TextDisplay.debug_text(f"Health Check Debug: 'nc' check failed for {container}. Errors: {errors}")
-    return False
\ No newline at end of file
+    if not targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(targets))) as pool:
+        return dict(zip(targets, pool.map(lambda t: check_host_port(t[1], host=t[0], timeout=timeout), targets)))
@@ -0,0 +1,398 @@
+import errno
+import ipaddress
+import os
+import re
+import shutil
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Host ports handed out by `mate up --remap` when no --port-range is given
+DEFAULT_PORT_RANGE = os.environ.get("MATE_PORT_RANGE", "20000-20999")
+
+_RANGE = r"\d+(?:-\d+)?"
+# IP:HOST:CONTAINER (HOST may be empty, IPv6 in brackets), HOST:CONTAINER or CONTAINER
+_SPEC_RE = re.compile(
+    rf"^(?:(?:\[(?P<ip6>[^\]]+)\]|(?P<ip>[^:\[\]]+)):(?P<ip_published>(?:{_RANGE})?):|(?P<published>{_RANGE}):)?"
+    rf"(?P<target>{_RANGE})(?:/(?P<protocol>[A-Za-z]+))?$"
+)
+
+# /proc/net/tcp state of a listening socket
+_TCP_LISTEN = "0A"
+
+
+def _port_range(value, spec) -> tuple[int, int]:
+    try:
+        return parse_port_range(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid port mapping: {spec}")
+
+
+def _host_ip(value, spec) -> str:
+    try:
+        return str(ipaddress.ip_address(value)) if value else ""
+    except ValueError:
+        raise ValueError(f"Invalid port mapping: {spec} ({value} is not an IP address)")
+
+
+def format_port_range(ports) -> str:
+    """"8000-8010" for a (first, last) range, "80" for a single port (int or range of one)."""
+    if isinstance(ports, int):
+        return str(ports)
+    first, last = ports
+    return str(first) if first == last else f"{first}-{last}"
+
+
+def parse_port_spec(spec) -> dict:
+    """
+    Parses one compose/`docker run -p` port in the short syntax,
+    "[IP:][HOST[-HOST]:]CONTAINER[-CONTAINER][/PROTOCOL]", or the compose long
+    syntax ({"target", "published", "host_ip", "protocol", ...}).
+
+    Returns:
+        dict: {"host_ip": str, "published": (first, last) | None,
+        "target": (first, last), "protocol": str}
+        ("published" is None when Docker picks the host port)
+
+    Raises ValueError for what Docker would refuse, like ranges of different lengths.
+    """
+    if isinstance(spec, dict):
+        if spec.get("target") in (None, ""):
+            raise ValueError(f"Invalid port mapping: {spec} (no target)")
+        published = spec.get("published")
+        host_ip = _host_ip(spec.get("host_ip"), spec)
+        target = _port_range(spec["target"], spec)
+        published = _port_range(published, spec) if published not in (None, "") else None
+        protocol = str(spec.get("protocol") or "tcp").lower()
+    else:
+        match = _SPEC_RE.match(str(spec).strip())
+        if not match:
+            raise ValueError(f"Invalid port mapping: {spec}")
+        host_ip = _host_ip(match["ip6"] or match["ip"], spec)
+        published = match["published"] or match["ip_published"]
+        target = _port_range(match["target"], spec)
+        published = _port_range(published, spec) if published else None
+        protocol = (match["protocol"] or "tcp").lower()
+
+    if protocol not in ("tcp", "udp", "sctp"):
+        raise ValueError(f"Invalid port mapping: {spec} (unknown protocol {protocol})")
+    if published and target[1] > target[0]:
+        # A container range needs a host range of the same length
+        if published[1] - published[0] != target[1] - target[0]:
+            raise ValueError(f"Invalid port mapping: {spec} (host and container ranges differ in length)")
+    return {"host_ip": host_ip, "published": published, "target": target, "protocol": protocol}
+
+
+def expand_port_spec(spec) -> list[dict]:
+    """
+    Parses a port spec (see parse_port_spec) into one binding per container port:
+    {"host_ip", "published", "target", "protocol"} with single ports as ints.
+
+    "published" stays a (first, last) range when Docker picks the host port out of
+    a range ("8000-8010:80"), and is None when Docker picks any free port.
+    """
+    port = parse_port_spec(spec)
+    first, last = port["target"]
+    published = port["published"]
+    bindings = []
+    for offset in range(last - first + 1):
+        if published is None:
+            host_port = None
+        elif last > first or published[0] == published[1]:
+            host_port = published[0] + offset
+        else:
+            host_port = published
+        bindings.append({**port, "published": host_port, "target": first + offset})
+    return bindings
+
+
+def format_port_spec(binding: dict) -> str:
+    """The short syntax of a port, parsed or expanded (IP and protocol only when not the defaults)."""
+    text = format_port_range(binding["target"])
+    if binding["published"] is not None:
+        text = f"{format_port_range(binding['published'])}:{text}"
+    if binding["host_ip"]:
+        host_ip = f"[{binding['host_ip']}]" if ":" in binding["host_ip"] else binding["host_ip"]
+        text = f"{host_ip}:{text}" if binding["published"] is not None else f"{host_ip}::{text}"
+    if binding["protocol"] != "tcp":
+        text += f"/{binding['protocol']}"
+    return text
+
+
+def published_host_port(container: dict | None, binding: dict) -> int | None:
+    """
+    The host port Docker actually assigned to an expanded binding, from a container
+    record (see snapshot_svc), for bindings without a fixed host port.
+    """
+    if isinstance(binding["published"], int):
+        return binding["published"]
+    if not container:
+        return None
+    for mapping in container["ports"].get(f"{binding['target']}/{binding['protocol']}") or []:
+        if mapping["host_port"]:
+            return int(mapping["host_port"])
+    return None
+
+
+def probe_address(host_ip: str) -> str:
+    """Where to connect to reach a port published on `host_ip` from this machine."""
+    if host_ip in ("", "0.0.0.0"):
+        return "127.0.0.1"
+    if host_ip == "::":
+        return "::1"
+    return host_ip
+
+
+def _host_ips_overlap(first: str, second: str) -> bool:
+    """
+    Whether ports published on both host IPs would collide: the same address,
+    or a wildcard ("" for all interfaces, 0.0.0.0, ::) and any address of its family.
+    """
+    if first == second or "" in (first, second):
+        return True
+    if (":" in first) != (":" in second):
+        return False
+    return first in ("0.0.0.0", "::") or second in ("0.0.0.0", "::")
+
+
+def parse_port_range(text: str) -> tuple[int, int]:
+    """Parses "START-END" (or a single port) into an inclusive range."""
+    start, _, end = text.strip().partition("-")
+    try:
+        first, last = int(start), int(end or start)
+    except ValueError:
+        raise ValueError(f"Invalid port range: {text} (expected START-END)")
+    if not 0 < first <= last <= 65535:
+        raise ValueError(f"Invalid port range: {text}")
+    return first, last
+
+
+def docker_host_is_local() -> bool:
+    """Whether published ports end up on this machine (no remote DOCKER_HOST)."""
+    host = os.environ.get("DOCKER_HOST", "")
+    return not host or host.startswith(("unix://", "npipe://"))
+
+
+def port_in_use(port: int, host_ip: str = "", protocol: str = "tcp") -> str | None:
+    """
+    Tries to bind the host port the way Docker will, without connecting anywhere.
+    Returns None when it is free, else why it can't be published.
+    """
+    family = socket.AF_INET6 if ":" in host_ip else socket.AF_INET
+    kind = socket.SOCK_DGRAM if protocol == "udp" else socket.SOCK_STREAM
+    with socket.socket(family, kind) as sock:
+        if os.name != "nt":
+            # Like Docker: sockets lingering in TIME_WAIT don't block the port,
+            # listening ones still do (on Windows this flag would steal the port)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host_ip, port))
+            return None
+        except OSError as e:
+            if e.errno == errno.EADDRINUSE or getattr(e, "winerror", None) == 10048:
+                return "in use"
+            if e.errno == errno.EADDRNOTAVAIL:
+                return f"{host_ip} is not an address of this host"
+            if e.errno != errno.EACCES or protocol == "udp":
+                return None
+    # Privileged port: only the daemon may bind it, so look for a listener instead
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        loopback = "::1" if family == socket.AF_INET6 else "127.0.0.1"
+        return "in use" if sock.connect_ex((host_ip or loopback, port)) == 0 else None
+
+
+def scan_host_ports(bindings: list[dict], concurrency: int = 32) -> list[str | None]:
+    """Bind-tests every published port concurrently; returns port_in_use() per binding, in order."""
+    def check(binding: dict):
+        if not isinstance(binding["published"], int):
+            # Docker picks the host port itself
+            return None
+        return port_in_use(binding["published"], binding["host_ip"], binding["protocol"])
+
+    if not bindings:
+        return []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(bindings))) as pool:
+        return list(pool.map(check, bindings))
+
+
+def _container_holders(keys: set[tuple[int, str]]) -> dict[tuple[int, str], dict]:
+    from app.services.docker_svc import list_containers
+
+    holders = {}
+    for record in list_containers():
+        for container_port, mappings in record["ports"].items():
+            protocol = container_port.partition("/")[2] or "tcp"
+            for mapping in mappings:
+                if mapping["host_port"] and (int(mapping["host_port"]), protocol) in keys:
+                    holders[(int(mapping["host_port"]), protocol)] = record
+    return holders
+
+
+def _proc_holders(keys: set[tuple[int, str]]) -> dict[tuple[int, str], str]:
+    """Finds the processes listening on these ports through /proc (Linux)."""
+    inodes = {}
+    for port, protocol in keys:
+        for table in (f"/proc/net/{protocol}", f"/proc/net/{protocol}6"):
+            try:
+                lines = Path(table).read_text().splitlines()[1:]
+            except OSError:
+                continue
+            for line in lines:
+                fields = line.split()
+                if len(fields) < 10 or int(fields[1].rsplit(":", 1)[1], 16) != port:
+                    continue
+                if protocol == "tcp" and fields[3] != _TCP_LISTEN:
+                    continue
+                inodes[f"socket:[{fields[9]}]"] = (port, protocol)
+
+    holders = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")) if inodes else []:
+        try:
+            fds = os.listdir(f"/proc/{pid}/fd")
+        except OSError:
+            # Process exited, or belongs to another user
+            continue
+        for fd in fds:
+            try:
+                link = os.readlink(f"/proc/{pid}/fd/{fd}")
+            except OSError:
+                continue
+            if link in inodes:
+                try:
+                    name = Path(f"/proc/{pid}/comm").read_text().strip()
+                except OSError:
+                    name = "?"
+                holders[inodes[link]] = f"{name} (pid {pid})"
+    for key in set(inodes.values()) - set(holders):
+        holders[key] = "a process of another user"
+    return holders
+
+
+def _lsof_holders(keys: set[tuple[int, str]]) -> dict[tuple[int, str], str]:
+    holders = {}
+    for port, protocol in keys:
+        args = ["lsof", "-nP", f"-i{protocol.upper()}:{port}"]
+        if protocol == "tcp":
+            args.append("-sTCP:LISTEN")
+        try:
+            output = subprocess.run(args, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        for line in output.splitlines()[1:2]:
+            fields = line.split()
+            holders[(port, protocol)] = f"{fields[0]} (pid {fields[1]})"
+    return holders
+
+
+def find_port_holders(keys: set[tuple[int, str]]) -> dict[tuple[int, str], dict | str]:
+    """
+    Names what holds each (host port, protocol): the container record when a
+    container publishes it, else a "name (pid N)" description of the process.
+    """
+    holders: dict = {}
+    if not keys:
+        return holders
+    try:
+        holders.update(_container_holders(keys))
+    except Exception:
+        pass
+    missing = keys - set(holders)
+    if missing:
+        if os.path.isdir("/proc/self/fd"):
+            holders.update(_proc_holders(missing))
+        elif shutil.which("lsof"):
+            holders.update(_lsof_holders(missing))
+    return holders
+
+
+def allocate_ports(
+    count: int,
+    port_range: tuple[int, int],
+    host_ip: str = "",
+    protocol: str = "tcp",
+    exclude: set[int] | None = None,
+) -> list[int]:
+    """Returns `count` host ports from `port_range` that can be bound right now (lowest first)."""
+    exclude = exclude or set()
+    free = []
+    candidates = (p for p in range(port_range[0], port_range[1] + 1) if p not in exclude)
+    while len(free) < count:
+        batch = [next(candidates, None) for _ in range(max(16, (count - len(free)) * 2))]
+        batch = [p for p in batch if p is not None]
+        if not batch:
+            raise RuntimeError(
+                f"Not enough free ports in {port_range[0]}-{port_range[1]} (needed {count}, found {len(free)})"
+            )
+        probes = [{"host_ip": host_ip, "published": p, "protocol": protocol} for p in batch]
+        free.extend(p for p, reason in zip(batch, scan_host_ports(probes)) if reason is None)
+    return free[:count]
+
+
+def preflight_ports(
+    bindings: list[dict],
+    remap: bool = False,
+    port_range: tuple[int, int] | None = None,
+    owned=None,
+) -> list[dict]:
+    """
+    Checks that every published host port of `bindings` (see expand_port_spec)
+    can be bound, before anything is built or started.
+    A port held by a container for which `owned(record)` is true is fine:
+    that container is replaced by the startup anyway.
+
+    With `remap`, conflicting ports are moved to free ports of `port_range`.
+
+    Returns one dict per binding, in order: {"binding" (the final one),
+    "requested" (host port asked for), "status": free | reused | remapped | conflict,
+    "holder": description or None}
+    """
+    reasons = scan_host_ports(bindings)
+    conflicts = {
+        (b["published"], b["protocol"])
+        for b, reason in zip(bindings, reasons)
+        if reason == "in use"
+    }
+    holders = find_port_holders(conflicts)
+
+    results = []
+    movable = []
+    for binding, reason in zip(bindings, reasons):
+        holder = holders.get((binding["published"], binding["protocol"]))
+        if isinstance(holder, dict):
+            status = "reused" if owned and owned(holder) else "conflict"
+            holder = f"container {holder['name']}"
+        else:
+            status = "free" if reason is None else "conflict"
+            if reason and reason != "in use":
+                holder = reason
+        results.append({"binding": dict(binding), "requested": binding["published"], "status": status, "holder": holder})
+        # A host IP that doesn't exist here fails on any port, so only these can move
+        movable.append(reason == "in use")
+
+    # Ports requested twice in the same startup conflict with each other,
+    # including 8080 on all interfaces and 8080 on 127.0.0.1
+    seen = {}
+    for index, result in enumerate(results):
+        binding = result["binding"]
+        key = (binding["published"], binding["protocol"])
+        if isinstance(binding["published"], int) and result["status"] in ("free", "reused"):
+            host_ips = seen.setdefault(key, [])
+            if any(_host_ips_overlap(binding["host_ip"], host_ip) for host_ip in host_ips):
+                result["status"], result["holder"] = "conflict", "requested twice"
+                movable[index] = True
+            host_ips.append(binding["host_ip"])
+
+    if remap:
+        for result, can_move in zip(results, movable):
+            if result["status"] != "conflict" or not can_move:
+                continue
+            binding = result["binding"]
+            taken = {r["binding"]["published"] for r in results if r["binding"]["protocol"] == binding["protocol"]}
+            binding["published"] = allocate_ports(
+                1, port_range or parse_port_range(DEFAULT_PORT_RANGE),
+                binding["host_ip"], binding["protocol"], exclude=taken,
+            )[0]
+            result["status"] = "remapped"
+    return results
@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+
+from app.utils.stats import summarize_latencies
+
+# Image of the throwaway container used when no container of the project can run the probe
+PROBE_IMAGE = os.environ.get("MATE_PROBE_IMAGE", "python:3-alpine")
+
+# Runs inside the container: probes every target concurrently and prints one
+# tab-separated line per target: host, port, ok|fail, connect latencies (ns),
+# DNS lookup time (ns), then the last error. Plain Python 2/3, no dependencies.
+PY_PROBE = r'''
+import socket, sys, threading, time
+clock = getattr(time, "perf_counter", time.time)
+timeout, samples, mode = float(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+lines, lock = [], threading.Lock()
+
+def probe(target):
+    host, port = target.rsplit(":", 1)
+    latencies, error, dns = [], "", ""
+    try:
+        start = clock()
+        family, kind, proto, _, address = socket.getaddrinfo(host, int(port), 0, socket.SOCK_STREAM)[0]
+        dns = str(int((clock() - start) * 1e9))
+    except Exception as e:
+        address, error = None, "DNS lookup failed: %s" % (e,)
+    for _ in range(samples if address else 0):
+        s = socket.socket(family, kind, proto)
+        s.settimeout(timeout)
+        try:
+            start = clock()
+            s.connect(address)
+            if mode == "http":
+                s.sendall(("HEAD / HTTP/1.0\r\nHost: %s\r\n\r\n" % host).encode())
+                if not s.recv(1):
+                    raise IOError("connection closed without a response")
+            latencies.append(str(int((clock() - start) * 1e9)))
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        finally:
+            s.close()
+    line = "\t".join([host, port, "ok" if latencies else "fail", ",".join(latencies), dns,
+                      error.replace("\t", " ").replace("\n", " ")])
+    with lock:
+        lines.append(line)
+
+threads = [threading.Thread(target=probe, args=(t,)) for t in sys.argv[4:]]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+sys.stdout.write("\n".join(lines) + "\n")
+'''
+
+# Entry point of the single exec: the Python probe when the image has Python,
+# else the same probes with nc (or bash's /dev/tcp) in background jobs. In http
+# mode those send the same HEAD / request and wait for the first response byte.
+SH_PROBE = r'''
+script=$1; shift
+for py in python3 python; do
+    if command -v "$py" >/dev/null 2>&1; then exec "$py" -c "$script" "$@"; fi
+done
+timeout=${1%.*}; samples=$2; mode=$3; shift 3
+[ "$timeout" -ge 1 ] 2>/dev/null || timeout=1
+if command -v nc >/dev/null 2>&1; then tool=nc
+elif command -v bash >/dev/null 2>&1; then tool=bash
+else
+    for target in "$@"; do printf '%s\t%s\tunsupported\t\t\tno python, nc or bash in this container\n' "${target%:*}" "${target##*:}"; done
+    exit 0
+fi
+case "$(date +%s%N 2>/dev/null)" in
+    *[!0-9]*|"") now() { read up rest < /proc/uptime; echo $(( ${up%.*}${up#*.} * 10000000 )); } ;;
+    *) now() { date +%s%N; } ;;
+esac
+connect() {
+    if [ "$tool" = nc ] && [ "$mode" = http ]; then
+        printf 'HEAD / HTTP/1.0\r\nHost: %s\r\n\r\n' "$1" | nc -w "$timeout" "$1" "$2" | dd bs=1 count=1 2>/dev/null | grep -q .
+    elif [ "$tool" = nc ]; then nc -z -w "$timeout" "$1" "$2"
+    else
+        request='exec 3<>"/dev/tcp/$0/$1"'
+        [ "$mode" = http ] && request="$request"'; printf "HEAD / HTTP/1.0\r\nHost: %s\r\n\r\n" "$0" >&3; IFS= read -r -n 1 -t "$2" byte <&3 && [ -n "$byte" ]'
+        if command -v timeout >/dev/null 2>&1; then timeout "$timeout" bash -c "$request" "$1" "$2" "$timeout"
+        else bash -c "$request" "$1" "$2" "$timeout"; fi
+    fi
+}
+for target in "$@"; do
+    (
+        host=${target%:*}; port=${target##*:}; latencies=""; error=""; i=0
+        while [ "$i" -lt "$samples" ]; do
+            start=$(now)
+            if connect "$host" "$port" >/dev/null 2>&1; then
+                latencies="$latencies${latencies:+,}$(( $(now) - start ))"
+            else
+                if [ "$mode" = http ]; then error="no HTTP response from $host:$port ($tool)"
+                else error="connection to $host:$port failed ($tool)"; fi
+            fi
+            i=$((i + 1))
+        done
+        printf '%s\t%s\t%s\t%s\t\t%s\n' "$host" "$port" "$([ -n "$latencies" ] && echo ok || echo fail)" "$latencies" "$error"
+    ) &
+done
+wait
+'''
+
+
+def _parse_output(output: str, via: str) -> dict[tuple[str, int], dict]:
+    results = {}
+    for line in output.splitlines():
+        fields = line.split("\t")
+        if len(fields) != 6:
+            continue
+        host, port, status, latencies, dns, message = fields
+        samples = [int(ns) / 1e9 for ns in latencies.split(",") if ns]
+        results[(host, int(port))] = {
+            "success": status == "ok",
+            "supported": status != "unsupported",
+            "latency": samples[0] if samples else None,
+            "latencies": samples,
+            "latency_stats": summarize_latencies(samples),
+            "dns": int(dns) / 1e9 if dns else None,
+            "message": message,
+            "via": via,
+        }
+    return results
+
+
+def _probe_args(targets: list[tuple[str, int]], timeout: float, samples: int, mode: str) -> list[str]:
+    return [PY_PROBE, str(timeout), str(samples), mode, *[f"{host}:{port}" for host, port in targets]]
+
+
+def probe_targets(
+    targets: list[tuple[str, int]],
+    source_container: str | None = None,
+    network: str | None = None,
+    timeout: float = 2,
+    samples: int = 1,
+    mode: str = "tcp",
+) -> dict[tuple[str, int], dict]:
+    """
+    Probes many (host, port) targets on the project network concurrently, in a
+    single `docker exec` in `source_container`. Containers that can't run the
+    probe (no shell, or none of python, nc and bash) fall back to one
+    short-lived probe container (MATE_PROBE_IMAGE) attached to `network`.
+
+    `mode` "tcp" measures the TCP connect, "http" the connect plus the first
+    byte of a HEAD / response; each target is measured `samples` times.
+
+    Returns:
+        dict: (host, port) -> {"success", "latency", "latencies", "latency_stats",
+        "dns", "message", "via"} (latencies in seconds, DNS lookup time included separately)
+    """
+    from app.services.docker_svc import container_exec, run_probe_container
+
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return {}
+    results: dict[tuple[str, int], dict] = {}
+    errors = []
+
+    if source_container:
+        try:
+            output = container_exec(
+                source_container,
+                ["sh", "-c", SH_PROBE, "mate-probe", *_probe_args(targets, timeout, samples, mode)],
+            )
+            results = {
+                target: result
+                for target, result in _parse_output(output, via=source_container).items()
+                if result["supported"]
+            }
+        except Exception as e:
+            errors.append(f"{source_container}: {e}")
+
+    missing = [target for target in targets if target not in results]
+    if missing and network:
+        try:
+            output = run_probe_container(
+                PROBE_IMAGE, network,
+                ["python3", "-c", *_probe_args(missing, timeout, samples, mode)],
+                # Room for the probes themselves plus pulling the image once
+                timeout=timeout * samples + 120,
+            )
+            results.update(_parse_output(output, via=f"probe container on {network}"))
+        except Exception as e:
+            errors.append(f"probe container: {e}")
+
+    for target in targets:
+        if target not in results:
+            results[target] = {
+                "success": False,
+                "supported": False,
+                "latency": None,
+                "latencies": [],
+                "latency_stats": summarize_latencies([]),
+                "dns": None,
+                "message": "; ".join(errors) or "No container to probe from",
+                "via": None,
+            }
+    return {target: results[target] for target in targets}
+
+
+class BatchProber:
+    """
+    Shares probe rounds between concurrent internal checks: every round probes
+    all registered targets that are not up yet in one probe_targets call, and
+    a caller waits for the first round that starts after its request.
+    """
+
+    def __init__(self, source_container: str | None, network: str | None = None, timeout: float = 2):
+        self.source_container = source_container
+        self.network = network
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._targets: dict[tuple[str, int], None] = {}
+        self._results: dict[tuple[str, int], tuple[float, dict]] = {}
+        self._running = False
+
+    def register(self, host: str, port: int):
+        """Includes a target in the rounds before anyone asks for it, so the first round covers it."""
+        with self._cond:
+            self._targets[(host, port)] = None
+
+    def probe(self, host: str, port: int) -> dict:
+        target = (host, port)
+        requested = time.monotonic()
+        with self._cond:
+            self._targets[target] = None
+            while True:
+                started, result = self._results.get(target, (None, None))
+                if started is not None and started >= requested:
+                    return result
+                if self._running:
+                    self._cond.wait()
+                    continue
+
+                self._running = True
+                started = time.monotonic()
+                batch = [t for t in self._targets if t == target or not self._results.get(t, (0, {}))[1].get("success")]
+                self._cond.release()
+                try:
+                    outcome = probe_targets(batch, self.source_container, self.network, timeout=self.timeout)
+                finally:
+                    self._cond.acquire()
+                    self._running = False
+                    self._cond.notify_all()
+                for probed, probe_result in outcome.items():
+                    self._results[probed] = (started, probe_result)
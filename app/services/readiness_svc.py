@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+from typing import Callable, Iterator
+
+from app.services.snapshot_svc import ContainerSnapshot
+
+# Container states that will never become healthy without a restart
+FAILED_STATES = {"exited", "dead"}
+
+
+def backoff_delays(
+    base: float = 0.25,
+    factor: float = 2.0,
+    cap: float = 5.0,
+    jitter: float = 0.5,
+) -> Iterator[float]:
+    """
+    Yields exponentially growing delays capped at `cap`.
+    Each delay is reduced by a random share of up to `jitter` so that many
+    probes started together don't retry in lockstep.
+    """
+    delay = base
+    while True:
+        yield delay * (1 - random.uniform(0, jitter))
+        delay = min(cap, delay * factor)
+
+
+def wait_for_probe(
+    probe: Callable[[], bool],
+    deadline: float,
+    abort: Callable[[], str | None] | None = None,
+    base_delay: float = 0.25,
+    max_delay: float = 5.0,
+    slots: threading.Semaphore | None = None,
+) -> tuple[bool, str | None]:
+    """
+    Calls `probe` until it returns True, `abort` returns a reason or the
+    `deadline` (time.monotonic() value) passes, backing off between attempts.
+    A slot of `slots` is held only while `probe` runs, so any number of
+    waiting checks share a bounded number of concurrent probes.
+
+    Returns:
+        tuple: (success, reason) where reason is set when the wait was aborted.
+    """
+    for delay in backoff_delays(base=base_delay, cap=max_delay):
+        if slots is None:
+            is_up = probe()
+        else:
+            with slots:
+                is_up = probe()
+        if is_up:
+            return True, None
+        if abort:
+            reason = abort()
+            if reason:
+                return False, reason
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, None
+        time.sleep(min(delay, remaining))
+    return False, None
+
+
+class ReadinessWaiter:
+    """
+    Follows container state through the Docker events stream
+    (start / die / health_status) so native health checks resolve the moment
+    Docker reports them, without polling `docker inspect`.
+    """
+
+    def __init__(
+        self,
+        load_snapshot: Callable[[], ContainerSnapshot],
+        filters: dict | None = None,
+        timeout: float = 60,
+    ):
+        from app.services.docker_svc import stream_events
+
+        self._cond = threading.Condition()
+        self._state: dict[str, dict] = {}
+        self._names: dict[str, str] = {}
+        self._closed = False
+
+        # Events are requested from before the snapshot is taken, so nothing
+        # that happens in between is missed.
+        self._since = time.time()
+        self.snapshot = load_snapshot()
+        self._apply_snapshot(self.snapshot)
+
+        self._events = stream_events(
+            filters={"type": "container", **(filters or {})},
+            since=self._since,
+            until=self._since + timeout,
+        )
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def _apply_snapshot(self, snapshot: ContainerSnapshot):
+        with self._cond:
+            for record in snapshot:
+                self._names[record["id"]] = record["name"]
+                self._state[record["name"]] = {
+                    "status": record["status"],
+                    "health": record["health"],
+                    "exit_code": record.get("exit_code"),
+                }
+            self._cond.notify_all()
+
+    def _consume(self):
+        try:
+            for event in self._events:
+                self._handle(event)
+                if self._closed:
+                    break
+        except Exception:
+            pass
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    def _handle(self, event: dict):
+        action = event["action"]
+        name = event["attributes"].get("name") or self._names.get(event["id"])
+        if not name:
+            return
+
+        with self._cond:
+            state = self._state.setdefault(name, {"status": None, "health": None, "exit_code": None})
+            if action.startswith("health_status"):
+                # e.g. "health_status: healthy"
+                state["health"] = action.split(":", 1)[-1].strip()
+            elif action == "start":
+                state["status"] = "running"
+                state["exit_code"] = None
+                if state["health"]:
+                    state["health"] = "starting"
+            elif action in ("die", "oom"):
+                state["status"] = "exited"
+                exit_code = event["attributes"].get("exitCode")
+                if exit_code is not None:
+                    state["exit_code"] = int(exit_code)
+            elif action == "destroy":
+                state["status"] = "dead"
+            self._cond.notify_all()
+
+    def failure_reason(self, name: str) -> str | None:
+        """Returns why a container can no longer become ready, if it can't."""
+        with self._cond:
+            state = self._state.get(name)
+            if state and state["status"] in FAILED_STATES:
+                return f"Container {state['status']}"
+            return None
+
+    def wait_healthy(self, name: str, deadline: float) -> tuple[str | None, str | None]:
+        """
+        Blocks until the container's native health check reports healthy,
+        it fails, or `deadline` (time.monotonic() value) passes.
+
+        Returns:
+            tuple: (last health status, failure reason or None)
+        """
+        with self._cond:
+            while not self._closed:
+                state = self._state.get(name) or {"status": None, "health": None}
+                if state["health"] in ("healthy", "unhealthy"):
+                    return state["health"], None
+                if state["status"] in FAILED_STATES:
+                    return state["health"], f"Container {state['status']}"
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return state["health"], None
+                self._cond.wait(remaining)
+
+        # Event stream ended early (or is unavailable): fall back to polling
+        return self._poll_health(name, deadline)
+
+    def wait_exited(self, name: str, deadline: float) -> tuple[int | None, str | None]:
+        """
+        Blocks until a one-shot container (e.g. a migration job) exits or
+        `deadline` passes.
+
+        Returns:
+            tuple: (exit code or None, failure reason or None)
+        """
+        with self._cond:
+            while not self._closed:
+                state = self._state.get(name) or {}
+                if state.get("status") in FAILED_STATES and state.get("exit_code") is not None:
+                    return state["exit_code"], None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, "Still running"
+                self._cond.wait(remaining)
+
+        from app.services.docker_svc import inspect_containers
+
+        last = {"exit_code": None}
+
+        def probe() -> bool:
+            try:
+                record = inspect_containers([name]).get(name)
+            except Exception:
+                record = None
+            if record is not None:
+                last["exit_code"] = record.get("exit_code")
+            return last["exit_code"] is not None
+
+        if wait_for_probe(probe, deadline)[0]:
+            return last["exit_code"], None
+        return None, "Still running"
+
+    def _poll_health(self, name: str, deadline: float) -> tuple[str | None, str | None]:
+        from app.services.docker_svc import inspect_containers
+
+        last = {"health": None, "reason": None}
+
+        def probe() -> bool:
+            try:
+                record = inspect_containers([name]).get(name)
+            except Exception:
+                record = None
+            if record is None:
+                last["reason"] = "Container not found"
+                return False
+            last["health"] = record["health"]
+            if record["status"] in FAILED_STATES:
+                last["reason"] = f"Container {record['status']}"
+            return record["health"] in ("healthy", "unhealthy")
+
+        wait_for_probe(probe, deadline, abort=lambda: last["reason"])
+        return last["health"], last["reason"]
+
+    def close(self):
+        self._closed = True
+        # Stops the `docker events` process (or socket) the consumer thread is blocked reading
+        try:
+            self._events.close()
+        except Exception:
+            pass
+        self._thread.join(timeout=1)
@@ -0,0 +1,98 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable
+
+
+def _default_fallback(name: str, message: str) -> dict:
+    return {"success": False, "message": message}
+
+
+def run_checks(
+    checks: dict[str, Callable[[], Any]],
+    concurrency: int = 8,
+    probe_timeout: float | None = 10,
+    deadline: float | None = 60,
+    fallback: Callable[[str, str], Any] = _default_fallback,
+) -> dict[str, Any]:
+    """
+    Runs independent checks in parallel and collects their results.
+
+    Args:
+        checks: name -> zero-argument callable returning the check result.
+        concurrency: maximum number of checks running at the same time.
+        probe_timeout: seconds a single check may run before it is given up on.
+        deadline: seconds the whole run may take; unfinished checks are given up on.
+        fallback: builds the result for a check that timed out or raised,
+            called as fallback(name, message).
+
+    Returns:
+        dict: name -> result, in the same order as `checks`.
+
+    Checks that time out keep running in their worker thread (threads can't be
+    killed), but their result is discarded; callers should still pass sane
+    timeouts to the underlying socket / docker calls.
+    """
+    results: dict[str, Any] = {}
+    if not checks:
+        return {}
+
+    started: dict[str, float] = {}
+
+    def runner(name: str, check: Callable[[], Any]):
+        started[name] = time.monotonic()
+        return check()
+
+    start = time.monotonic()
+    end = start + deadline if deadline else None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(checks))))
+    futures = {executor.submit(runner, name, check): name for name, check in checks.items()}
+    pending = set(futures)
+
+    try:
+        while pending:
+            now = time.monotonic()
+            wait_for = None
+            if end is not None:
+                wait_for = max(0.0, end - now)
+            if probe_timeout:
+                running = [started[futures[f]] for f in pending if futures[f] in started]
+                if running:
+                    next_expiry = max(0.0, min(running) + probe_timeout - now)
+                    wait_for = next_expiry if wait_for is None else min(wait_for, next_expiry)
+                elif wait_for is None:
+                    wait_for = probe_timeout
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = fallback(name, f"Check failed: {e}")
+
+            now = time.monotonic()
+            if end is not None and now >= end:
+                for future in pending:
+                    future.cancel()
+                    results[futures[future]] = fallback(
+                        futures[future], f"Deadline of {deadline}s exceeded"
+                    )
+                pending = set()
+                break
+
+            if probe_timeout:
+                expired = {
+                    f for f in pending
+                    if futures[f] in started and now - started[futures[f]] >= probe_timeout
+                }
+                for future in expired:
+                    results[futures[future]] = fallback(
+                        futures[future], f"Timed out after {probe_timeout}s"
+                    )
+                pending -= expired
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {name: results[name] for name in checks}
@@ -0,0 +1,106 @@
+from typing import Iterator
+
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+
+
+def record_from_inspect(data: dict) -> dict:
+    """
+    Converts one `docker container inspect` JSON object into a flat record.
+    Records only hold plain data, so reading them never goes back to Docker.
+    """
+    state = data.get("State") or {}
+    config = data.get("Config") or {}
+    network_settings = data.get("NetworkSettings") or {}
+    labels = config.get("Labels") or {}
+    health = state.get("Health") or {}
+
+    ports = {}
+    for container_port, host_mappings in (network_settings.get("Ports") or {}).items():
+        ports[container_port] = [
+            {"host_ip": m.get("HostIp") or "0.0.0.0", "host_port": m.get("HostPort")}
+            for m in host_mappings or []
+        ]
+
+    networks = {}
+    for network_name, network in (network_settings.get("Networks") or {}).items():
+        network = network or {}
+        networks[network_name] = {
+            "ip": network.get("IPAddress") or None,
+            "aliases": network.get("Aliases") or [],
+        }
+
+    return {
+        "id": data.get("Id", ""),
+        "name": (data.get("Name") or "").lstrip("/"),
+        "image": config.get("Image") or "",
+        "image_id": data.get("Image") or "",
+        "service": labels.get(COMPOSE_SERVICE_LABEL),
+        "project": labels.get(COMPOSE_PROJECT_LABEL),
+        "status": state.get("Status") or "",
+        "running": bool(state.get("Running")),
+        "paused": bool(state.get("Paused")),
+        "health": health.get("Status"),
+        "exit_code": state.get("ExitCode") if state.get("Status") in ("exited", "dead") else None,
+        "labels": labels,
+        "networks": networks,
+        "ports": ports,
+        "mounts": [
+            {
+                "type": m.get("Type") or "",
+                "source": m.get("Source") or "",
+                "destination": m.get("Destination") or "",
+            }
+            for m in data.get("Mounts") or []
+        ],
+        "command": config.get("Cmd") or [],
+        "created": data.get("Created"),
+    }
+
+
+class ContainerSnapshot:
+    """
+    Point-in-time view of a set of containers, built from a single batched
+    inspect call. Commands read state, health, labels and networks from here
+    instead of inspecting containers one by one.
+    """
+
+    def __init__(self, records: list[dict] | None = None):
+        self.records = list(records or [])
+        self._by_key = {}
+        for record in self.records:
+            self._by_key[record["id"]] = record
+            self._by_key[record["name"]] = record
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __bool__(self) -> bool:
+        return bool(self.records)
+
+    def get(self, name_or_id: str) -> dict | None:
+        """Looks a container up by name, full ID or ID prefix."""
+        record = self._by_key.get(name_or_id)
+        if record is None and name_or_id:
+            for candidate in self.records:
+                if candidate["id"].startswith(name_or_id):
+                    return candidate
+        return record
+
+    def names(self) -> list[str]:
+        return [record["name"] for record in self.records]
+
+    def by_service(self) -> dict[str, dict]:
+        """Maps compose service name -> container record (first one wins)."""
+        services = {}
+        for record in self.records:
+            if record["service"] and record["service"] not in services:
+                services[record["service"]] = record
+        return services
+
+    def health(self, name_or_id: str) -> str | None:
+        record = self.get(name_or_id)
+        return record["health"] if record else None
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from app.services.docker_svc import Transport, get_transport, stream_stats
+from app.services.engine_svc import Stream
+
+# Cumulative counters turned into per-second rates
+RATE_COUNTERS = ("net_rx", "net_tx", "blk_read", "blk_write")
+
+
+class ResourceSampler:
+    """
+    Follows the resource usage of running containers from streamed stats:
+    a single `docker stats` process for all of them on the CLI, or one
+    stats stream per tracked container with the socket transport.
+
+    Network and block I/O rates are computed from the difference between two
+    consecutive samples of a container, so they are None until its second sample.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._usage: dict[str, dict] = {}
+        self._previous: dict[str, tuple[float, dict]] = {}
+        self._samples: dict[str, int] = {}
+        self._changed: set[str] = set()
+        self._streams: dict[str, Stream] = {}
+        self._closed = False
+        self.per_container = get_transport() == Transport.SOCKET
+        if not self.per_container:
+            self._start(None)
+
+    def _start(self, container: str | None):
+        stream = stream_stats(container)
+        self._streams[container or ""] = stream
+        threading.Thread(target=self._consume, args=(stream,), daemon=True).start()
+
+    def track(self, container_ids):
+        """Makes sure these containers are sampled (only needed with per-container streams)."""
+        if not self.per_container:
+            return
+        for container_id in container_ids:
+            if container_id not in self._streams:
+                self._start(container_id)
+
+    def _consume(self, stream):
+        try:
+            for sample in stream:
+                self._add(sample)
+                if self._closed:
+                    break
+        except Exception:
+            # Stream ended (container stopped) or broke; its last usage stays visible
+            pass
+
+    def _add(self, sample: dict):
+        key = sample["id"][:12]
+        now = time.monotonic()
+        usage = {k: v for k, v in sample.items() if k not in RATE_COUNTERS}
+        previous = self._previous.get(key)
+        for counter in RATE_COUNTERS:
+            rate = None
+            if previous and sample[counter] is not None and previous[1][counter] is not None:
+                elapsed = now - previous[0]
+                if elapsed > 0:
+                    rate = max(0.0, (sample[counter] - previous[1][counter]) / elapsed)
+            usage[counter] = rate
+        usage["mem_percent"] = (
+            usage["mem"] / usage["mem_limit"] * 100 if usage["mem"] is not None and usage["mem_limit"] else None
+        )
+        with self._cond:
+            self._previous[key] = (now, sample)
+            self._usage[key] = usage
+            self._samples[key] = self._samples.get(key, 0) + 1
+            self._changed.add(key)
+            self._cond.notify_all()
+
+    def get(self, container_id: str) -> dict | None:
+        """Latest usage of a container (by full or short ID), or None before its first sample."""
+        with self._cond:
+            return self._usage.get(container_id[:12])
+
+    def wait(self, container_ids, timeout: float, rates: bool = True) -> bool:
+        """
+        Waits until every container has a sample (two samples with `rates`,
+        so I/O rates are known). Returns False if the timeout ran out first.
+        """
+        needed = 2 if rates else 1
+        keys = {cid[:12] for cid in container_ids}
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while any(self._samples.get(key, 0) < needed for key in keys):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def take_changed(self) -> set[str]:
+        """Short IDs of the containers sampled since the last call."""
+        with self._cond:
+            changed, self._changed = self._changed, set()
+            return changed
+
+    def close(self):
+        self._closed = True
+        # Kills the `docker stats` processes (or closes the sockets) the consumer threads are blocked reading
+        for stream in list(self._streams.values()):
+            try:
+                stream.close()
+            except Exception:
+                pass
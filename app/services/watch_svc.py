@@ -0,0 +1,118 @@
+import threading
+import time
+
+from app.services.docker_svc import inspect_containers, list_containers, stream_events
+from app.services.snapshot_svc import ContainerSnapshot
+
+# Container events that never change what `mate status` shows.
+# Health checks alone emit exec_create/exec_start/exec_die every interval.
+IGNORED_ACTIONS = (
+    "exec_", "attach", "detach", "resize", "top", "archive-path",
+    "extract-to-dir", "export", "commit", "copy",
+)
+
+
+class ContainerWatcher:
+    """
+    Keeps the records of the containers `docker ps` would list up to date
+    from the Docker events stream. Only containers named by an event are
+    inspected again, in one batch per poll(); nothing is polled while
+    nothing happens.
+    """
+
+    def __init__(self, all: bool = False, filters: dict | None = None):
+        self.all = all
+        self.filters = filters or {}
+
+        self._cond = threading.Condition()
+        self._dirty: set[str] = set()
+        self._destroyed: set[str] = set()
+        self._error: Exception | None = None
+        self._closed = False
+
+        # Events are requested from before the listing, so nothing in between is missed
+        since = time.time()
+        self.records = {r["id"]: r for r in list_containers(all=all, filters=self.filters)}
+        self._events = stream_events(filters={"type": "container"}, since=since)
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def _consume(self):
+        try:
+            for event in self._events:
+                action = event["action"]
+                if not event["id"] or action.startswith(IGNORED_ACTIONS):
+                    continue
+                with self._cond:
+                    if action == "destroy":
+                        self._destroyed.add(event["id"])
+                        self._dirty.discard(event["id"])
+                    else:
+                        self._dirty.add(event["id"])
+                    self._cond.notify_all()
+                if self._closed:
+                    break
+        except Exception as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+
+    def _matches(self, record: dict) -> bool:
+        """Whether `docker ps` with the watcher's options would list this container."""
+        if not self.all and not record["running"]:
+            return False
+        status = self.filters.get("status")
+        return not status or record["status"] == status
+
+    def _inspect(self, ids: list[str]) -> ContainerSnapshot:
+        try:
+            return inspect_containers(ids)
+        except Exception:
+            # One container removed meanwhile fails the whole batch on the CLI
+            records = []
+            for container_id in ids:
+                try:
+                    records.extend(inspect_containers([container_id]))
+                except Exception:
+                    pass
+            return ContainerSnapshot(records)
+
+    def poll(self, timeout: float | None = None) -> set[str]:
+        """
+        Waits up to `timeout` seconds for events, then refreshes the containers
+        they concern. Returns the IDs of the records that were added, changed or removed.
+        Raises RuntimeError if the events stream broke.
+        """
+        with self._cond:
+            if not (self._dirty or self._destroyed or self._error):
+                self._cond.wait(timeout)
+            if self._error:
+                raise RuntimeError(f"Docker events stream stopped: {self._error}")
+            dirty, self._dirty = self._dirty, set()
+            destroyed, self._destroyed = self._destroyed, set()
+
+        changed = set()
+        for container_id in destroyed:
+            if self.records.pop(container_id, None) is not None:
+                changed.add(container_id)
+
+        if dirty:
+            fresh = {r["id"]: r for r in self._inspect(sorted(dirty))}
+            for container_id in dirty:
+                record = fresh.get(container_id)
+                if record is not None and self._matches(record):
+                    if self.records.get(container_id) != record:
+                        self.records[container_id] = record
+                        changed.add(container_id)
+                elif self.records.pop(container_id, None) is not None:
+                    changed.add(container_id)
+        return changed
+
+    def close(self):
+        self._closed = True
+        # Stops the `docker events` process (or socket) the consumer thread is blocked reading
+        try:
+            self._events.close()
+        except Exception:
+            pass
+        self._thread.join(timeout=1)
@@ -1,36 +1,70 @@
-from pathlib import Path
+import json
+from typing import Any, TypedDict
 import yaml
 
-def load_compose(path: str) -> dict:
-    with open(Path(path).resolve(), "r") as f:
-        return yaml.safe_load(f)
+from app.services.ports_svc import parse_port_spec
+
+# libyaml's C loader is several times faster on large compose files
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def extract_ports_from_compose(compose: dict) -> dict[str, list[str]]:
-    
-    services = compose.get("services", {})
-    ports_map: dict[str, list[str]] = {}
 
-    for service_name, service in services.items():
-        ports = service.get("ports", [])
-        extracted_ports = []
+class ServiceModel(TypedDict):
+    image: str | None
+    build: Any
+    ports: list
+    expose: list[str]
+    healthcheck: dict | None
+    depends_on: dict[str, dict]
+    profiles: list[str]
 
-        for port in ports:
-            if isinstance(port, str):
-                extracted_ports.append(port)
 
-            elif isinstance(port, dict):
-                published = port.get("published")
-                target = port.get("target")
-                if published and target:
-                    extracted_ports.append(f"{published}:{target}")
+class ComposeModel(TypedDict):
+    name: str | None
+    services: dict[str, ServiceModel]
 
-        if extracted_ports:
-            ports_map[service_name] = extracted_ports
 
-    return ports_map
+def normalize_depends_on(depends_on) -> dict[str, dict]:
+    """Turns both the list and the mapping form of depends_on into {service: {"condition": ...}}."""
+    if not depends_on:
+        return {}
+    if isinstance(depends_on, list):
+        return {name: {"condition": "service_started"} for name in depends_on}
+    return {
+        name: {"condition": (options or {}).get("condition", "service_started"), **(options or {})}
+        for name, options in depends_on.items()
+    }
+
+
+def normalize_healthcheck(healthcheck) -> dict | None:
+    """Returns the healthcheck block, or None when it is missing or disabled."""
+    if not healthcheck or healthcheck.get("disable"):
+        return None
+    return healthcheck
+
+
+def build_compose_model(compose: dict) -> ComposeModel:
+    """
+    Normalizes a parsed compose document into the fields mate plans with.
+    The result only holds JSON types so it can be cached on disk.
+    """
+    compose = compose or {}
+    services = {}
+    for name, svc in (compose.get("services") or {}).items():
+        svc = svc or {}
+        services[name] = {
+            "image": svc.get("image"),
+            "build": svc.get("build"),
+            "ports": list(svc.get("ports") or []),
+            "expose": [str(e) for e in svc.get("expose") or []],
+            "healthcheck": normalize_healthcheck(svc.get("healthcheck")),
+            "depends_on": normalize_depends_on(svc.get("depends_on")),
+            "profiles": list(svc.get("profiles") or []),
+        }
+
+    model = {"name": compose.get("name"), "services": services}
+    # Round-trip so the model only holds plain JSON types (YAML dates become strings)
+    return json.loads(json.dumps(model, default=str))
 
-def flatten_ports(port_map: dict[str, list[str]]) -> list[str]:
-    return [p for ports in port_map.values() for p in ports]
 
 def classify_services(compose: dict):
     services = compose.get("services", {})
@@ -57,33 +91,24 @@ def get_service_internal_port(service_config: dict) -> int | None:
     3. Default to 80 if nothing else found? Or None.
     """
     
-    # Check ports section for target
-    ports = service_config.get("ports", [])
-    for port in ports:
-        if isinstance(port, dict):
-            target = port.get("target")
-            if target:
-                return int(target)
-        elif isinstance(port, str):
-            # "80:80" or "80"
-            parts = port.split(":")
-            if len(parts) > 1:
-                return int(parts[1])
-            else:
-                return int(parts[0])
-
-    # Check expose section
-    expose = service_config.get("expose", [])
-    if expose:
-        return int(expose[0])
-        
+    # "80", "8080:80", "127.0.0.1:8000-8010:8000-8010/udp" or the long syntax in
+    # ports, "8000-8010" or "53/udp" in expose: the first TCP container port is probed
+    for port in [*(service_config.get("ports") or []), *(service_config.get("expose") or [])]:
+        try:
+            spec = parse_port_spec(port)
+        except (ValueError, KeyError, TypeError):
+            continue
+        if spec["protocol"] == "tcp":
+            return spec["target"][0]
+
     return None
 
 
 def has_native_healthcheck(service_config: dict) -> bool:
     """
-    Checks if the service definition has a 'healthcheck' block.
+    Checks if the service definition has an (enabled) 'healthcheck' block.
     """
-    return "healthcheck" in service_config
+    return bool(normalize_healthcheck(service_config.get("healthcheck")))
+
 
 
@@ -1,11 +1,30 @@
-from .ui import TextDisplay, PanelDisplay, Prompt, ProgressBar, TableDisplay
-from .verbose import vprint
-
-__all__ = [
-    "TextDisplay",
-    "PanelDisplay",
-    "Prompt",
-    "ProgressBar",
-    "TableDisplay",
-    "vprint",
-]
+from importlib import import_module
+
+# Public name -> submodule that defines it (imported on first use, so that
+# importing app.utils does not pull in rich until something is displayed).
+_EXPORTS = {
+    "TextDisplay": "ui",
+    "PanelDisplay": "ui",
+    "Prompt": "ui",
+    "ProgressBar": "ui",
+    "TableDisplay": "ui",
+    "LiveDisplay": "ui",
+    "vprint": "verbose",
+}
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
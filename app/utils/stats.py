@@ -0,0 +1,86 @@
+import math
+from collections import deque
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], pct: float) -> float | None:
+    """
+    Returns the pct-th percentile (0-100) of values, interpolating linearly
+    between the closest ranks. Returns None when there are no values.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    if len(ordered) == 1:
+        return ordered[0]
+
+    rank = (pct / 100) * (len(ordered) - 1)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(values: Iterable[float], percentiles: tuple = (50, 95, 99)) -> dict:
+    """
+    Summarizes latency samples (seconds) as
+    {"count", "min", "max", "mean", "p50", "p95", "p99"}; empty samples give None values.
+    """
+    samples = list(values)
+    summary = {
+        "count": len(samples),
+        "min": min(samples) if samples else None,
+        "max": max(samples) if samples else None,
+        "mean": sum(samples) / len(samples) if samples else None,
+    }
+    for pct in percentiles:
+        summary[f"p{pct}"] = percentile(samples, pct)
+    return summary
+
+
+def format_ms(seconds: float | None) -> str:
+    """Formats a duration in seconds as milliseconds, '-' when unknown."""
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:.1f} ms"
+
+
+def format_bytes(size: float | None) -> str:
+    """Formats a byte count with a binary unit (e.g. 1.5 GiB), '-' when unknown."""
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size) < 1024 or unit == "TiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class LatencyWindow:
+    """
+    Fixed-size ring buffer of probe outcomes for one target.
+    Each sample is a latency in seconds, or None for a failed probe, so memory
+    stays bounded no matter how long a watch runs.
+    """
+
+    def __init__(self, size: int = 300):
+        self.samples = deque(maxlen=size)
+        self.total = 0
+
+    def add(self, latency: float | None):
+        self.samples.append(latency)
+        self.total += 1
+
+    @property
+    def last(self) -> float | None:
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def availability(self) -> float | None:
+        """Share of successful probes in the window (0-1)."""
+        if not self.samples:
+            return None
+        return sum(1 for s in self.samples if s is not None) / len(self.samples)
+
+    def summary(self) -> dict:
+        return summarize_latencies(s for s in self.samples if s is not None)
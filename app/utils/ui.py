@@ -4,7 +4,7 @@ from rich.panel import Panel
 from rich.text import Text
 from rich.json import JSON
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
-from rich.markdown import Markdown
+from rich.live import Live
 from pathlib import Path
 
 console = Console()
@@ -217,8 +217,33 @@ class TableDisplay:
         console.print(self.table)
 
 
+class LiveDisplay:
+    """
+    Redraws a table in place (no scrolling reprints) until the context exits.
+    Updates are pushed explicitly with update(), so nothing is redrawn when nothing changed.
+    """
+    def __init__(self, refresh_per_second: float = 4):
+        self.live = Live(console=console, refresh_per_second=refresh_per_second, auto_refresh=False, transient=False)
+
+    def __enter__(self):
+        self.live.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.live.stop()
+        return False
+
+    def update(self, renderable):
+        if isinstance(renderable, TableDisplay):
+            renderable = renderable.table
+        self.live.update(renderable, refresh=True)
+
+
 # Documentation rendering logic
 def print_markdown(path: str, pager: bool = False):
+    # markdown-it is heavy and only needed by `mate docs`
+    from rich.markdown import Markdown
+
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Documentation not found at {path}")
@@ -2,6 +2,8 @@
 from PyInstaller.utils.hooks import collect_submodules, collect_all
 
 hidden_rich = collect_submodules("rich")
+# Commands and services are imported lazily (see app/commands/__init__.py)
+hidden_app = collect_submodules("app")
 
 datas_cn, binaries_cn, hiddenimports_cn = collect_all("charset_normalizer")
 datas_pow, binaries_pow, hiddenimports_pow = collect_all("python_on_whales")
@@ -18,7 +20,7 @@ a = Analysis(
         "git",
         "rich",
         "typer"
-    ] + hidden_rich + hiddenimports_cn + hiddenimports_pow + hiddenimports_git,
+    ] + hidden_app + hidden_rich + hiddenimports_cn + hiddenimports_pow + hiddenimports_git,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
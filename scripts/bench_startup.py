@@ -0,0 +1,103 @@
+"""
+Startup benchmark for mate.
+
+Runs every command once under `python -X importtime` and reports the
+total import time per command, plus the heaviest top-level imports.
+
+Usage:
+    python scripts/bench_startup.py                 # all commands
+    python scripts/bench_startup.py status version  # selected commands
+    python scripts/bench_startup.py --runs 5 --top 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commands are invoked with --help so that they are resolved (and their
+# modules imported) without touching Docker, Git or the network.
+COMMANDS = {
+    "version": ["version"],
+    "about": ["about"],
+    "docs": ["docs", "--help"],
+    "init": ["init", "--help"],
+    "health": ["health", "--help"],
+    "clone": ["clone", "--help"],
+    "up": ["up", "--help"],
+    "deploy": ["deploy", "--help"],
+    "logs": ["logs", "--help"],
+    "shell": ["shell", "--help"],
+    "down": ["down", "--help"],
+    "status": ["status", "--help"],
+    "net": ["net", "--help"],
+}
+
+LAUNCHER = "import sys; from app.main import app; sys.argv[0] = 'mate'; app()"
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int]]:
+    """Returns (module, cumulative_us) for every top-level import."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2]
+        # Nested imports are indented below their parent
+        if name.startswith("  "):
+            continue
+        entries.append((name.strip(), int(fields[1])))
+    return entries
+
+
+def measure(args: list[str]) -> tuple[float, list[tuple[str, int]]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), COLUMNS="120")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LAUNCHER, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    return wall, parse_importtime(proc.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("commands", nargs="*", help="Commands to measure (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command, the best one is reported")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest top-level imports to list per command")
+    opts = parser.parse_args()
+
+    selected = opts.commands or list(COMMANDS)
+    unknown = [c for c in selected if c not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    print(f"{'COMMAND':<10} {'IMPORTS (ms)':>13} {'WALL (ms)':>10}  HEAVIEST")
+    for name in selected:
+        best = None
+        for _ in range(max(1, opts.runs)):
+            wall, entries = measure(COMMANDS[name])
+            total = sum(us for _, us in entries)
+            if best is None or total < best[0]:
+                best = (total, wall, entries)
+
+        total, wall, entries = best
+        heaviest = sorted(entries, key=lambda e: e[1], reverse=True)[:opts.top]
+        summary = ", ".join(f"{mod} {us / 1000:.0f}" for mod, us in heaviest)
+        print(f"{name:<10} {total / 1000:>13.1f} {wall * 1000:>10.1f}  {summary}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
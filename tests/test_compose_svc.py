@@ -0,0 +1,271 @@
+import textwrap
+
+import pytest
+
+from app.services import compose_svc
+from app.services.compose_svc import ComposeError, merge_values, parse_env_file, resolve_compose
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A compose project directory; write(name, yaml) adds a file to it."""
+    monkeypatch.setenv("MATE_CACHE_DIR", str(tmp_path / "cache"))
+    for variable in ("COMPOSE_FILE", "COMPOSE_PROFILES", "COMPOSE_PATH_SEPARATOR"):
+        monkeypatch.delenv(variable, raising=False)
+    directory = tmp_path / "project"
+    directory.mkdir()
+
+    def write(name: str, content: str):
+        path = directory / name
+        path.write_text(textwrap.dedent(content))
+        return path
+
+    write.dir = directory
+    return write
+
+
+def test_services_named_like_merge_keys_are_merged(project):
+    project("compose.yaml", """
+        services:
+          test:
+            image: x
+            ports: ["8080:80"]
+          labels:
+            image: y
+            command: ["run"]
+    """)
+    project("compose.override.yaml", """
+        services:
+          test:
+            environment:
+              DEBUG: "1"
+          labels:
+            expose: ["9000"]
+    """)
+
+    services = resolve_compose(str(project.dir))["services"]
+
+    assert services["test"]["image"] == "x"
+    assert services["test"]["ports"] == ["8080:80"]
+    assert services["labels"]["image"] == "y"
+    assert services["labels"]["expose"] == ["9000"]
+
+
+def test_merge_rules_apply_inside_definitions_only():
+    base = {"services": {"web": {"command": ["a", "b"], "environment": ["A=1"]}}}
+    override = {"services": {"web": {"command": ["c"], "environment": {"B": "2"}}}}
+
+    merged = merge_values((), base, override)
+
+    assert merged["services"]["web"] == {"command": ["c"], "environment": {"A": "1", "B": "2"}}
+
+
+def test_colon_separated_numbers_stay_strings(project):
+    # YAML 1.1 would read these as base 60 ints (22:22 == 1342), Compose reads YAML 1.2
+    project("compose.yaml", """
+        services:
+          ssh:
+            image: x
+            ports:
+              - 22:22
+              - 8080:80
+            expose:
+              - 9000
+    """)
+
+    service = resolve_compose(str(project.dir))["services"]["ssh"]
+
+    assert service["ports"] == ["22:22", "8080:80"]
+    assert service["expose"] == ["9000"]
+
+
+def test_default_file_prefers_compose_yaml(project):
+    project("docker-compose.yml", "services: {old: {image: old}}\n")
+    project("compose.yaml", "services: {new: {image: new}}\n")
+
+    model = resolve_compose(str(project.dir))
+
+    assert list(model["services"]) == ["new"]
+    assert model["files"] == [str(project.dir / "compose.yaml")]
+
+
+def test_files_merge_in_order(project):
+    project("compose.yaml", """
+        services:
+          web:
+            image: web:1
+            ports: ["8080:80"]
+            volumes: ["./a:/data", "./logs:/logs"]
+            depends_on: [db]
+          db:
+            image: postgres
+    """)
+    project("compose.prod.yaml", """
+        services:
+          web:
+            image: web:2
+            ports: ["8443:443"]
+            volumes: ["./b:/data"]
+            depends_on:
+              cache:
+                condition: service_healthy
+          cache:
+            image: redis
+    """)
+
+    model = resolve_compose(str(project.dir), files=["compose.yaml", "compose.prod.yaml"])
+    web = model["services"]["web"]
+
+    assert list(model["services"]) == ["web", "db", "cache"]
+    assert web["image"] == "web:2"
+    assert web["ports"] == ["8080:80", "8443:443"]
+    assert set(web["depends_on"]) == {"db", "cache"}
+    assert web["depends_on"]["cache"]["condition"] == "service_healthy"
+    merged = merge_values(
+        (), {"services": {"web": {"volumes": ["./a:/data", "./logs:/logs"]}}},
+        {"services": {"web": {"volumes": ["./b:/data"]}}},
+    )
+    # Volumes are merged by their mount target, the later file wins
+    assert merged["services"]["web"]["volumes"] == ["./b:/data", "./logs:/logs"]
+
+
+def test_reset_and_override_tags(project):
+    project("compose.yaml", """
+        services:
+          web:
+            image: web
+            ports: ["8080:80"]
+            expose: ["9000"]
+            healthcheck:
+              test: ["CMD", "true"]
+    """)
+    project("compose.override.yaml", """
+        services:
+          web:
+            ports: !override ["9090:80"]
+            expose: !reset []
+            healthcheck: !reset null
+    """)
+
+    web = resolve_compose(str(project.dir))["services"]["web"]
+
+    assert web["ports"] == ["9090:80"]
+    assert web["expose"] == []
+    assert web["healthcheck"] is None
+
+
+def test_interpolation_from_env_file_and_shell(project, monkeypatch):
+    project(".env", 'TAG=1.0\nPORT=8080\nGREETING="héllo \\"there\\"\\n\\u00e9"\n')
+    project("compose.yaml", """
+        services:
+          web:
+            image: "web:${TAG}"
+            ports: ["${PORT:-80}:80", "${MISSING:-9000}:9000", "$${LITERAL}:1"]
+            expose: ["${UNSET-}", "${TAG:+7000}"]
+    """)
+    monkeypatch.setenv("PORT", "8081")
+
+    web = resolve_compose(str(project.dir))["services"]["web"]
+
+    assert web["image"] == "web:1.0"
+    # The shell environment wins over .env
+    assert web["ports"] == ["8081:80", "9000:9000", "${LITERAL}:1"]
+    assert web["expose"] == ["", "7000"]
+    # Only \n, \t, \" and \\ are escapes; UTF-8 text is left alone
+    assert parse_env_file(project.dir / ".env")["GREETING"] == 'héllo "there"\n\\u00e9'
+
+
+def test_required_variable_raises(project):
+    project("compose.yaml", """
+        services:
+          web:
+            image: "web:${TAG:?set TAG first}"
+    """)
+
+    with pytest.raises(ComposeError, match="set TAG first"):
+        resolve_compose(str(project.dir))
+
+
+def test_profiles(project, monkeypatch):
+    project("compose.yaml", """
+        services:
+          web:
+            image: web
+          debug:
+            image: debug
+            profiles: [dev]
+          metrics:
+            image: metrics
+            profiles: [ops]
+    """)
+
+    assert list(resolve_compose(str(project.dir))["services"]) == ["web"]
+    assert list(resolve_compose(str(project.dir), profiles=["dev"])["services"]) == ["web", "debug"]
+    monkeypatch.setenv("COMPOSE_PROFILES", "dev,ops")
+    assert list(resolve_compose(str(project.dir))["services"]) == ["web", "debug", "metrics"]
+
+
+def test_extends_across_files(project):
+    (project.dir / "common").mkdir()
+    project("common/base.yaml", """
+        services:
+          app:
+            build: ./src
+            ports: ["8000:8000"]
+            healthcheck:
+              test: ["CMD", "true"]
+    """)
+    project("compose.yaml", """
+        services:
+          local:
+            image: base
+            expose: ["1"]
+          web:
+            extends:
+              file: common/base.yaml
+              service: app
+            ports: ["9000:9000"]
+          worker:
+            extends: local
+    """)
+
+    services = resolve_compose(str(project.dir))["services"]
+
+    # The relative build context still points at common/src
+    assert services["web"]["build"] == "common/src"
+    assert services["web"]["ports"] == ["8000:8000", "9000:9000"]
+    assert services["web"]["healthcheck"]["test"] == ["CMD", "true"]
+    assert services["worker"]["image"] == "base"
+    assert services["worker"]["expose"] == ["1"]
+
+
+def test_circular_extends_raises(project):
+    project("compose.yaml", """
+        services:
+          a:
+            extends: b
+          b:
+            extends: a
+    """)
+
+    with pytest.raises(ComposeError, match="Circular extends"):
+        resolve_compose(str(project.dir))
+
+
+def test_documents_are_parsed_once_per_change(project, monkeypatch):
+    project("compose.yaml", "services: {web: {image: web}}\n")
+    override = project("compose.override.yaml", "services: {web: {expose: ['1']}}\n")
+    parsed = []
+    load = compose_svc.yaml.load
+    monkeypatch.setattr(compose_svc.yaml, "load", lambda data, Loader: parsed.append(data) or load(data, Loader=Loader))
+
+    resolve_compose(str(project.dir))
+    resolve_compose(str(project.dir))
+    assert len(parsed) == 2
+
+    override.write_text("services: {web: {expose: ['2', '3']}}\n")
+    web = resolve_compose(str(project.dir))["services"]["web"]
+
+    # Only the edited file is parsed again
+    assert len(parsed) == 3
+    assert web["expose"] == ["2", "3"]
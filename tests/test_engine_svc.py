@@ -0,0 +1,228 @@
+import json
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from app.services.engine_svc import EngineClient, EngineError, StreamDemuxer, demux_stream
+
+
+def frame(stream_type: int, payload: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+
+class FakeEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Docker Engine stand-in: routes are {(method, path): handler(request)}."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        self.routes = {}
+        self.connections = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        super().__init__(socket_path, EngineHandler)
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return "engine"
+
+    def _dispatch(self):
+        path = self.path.split("?", 1)[0]
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        route = self.server.routes.get((self.command, path))
+        if route is None:
+            self.send_json(404, {"message": f"no route {self.command} {path}"})
+            return
+        route(self)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def send_json(self, status: int, body, close: bool = False):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        # Drop the connection without announcing it, like a daemon timing out a keep-alive
+        self.close_connection = close
+
+    def send_chunked(self, chunks: list[bytes], content_type: str = "application/json"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    server = FakeEngine(str(tmp_path / "docker.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(engine):
+    client = EngineClient(engine.server_address, pool_size=2, timeout=5)
+    yield client
+    client.close()
+
+
+def test_requests_reuse_pooled_connection(engine, client):
+    engine.routes[("GET", "/_ping")] = lambda h: h.send_json(200, "OK")
+
+    for _ in range(5):
+        assert client.ping()
+
+    assert engine.connections == 1
+    assert len(engine.requests) == 5
+
+
+def test_pool_keeps_at_most_pool_size_connections(engine, client):
+    engine.routes[("GET", "/containers/a/json")] = lambda h: h.send_json(200, {"Id": "a"})
+
+    held = [client._acquire() for _ in range(3)]
+    for conn in held:
+        client._release(conn)
+
+    # The third connection did not fit in the pool and was closed
+    assert client._pool.qsize() == 2
+    assert client.inspect_container("a") == {"Id": "a"}
+
+
+def test_stale_keep_alive_connection_is_retried(engine, client):
+    engine.routes[("GET", "/containers/a/json")] = lambda h: h.send_json(200, {"Id": "a"}, close=True)
+
+    assert client.inspect_container("a") == {"Id": "a"}
+    # The pooled connection is dead now; the second call must reconnect transparently
+    assert client.inspect_container("a") == {"Id": "a"}
+
+    assert engine.connections == 2
+    assert len(engine.requests) == 2
+
+
+def test_error_status_raises_engine_error(engine, client):
+    with pytest.raises(EngineError) as error:
+        client.inspect_container("missing")
+
+    assert error.value.status == 404
+    assert "no route" in str(error.value)
+    assert client.container_exists("missing") is False
+
+
+def test_stream_json_reassembles_lines_across_chunks(engine, client):
+    events = [{"Type": "container", "Action": "start", "id": str(i)} for i in range(3)]
+    payload = b"".join(json.dumps(event).encode() + b"\n" for event in events)
+    # Chunk boundaries fall inside objects and between a line and its newline
+    chunks = [payload[:7], payload[7:40], payload[40:-1], payload[-1:]]
+    engine.routes[("GET", "/events")] = lambda h: h.send_chunked(chunks)
+
+    assert list(client.stream_json("GET", "/events")) == events
+
+
+def test_stream_json_yields_unterminated_last_line(engine, client):
+    engine.routes[("GET", "/events")] = lambda h: h.send_chunked([b'{"a": 1}\n\n{"b"', b": 2}"])
+
+    assert list(client.stream_json("GET", "/events")) == [{"a": 1}, {"b": 2}]
+
+
+def test_stream_raises_on_error_status(engine, client):
+    with pytest.raises(EngineError):
+        list(client.stream_json("GET", "/events"))
+
+
+def test_stream_demuxer_handles_frames_split_across_chunks():
+    raw = frame(1, b"hello ") + frame(2, b"oops\n") + frame(1, b"") + frame(1, b"world\n")
+    demuxer = StreamDemuxer()
+
+    frames = []
+    for i in range(0, len(raw), 3):
+        frames.extend(demuxer.feed(raw[i:i + 3]))
+
+    assert frames == [("stdout", b"hello "), ("stderr", b"oops\n"), ("stdout", b""), ("stdout", b"world\n")]
+    assert demux_stream(raw) == (b"hello world\n", b"oops\n")
+
+
+def test_stream_demuxer_keeps_incomplete_frame():
+    demuxer = StreamDemuxer()
+
+    assert demuxer.feed(frame(1, b"partial")[:-2]) == []
+    assert demuxer.feed(b"al") == [("stdout", b"partial")]
+
+
+def test_container_logs_demuxes_chunked_stream(engine, client):
+    raw = frame(1, b"line 1\n") + frame(2, b"warn\n") + frame(1, b"line 2\n")
+    engine.routes[("GET", "/containers/app/json")] = lambda h: h.send_json(200, {"Config": {"Tty": False}})
+    engine.routes[("GET", "/containers/app/logs")] = lambda h: h.send_chunked(
+        [raw[:5], raw[5:20], raw[20:]], content_type="application/vnd.docker.multiplexed-stream"
+    )
+
+    logs = list(client.container_logs("app", tail=10, since=1700000000.5))
+
+    assert logs == [("stdout", b"line 1\n"), ("stderr", b"warn\n"), ("stdout", b"line 2\n")]
+    path = engine.requests[-1][1]
+    assert "tail=10" in path and "since=1700000000.500000000" in path
+
+
+def test_container_logs_passes_tty_output_through(engine, client):
+    engine.routes[("GET", "/containers/app/json")] = lambda h: h.send_json(200, {"Config": {"Tty": True}})
+    engine.routes[("GET", "/containers/app/logs")] = lambda h: h.send_chunked([b"raw output\n"], content_type="text/plain")
+
+    assert b"".join(chunk for _, chunk in client.container_logs("app")) == b"raw output\n"
+
+
+def test_remove_container_sends_flags(engine, client):
+    engine.routes[("DELETE", "/containers/app")] = lambda h: h.send_json(204, None)
+
+    client.remove_container("app", volumes=True, force=True)
+
+    assert engine.requests[-1] == ("DELETE", "/containers/app?v=1&force=1")
+
+
+def test_stream_closed_from_another_thread_ends_iteration(engine, client):
+    def endless(handler):
+        handler.send_response(200)
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        handler.wfile.write(b'10\r\n{"Action": "a"}\n\r\n')
+        handler.wfile.flush()
+        # Never sends anything else, like an events stream without `until`
+        handler.rfile.read()
+
+    engine.routes[("GET", "/events")] = endless
+    events = client.stream_json("GET", "/events")
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(events))
+    consumer.start()
+    time.sleep(0.2)
+
+    events.close()
+    consumer.join(timeout=2)
+
+    assert not consumer.is_alive()
+    assert received == [{"Action": "a"}]
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services import ports_svc
+from app.services.ports_svc import expand_port_spec, preflight_ports
+
+
+@pytest.fixture
+def free_host(monkeypatch):
+    """Every host port is free and nothing holds one."""
+    monkeypatch.setattr(ports_svc, "scan_host_ports", lambda bindings: [None] * len(bindings))
+    monkeypatch.setattr(ports_svc, "find_port_holders", lambda keys: {})
+
+
+def bindings(*specs):
+    return [binding for spec in specs for binding in expand_port_spec(spec)]
+
+
+@pytest.mark.parametrize("first, second", [
+    ("8080:80", "127.0.0.1:8080:81"),
+    ("0.0.0.0:8080:80", "192.168.1.5:8080:81"),
+    ("[::]:8080:80", "[::1]:8080:81"),
+    ("127.0.0.1:8080:80", "8080:81"),
+    ("127.0.0.1:8080:80", "127.0.0.1:8080:81"),
+])
+def test_overlapping_host_ips_conflict(free_host, first, second):
+    results = preflight_ports(bindings(first, second))
+
+    assert [r["status"] for r in results] == ["free", "conflict"]
+    assert results[1]["holder"] == "requested twice"
+
+
+@pytest.mark.parametrize("first, second", [
+    ("127.0.0.1:8080:80", "127.0.0.2:8080:81"),
+    ("0.0.0.0:8080:80", "[::1]:8080:81"),
+    ("8080:80", "8080:81/udp"),
+])
+def test_distinct_host_ips_do_not_conflict(free_host, first, second):
+    assert [r["status"] for r in preflight_ports(bindings(first, second))] == ["free", "free"]
+
+
+def test_port_requested_twice_is_remapped(free_host, monkeypatch):
+    monkeypatch.setattr(ports_svc, "allocate_ports", lambda count, port_range, host_ip, protocol, exclude: [20000])
+
+    results = preflight_ports(bindings("8080:80", "127.0.0.1:8080:81"), remap=True)
+
+    assert [r["status"] for r in results] == ["free", "remapped"]
+    assert results[1]["binding"]["published"] == 20000
+    assert results[1]["requested"] == 8080